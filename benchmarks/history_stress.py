@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+ClipBard history stress benchmark
+
+Runs N copy processes in parallel against a throw-away HOME, each copying
+its own set of files through Clipboard.copy_to_clipboard, then checks that
+every copied file made it into the history.
+
+Usage:
+  python3 benchmarks/history_stress.py [PROCESSES] [COPIES_PER_PROCESS]
+"""
+
+import os
+import sys
+import subprocess
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import sys
+sys.path.insert(0, {repo!r})
+import clipbard
+
+config = clipbard.Config()
+history = clipbard.History(config)
+clipboard = clipbard.Clipboard(config, history)
+for path in sys.argv[1:]:
+    if not clipboard.copy_to_clipboard(path):
+        sys.exit("copy failed: " + path)
+"""
+
+CONFIG = """[general]
+history_size = {history_size}
+display_count = 5
+
+[clipboard]
+backend = file
+
+[security]
+notification = false
+"""
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory(prefix="clipbard-stress-") as home:
+        config_dir = os.path.join(home, ".config", "clipbard")
+        os.makedirs(config_dir)
+        with open(os.path.join(config_dir, "config.ini"), 'w') as f:
+            f.write(CONFIG.format(history_size=processes * copies))
+
+        # Each worker copies its files three times so the journal crosses the
+        # compaction threshold while other workers are still appending
+        batches = []
+        for worker in range(processes):
+            paths = []
+            for i in range(copies):
+                path = os.path.join(home, f"w{worker}-{i}.txt")
+                with open(path, 'w') as f:
+                    f.write(f"{worker}:{i}\n")
+                paths.append(path)
+            batches.append(paths * 3)
+
+        env = dict(os.environ, HOME=home, CLIPBARD_NO_DAEMON="1")
+        env.pop("XDG_RUNTIME_DIR", None)
+        code = WORKER.format(repo=REPO_DIR)
+
+        start = time.perf_counter()
+        running = [subprocess.Popen([sys.executable, "-c", code] + paths, env=env) for paths in batches]
+        failed = sum(1 for proc in running if proc.wait() != 0)
+        elapsed = time.perf_counter() - start
+
+        sys.path.insert(0, REPO_DIR)
+        os.environ["HOME"] = home
+        import clipbard
+
+        config = clipbard.Config()
+        recorded = set(clipbard.History(config).get(processes * copies))
+        expected = {path for paths in batches for path in paths}
+        lost = expected - recorded
+
+        total = processes * copies * 3
+        print(f"{processes} processes x {copies * 3} copies: {total} copies in {elapsed:.2f}s "
+              f"({total / elapsed:.0f} copies/s)")
+        print(f"History entries: {len(recorded)} / {len(expected)} expected, {len(lost)} lost, "
+              f"{failed} failed workers")
+
+        if lost or failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
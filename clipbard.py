@@ -13,29 +13,34 @@ import json
 import hashlib
 import shutil
 import subprocess
-import tempfile
 import configparser
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Union, Any
+from collections import OrderedDict
+from itertools import chain, islice
+from contextlib import contextmanager, nullcontext, ExitStack
+from functools import lru_cache, partial
+from bisect import bisect_left, insort
+from heapq import heappush, heappop
+from array import array
+import math
+from typing import List, Dict, Tuple, Optional, Union, Any, Iterator, NamedTuple, Mapping, BinaryIO
+from dataclasses import dataclass, fields
+from types import MappingProxyType
 import signal
+from stat import S_ISDIR, S_ISREG
+import threading
+import atexit
 from datetime import datetime
 import mimetypes
-import time # For clipboard auto-clear
-
-from textual.app import App, ComposeResult
-from textual.containers import Container, Horizontal, Vertical
-from textual.widgets import (
-    Button, Static, Input, Label, Header, Footer,
-    DataTable, DirectoryTree, ListView, ListItem, Select,
-    Markdown, Log, Switch
-)
-# Using Log instead of TextLog for compatibility with Textual 3.2.0
-from textual.reactive import reactive
-from textual.binding import Binding
-from textual import events, work
-from textual.worker import Worker, get_current_worker
-from textual.screen import Screen
-from textual.coordinate import Coordinate
+import mmap
+import struct
+import time
+
+# Socket location, daemon client and daemon-served commands, shared with the launcher
+from clipbard_client import CONFIG_DIR, DAEMON_TIMEOUT, DaemonClient, daemon_socket_path, report, run_command
+
+# The Textual interface lives in clipbard_tui.py and is only imported by
+# launch_tui(), so plain file/text copies never load the Textual stack.
 
 # For handling keypress without Enter
 try:
@@ -61,13 +66,23 @@ else:
 
 # Constants
 VERSION = "1.0.0"
-CONFIG_DIR = os.path.expanduser("~/.config/clipbard")
-HISTORY_FILE = os.path.join(CONFIG_DIR, "history")
+HISTORY_FILE = os.path.join(CONFIG_DIR, "history")  # Plain path list, newest first; clipbard.sh's format
+HISTORY_JOURNAL_FILE = os.path.join(CONFIG_DIR, "history.journal")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.ini")
 SCRIPT_DIR = os.path.expanduser("~/.local/bin")
 SCRIPT_PATH = os.path.join(SCRIPT_DIR, "clipbard")
+TUI_MODULE = "clipbard_tui.py"
+CORE_MODULE = "clipbard.py"
+CLIENT_MODULE = "clipbard_client.py"
+LAUNCHER_MODULE = "clipbard_launcher.py"  # Installed as SCRIPT_PATH; imports CORE_MODULE from beside it
 GITHUB_REPO = "https://github.com/eraxe/clipbard"
 TMP_DIR = "/tmp/clipbard-tmp"
+BACKEND_CACHE_FILE = os.path.join(CONFIG_DIR, "backend.json")
+FILE_BACKEND_PATH = os.path.join(CONFIG_DIR, "clipboard.file")
+BUFFER_DIR = os.path.join(CONFIG_DIR, "buffers")
+SHELL_SCAN_STATE_FILE = os.path.join(CONFIG_DIR, "shell_scan.json")
+DAEMON_RETRY_INTERVAL = 0.05  # Seconds between attempts to reach a daemon that is starting up
+CONFIG_CHECK_INTERVAL = 1.0  # Seconds between checks of config.ini for edits by other processes
 
 # Default configuration
 DEFAULT_HISTORY_SIZE = 50
@@ -75,11 +90,68 @@ DEFAULT_DISPLAY_COUNT = 5
 DEFAULT_THEME = "synthwave"
 DEFAULT_CLIPBOARD_BUFFER = 0
 DEFAULT_MAX_FILE_SIZE = 10  # In MB
+DEFAULT_CLIPBOARD_BACKEND = "auto"
+DEFAULT_BUFFER_QUOTA = 256  # In MB, across all stored buffers
+DEFAULT_AUTO_CLEAR_TIMEOUT = 60  # Seconds; [auto_clear] <buffer> = seconds overrides it per buffer
+HISTORY_COMPACT_MIN = 500  # Journal records kept before compaction is considered
+SHELL_SCAN_MAX_CANDIDATES = 5000  # Candidate paths remembered per shell history file
+SHELL_SCAN_STATE_VERSION = 5
+QUICK_COPY_SLOTS = 9  # Files offered by quick copy mode, one digit key each
+FRECENCY_HALF_LIFE = 7 * 24 * 3600  # Seconds for a use to lose half its weight
+SHELL_FRECENCY_WEIGHT = 0.25  # A path typed in the shell counts less than a clipbard copy
+FRECENCY_CWD_BOOST = 2.0  # log2 bonus for files under the current directory (x4)
+FRECENCY_GIT_BOOST = 1.0  # log2 bonus for files in the current git work tree (x2)
 DEFAULT_PREFERRED_HISTORY = "auto"
+DEFAULT_VALIDATION_WORKERS = 0  # Threads used to stat history candidates; 0 stats inline
+DEFAULT_SEARCH_LIMIT = 20  # Content search stops after this many matching files
+DEFAULT_SEARCH_WORKERS = 0  # Content search threads; 0 picks one from the CPU count
+SEARCH_MAX_FILE_SIZE = 64 * 1024 * 1024  # Content search skips larger files (they are mapped, not read)
+DEFAULT_SEARCH_EXCLUDES = "node_modules,__pycache__,.git,.hg,.svn,.venv,venv,.tox,.mypy_cache,.cache"
+IGNORE_FILES = (".gitignore", ".ignore")  # Per-directory ignore files honoured by the walker
+SEARCH_SNIFF_SIZE = 8192  # Leading bytes checked for NULs and byte order marks
+SEARCH_CHUNK_SIZE = 1024 * 1024  # Bytes of a mapped file lowercased at a time
+DEFAULT_SEARCH_CONTEXT = 2  # Lines kept before and after each matching line
+SEARCH_MAX_HITS = 100  # Matching lines recorded per file
+SEARCH_MAX_LINE_LENGTH = 4096  # Longer lines (minified files) are cut in results
+SEARCH_RECENCY_HALF_LIFE = 30 * 24 * 3600  # Seconds for a file's recency bonus to halve
+SEARCH_DEPTH_PENALTY = 0.25  # Relevance lost per directory level below the search root
+SEARCH_INDEX_DIR = os.path.join(CONFIG_DIR, "index")
+SEARCH_INDEX_VERSION = 4
+SEARCH_INDEX_BATCH = 200  # Files indexed per committed transaction; at most 256 (ids are stored as byte offsets)
+SEARCH_INDEX_MAX_FILE_SIZE = 1024 * 1024  # Larger files are not indexed and always searched
+SEARCH_BATCH_SIZE = 16  # Files handed to a search worker at once
+SEARCH_QUEUE_FACTOR = 4  # Batches in flight per search worker
+PREVIEW_LINES = 10  # Lines shown from the head (and tail) of a text file
+PREVIEW_BLOCK_SIZE = 64 * 1024  # Bytes read from each end of a file for its preview
+PREVIEW_COUNT_LIMIT = 8 * 1024 * 1024  # Larger files get an estimated line count
+LINE_COUNT_CHUNK_SIZE = 1024 * 1024  # Bytes read at a time when counting lines
+COPY_CHUNK_SIZE = 1024 * 1024  # Bytes of a copied file held in memory at once
+DEFAULT_COMPRESSION_CODEC = "gzip"
+DEFAULT_COMPRESSION_LEVEL = -1  # -1 uses the codec's own default
+COMPRESSION_MIN_SIZE = 100 * 1024  # Smaller files are copied uncompressed
+COMPRESSION_SAMPLE_SIZE = 64 * 1024  # Leading bytes test-compressed before committing to a codec
+COMPRESSION_MIN_SAVING = 0.1  # A sample that shrinks less than this is left uncompressed
+COMPRESSION_HEADER = b"CLIPBARD-COMPRESSED:"  # Followed by the codec name and a newline
+ENCRYPTION_SALT_FILE = os.path.join(CONFIG_DIR, "encryption.salt")
+ENCRYPTION_MAGIC = b"\x89CBE1"  # Starts every encrypted payload; never valid UTF-8 text
+ENCRYPTION_CHUNK_SIZE = 64 * 1024  # Plaintext bytes sealed per AES-GCM record
+ENCRYPTION_ARMOR = b"CLIPBARD-ENCRYPTED:"  # Base85 form for clipboards that only carry text
+DEFAULT_ENCRYPTION_ARMOR = "auto"  # auto armors only for text-only backends; also always/never
+KEY_CACHE_TTL = 8 * 3600  # Seconds a derived key stays in the kernel keyring
+LINE_INDEX_DIR = os.path.join(CONFIG_DIR, "lines")
+LINE_INDEX_STRIDE = 1024  # Lines between recorded offsets; a lookup skips at most this many
+LINE_INDEX_PIECE = 4096  # Bytes counted at once while building; only pieces holding a checkpoint are scanned
+LINE_INDEX_MIN_SIZE = 1024 * 1024  # Smaller files are indexed in memory only
+LINE_INDEX_MAX_FILES = 64  # Sidecar indexes kept on disk, least recently built dropped first
+NOTIFY_COALESCE_WINDOW = 0.3  # Seconds to wait for more notifications before showing a burst as one
+NOTIFY_TIMEOUT = 2  # Seconds the notification thread waits on the notification daemon
+NOTIFY_EXPIRE_MS = 3000  # How long a notification stays on screen
+PATH_CACHE_TTL = 30  # Seconds a cached stat of a history candidate stays trusted
+SCANDIR_MIN_GROUP = 4  # Candidates in one directory before a single scandir beats stat calls
 DEFAULT_VERBOSE_LOGGING = False
 
 # List of recognizable file extensions (simplified from bash version)
-FILE_EXTENSIONS = [
+FILE_EXTENSIONS = frozenset([
     # Programming
     "py", "js", "html", "css", "php", "java", "cpp", "c", "h", "hpp", "cs",
     "go", "rb", "pl", "swift", "kt", "rs", "ts", "sh", "bash", "zsh", "sql",
@@ -89,14 +161,73 @@ FILE_EXTENSIONS = [
     "txt", "doc", "docx", "pdf", "xls", "xlsx",
     # Config
     "conf", "config", "cfg", "gitignore", "env",
-]
+])
 
-# Create necessary directories
-os.makedirs(CONFIG_DIR, exist_ok=True)
-os.makedirs(TMP_DIR, exist_ok=True)
-if not os.path.exists(HISTORY_FILE):
-    with open(HISTORY_FILE, 'w') as f: # Ensure file is closed
-        f.close()
+# Commands whose argument is treated as a file even without an extension
+FILE_COMMANDS = frozenset([
+    "cat", "nano", "vim", "vi", "nvim", "emacs", "less", "more", "head", "tail", "grep", "awk", "sed",
+])
+
+
+# Messages from core code - printed by the CLI, shown as notifications by the TUI
+_message_handler = None  # Called as handler(message, severity) in place of print, from any thread
+
+
+def set_message_handler(handler=None):
+    """Send show_message output to handler instead of stdout; None restores printing"""
+    global _message_handler
+    _message_handler = handler
+
+
+def show_message(message: str, severity: str = "error"):
+    """Report from code the TUI's workers and the notifier thread run, where print would draw over the screen"""
+    handler = _message_handler
+    if handler is None:
+        print(message)
+    else:
+        handler(message, severity)
+
+
+# Advisory file locking shared by writers of files under CONFIG_DIR
+@contextmanager
+def file_lock(lock_path: str, exclusive: bool = True, blocking: bool = True):
+    """Hold an flock on lock_path; does nothing on platforms without fcntl.
+
+    Without blocking, raises BlockingIOError if another process holds a conflicting lock.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a') as lock:
+        fcntl.flock(lock.fileno(), (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB))
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def write_atomic(path: str, data: bytes):
+    """Replace path with data so readers never see a partially written file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+    os.replace(temp_file, path)
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this pid exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Exists, but belongs to someone else
+    return True
 
 
 # Theme colors - No changes needed
@@ -151,81 +282,264 @@ class Theme:
         # Default "synthwave" theme colors are already set
 
 
+# Typed settings - one schema of defaults, parsed once per change of config.ini
+@dataclass(frozen=True, slots=True)
+class GeneralSettings:
+    history_size: int = DEFAULT_HISTORY_SIZE
+    display_count: int = DEFAULT_DISPLAY_COUNT
+    theme: str = DEFAULT_THEME
+    verbose_logging: bool = DEFAULT_VERBOSE_LOGGING
+
+
+@dataclass(frozen=True, slots=True)
+class ClipboardSettings:
+    auto_clear: bool = False
+    default_buffer: str = str(DEFAULT_CLIPBOARD_BUFFER)
+    max_file_size: int = DEFAULT_MAX_FILE_SIZE
+    backend: str = DEFAULT_CLIPBOARD_BACKEND
+    buffer_quota: int = DEFAULT_BUFFER_QUOTA
+    auto_clear_timeout: int = DEFAULT_AUTO_CLEAR_TIMEOUT
+
+
+@dataclass(frozen=True, slots=True)
+class SecuritySettings:
+    notification: bool = True
+    compression: bool = False
+    compression_codec: str = DEFAULT_COMPRESSION_CODEC
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
+    encryption: bool = False
+    armor: str = DEFAULT_ENCRYPTION_ARMOR
+
+
+@dataclass(frozen=True, slots=True)
+class HistorySettings:
+    shell_history_scan: bool = True
+    prefer_local_history: bool = True
+    preferred_history: str = DEFAULT_PREFERRED_HISTORY
+    validation_workers: int = DEFAULT_VALIDATION_WORKERS
+
+
+@dataclass(frozen=True, slots=True)
+class SearchSettings:
+    result_limit: int = DEFAULT_SEARCH_LIMIT
+    workers: int = DEFAULT_SEARCH_WORKERS
+    index: bool = False
+    exclude: str = DEFAULT_SEARCH_EXCLUDES
+    hidden: bool = False
+    ignore_files: bool = True
+    follow_symlinks: bool = False
+    context_lines: int = DEFAULT_SEARCH_CONTEXT
+
+
+# config.ini section -> settings class; the field defaults are the only copy of the defaults
+SETTINGS_SECTIONS = {
+    "general": GeneralSettings,
+    "clipboard": ClipboardSettings,
+    "security": SecuritySettings,
+    "history": HistorySettings,
+    "search": SearchSettings,
+}
+
+
+def _format_setting(value) -> str:
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+def _parse_setting(raw: Optional[str], default):
+    """Convert a config.ini string to the type of default, keeping default if it does not parse"""
+    if raw is None:
+        return default
+    if isinstance(default, bool):
+        return raw.strip().lower() == "true"
+    if isinstance(default, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return default
+    return raw
+
+
+# Default config.ini contents, as strings
+CONFIG_SCHEMA = {
+    section: {field.name: _format_setting(field.default) for field in fields(settings_class)}
+    for section, settings_class in SETTINGS_SECTIONS.items()
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Immutable, typed snapshot of config.ini"""
+    general: GeneralSettings
+    clipboard: ClipboardSettings
+    security: SecuritySettings
+    history: HistorySettings
+    search: SearchSettings
+    auto_clear: Mapping[str, int]  # Per-buffer auto-clear timeouts from the optional [auto_clear] section
+
+    @classmethod
+    def from_parser(cls, parser: configparser.ConfigParser) -> "Settings":
+        sections = {}
+        for section, settings_class in SETTINGS_SECTIONS.items():
+            sections[section] = settings_class(**{
+                field.name: _parse_setting(parser.get(section, field.name, fallback=None), field.default)
+                for field in fields(settings_class)
+            })
+        auto_clear = {}
+        if parser.has_section("auto_clear"):
+            for buffer, raw in parser.items("auto_clear"):
+                timeout = _parse_setting(raw, -1)
+                if timeout >= 0:
+                    auto_clear[buffer] = timeout
+        return cls(auto_clear=MappingProxyType(auto_clear), **sections)
+
+
 # Configuration manager - No changes needed
 class Config:
+    _shared: Optional["Config"] = None
+
     def __init__(self):
         self.config = configparser.ConfigParser()
+        self._settings: Optional[Settings] = None
+        self._file_mtime = None  # mtime_ns of config.ini when this object last read or wrote it
+        self._checked = time.monotonic()  # When config.ini's mtime was last compared
+        self._transaction = None  # Values before the open transaction, if any
+        self._subscribers = []
+        self.notify_daemon = True  # Tell a running daemon to reload after each write
         self._create_default_config()
         self.load_config()
         self.theme = Theme(self.get("general", "theme", DEFAULT_THEME)) # Ensure fallback for theme
+        self.subscribe(self._apply_theme)
+
+    @classmethod
+    def shared(cls) -> "Config":
+        """Process-wide instance, so the CLI and the TUI parse config.ini once"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def settings(self) -> Settings:
+        """Typed settings, re-read only when config.ini has changed on disk"""
+        now = time.monotonic()
+        if now - self._checked >= CONFIG_CHECK_INTERVAL and self._transaction is None:
+            # Edited by hand, or by a process that could not notify us
+            self._checked = now
+            try:
+                mtime = os.stat(CONFIG_FILE).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != self._file_mtime:
+                self.reload()
+        if self._settings is None:
+            self._settings = Settings.from_parser(self.config)
+        return self._settings
+
+    def subscribe(self, callback):
+        """Call callback(changed) with the set of changed (section, key) after every change"""
+        self._subscribers.append(callback)
+
+    def _notify(self, changed: set):
+        for callback in self._subscribers:
+            try:
+                callback(changed)
+            except Exception as e:
+                show_message(f"Error applying configuration change: {e}")
+
+    def _apply_theme(self, changed: set):
+        if ("general", "theme") in changed:
+            self.theme.apply_theme(self.get("general", "theme"))
+
+    def _values(self) -> Dict[str, Dict[str, str]]:
+        return {section: dict(self.config[section]) for section in self.config.sections()}
+
+    def _changes(self, before: Dict[str, Dict[str, str]]) -> set:
+        """(section, key) pairs whose value differs from before"""
+        after = self._values()
+        changed = set()
+        for section in before.keys() | after.keys():
+            old, new = before.get(section, {}), after.get(section, {})
+            changed.update((section, key) for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+        return changed
+
+    def reload(self) -> set:
+        """Re-read config.ini, notifying subscribers of what changed"""
+        before = self._values()
+        self.config = configparser.ConfigParser()
+        self.load_config()
+        self._checked = time.monotonic()
+        changed = self._changes(before)
+        if changed:
+            self._notify(changed)
+        return changed
+
+    @contextmanager
+    def transaction(self):
+        """Apply every set() in the block, then write config.ini once, atomically.
+
+        If the block raises, the values from before it are restored and nothing is written.
+        Nested transactions join the outermost one.
+        """
+        if self._transaction is not None:
+            yield self
+            return
+        self._transaction = before = self._values()
+        try:
+            yield self
+        except BaseException:
+            self.config = configparser.ConfigParser()
+            self.config.read_dict(before)
+            self._settings = None
+            raise
+        finally:
+            self._transaction = None
+
+        changed = self._changes(before)
+        if changed:
+            changed |= self.save_config(changed)
+            self._notify(changed)
+            if self.notify_daemon:
+                DaemonClient(timeout=1).request("reload_config")
 
     def _create_default_config(self):
         """Create default configuration if it doesn't exist"""
         if not os.path.exists(CONFIG_FILE):
-            self.config["general"] = {
-                "history_size": str(DEFAULT_HISTORY_SIZE),
-                "display_count": str(DEFAULT_DISPLAY_COUNT),
-                "theme": DEFAULT_THEME,
-                "verbose_logging": str(DEFAULT_VERBOSE_LOGGING).lower()
-            }
-            self.config["clipboard"] = {
-                "auto_clear": "false",
-                "default_buffer": str(DEFAULT_CLIPBOARD_BUFFER),
-                "max_file_size": str(DEFAULT_MAX_FILE_SIZE)
-            }
-            self.config["security"] = {
-                "notification": "true",
-                "compression": "false",
-                "encryption": "false"
-            }
-            self.config["history"] = {
-                "shell_history_scan": "true",
-                "prefer_local_history": "true",
-                "preferred_history": DEFAULT_PREFERRED_HISTORY
-            }
+            self.config.read_dict(CONFIG_SCHEMA)
 
             # Make sure directory exists
             os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
 
-            with open(CONFIG_FILE, 'w') as configfile:
-                self.config.write(configfile)
+            self.save_config()
 
     def load_config(self):
         """Load configuration from file"""
         if os.path.exists(CONFIG_FILE):
             try:
                 self.config.read(CONFIG_FILE)
+                self._loaded()
                 # Ensure all sections and keys have defaults if missing after read
                 self._ensure_defaults_after_load()
             except configparser.Error as e: # Catch more specific errors
-                print(f"Error reading config file {CONFIG_FILE}: {e}. Recreating with defaults.")
+                show_message(f"Error reading config file {CONFIG_FILE}: {e}. Recreating with defaults.")
                 self._backup_and_recreate_config()
+                self._loaded()  # Don't retry on every settings lookup
         else: # If somehow still doesn't exist (e.g. deleted after _create_default_config)
             self._create_default_config()
             self.config.read(CONFIG_FILE)
+            self._loaded()
+
+    def _loaded(self):
+        """Note that the parser now matches config.ini"""
+        try:
+            self._file_mtime = os.stat(CONFIG_FILE).st_mtime_ns
+        except OSError:
+            self._file_mtime = None
+        self._settings = None
 
 
     def _ensure_defaults_after_load(self):
         """Ensure default sections and keys exist after loading config."""
-        default_sections = {
-            "general": {
-                "history_size": str(DEFAULT_HISTORY_SIZE), "display_count": str(DEFAULT_DISPLAY_COUNT),
-                "theme": DEFAULT_THEME, "verbose_logging": str(DEFAULT_VERBOSE_LOGGING).lower()
-            },
-            "clipboard": {
-                "auto_clear": "false", "default_buffer": str(DEFAULT_CLIPBOARD_BUFFER),
-                "max_file_size": str(DEFAULT_MAX_FILE_SIZE)
-            },
-            "security": {
-                "notification": "true", "compression": "false", "encryption": "false"
-            },
-            "history": {
-                "shell_history_scan": "true", "prefer_local_history": "true",
-                "preferred_history": DEFAULT_PREFERRED_HISTORY
-            }
-        }
         changed = False
-        for section, keys in default_sections.items():
+        for section, keys in CONFIG_SCHEMA.items():
             if not self.config.has_section(section):
                 self.config.add_section(section)
                 changed = True
@@ -244,7 +558,7 @@ class Config:
             backup_file = f"{CONFIG_FILE}.backup"
             if os.path.exists(CONFIG_FILE):
                 shutil.copy(CONFIG_FILE, backup_file)
-                print(f"Created backup of old config: {backup_file}")
+                show_message(f"Created backup of old config: {backup_file}", "information")
 
             # Read old config values if possible
             old_values = {}
@@ -268,16 +582,45 @@ class Config:
                             self.config[section][key] = old_values[key]
 
                 # Save updated config
-                with open(CONFIG_FILE, 'w') as configfile:
-                    self.config.write(configfile)
+                self.save_config()
         except Exception as e:
-            print(f"Error recreating config: {e}")
+            show_message(f"Error recreating config: {e}")
             self._create_default_config()
 
-    def save_config(self):
-        """Save configuration to file"""
-        with open(CONFIG_FILE, 'w') as configfile:
-            self.config.write(configfile)
+    def save_config(self, keys: set = None) -> set:
+        """Save configuration to file, atomically so readers never see half of it.
+
+        Given the (section, key) pairs a transaction changed, only those are applied over
+        config.ini as it is now, so edits made since we loaded it (by hand or by another
+        process) are kept. The parser becomes the merged result; returns the pairs that
+        came from the file.
+        """
+        import io
+        from_file = set()
+        with file_lock(f"{CONFIG_FILE}.lock"):
+            if keys is not None:
+                current = configparser.ConfigParser()
+                try:
+                    current.read(CONFIG_FILE)
+                except configparser.Error:
+                    current = None  # Unreadable; ours replaces it whole
+                if current is not None:
+                    for section, key in keys:
+                        if self.config.has_option(section, key):
+                            if not current.has_section(section):
+                                current.add_section(section)
+                            current.set(section, key, self.config.get(section, key, raw=True))
+                        elif current.has_option(section, key):
+                            current.remove_option(section, key)
+                    before = self._values()
+                    self.config = current
+                    from_file = self._changes(before)
+
+            contents = io.StringIO()
+            self.config.write(contents)
+            write_atomic(CONFIG_FILE, contents.getvalue().encode('utf-8'))
+        self._loaded()
+        return from_file
 
     def get(self, section: str, key: str, fallback=None) -> str:
         """Get configuration value"""
@@ -286,37 +629,15 @@ class Config:
         except (KeyError, ValueError):
             if fallback is not None:
                 return fallback
-
-            # Set defaults based on section and key
-            if section == "general":
-                if key == "history_size": return str(DEFAULT_HISTORY_SIZE)
-                if key == "display_count": return str(DEFAULT_DISPLAY_COUNT)
-                if key == "theme": return DEFAULT_THEME
-                if key == "verbose_logging": return str(DEFAULT_VERBOSE_LOGGING).lower()
-            elif section == "clipboard":
-                if key == "auto_clear": return "false"
-                if key == "default_buffer": return str(DEFAULT_CLIPBOARD_BUFFER)
-                if key == "max_file_size": return str(DEFAULT_MAX_FILE_SIZE)
-            elif section == "security":
-                if key == "notification": return "true"
-                if key == "compression": return "false"
-                if key == "encryption": return "false"
-            elif section == "history":
-                if key == "shell_history_scan": return "true"
-                if key == "prefer_local_history": return "true"
-                if key == "preferred_history": return DEFAULT_PREFERRED_HISTORY
-            return ""
+            return CONFIG_SCHEMA.get(section, {}).get(key, "")
 
     def set(self, section: str, key: str, value: str):
-        """Set configuration value"""
-        if section not in self.config:
-            self.config[section] = {}
-        self.config[section][key] = value
-        self.save_config()
-
-        # If theme is updated, apply it
-        if section == "general" and key == "theme":
-            self.theme.apply_theme(value)
+        """Set configuration value; written at once, or when the enclosing transaction() ends"""
+        with self.transaction():
+            if section not in self.config:
+                self.config[section] = {}
+            self.config[section][key] = value
+            self._settings = None
 
     def get_bool(self, section: str, key: str, fallback=None) -> bool:
         """Get boolean configuration value"""
@@ -337,88 +658,722 @@ class Config:
             return 0
 
 
+# Shell history parsing - one streaming tokenizer per history format
+class HistoryRecord(NamedTuple):
+    timestamp: Optional[float]  # Seconds since the epoch, if the format records it
+    cwd: Optional[str]  # Directory the command ran in, if known
+    command: str
+    paths: List[str]  # Path candidates, absolute when cwd is known
+
+
+# Whole words that look like paths: absolute/home-relative, or a name with an extension
+_PATH_CHARS = r"[a-zA-Z0-9._/~-]"
+# One regex pass finds every path candidate: either the first non-option argument of a file
+# viewer/editor, or a whole word that looks like a path (absolute, home-relative, or a name
+# with an extension)
+_CANDIDATE_PATTERN = re.compile(
+    r"(?<![^\s;|&<>()`'\"=])"
+    r"(?:(?:" + "|".join(sorted(FILE_COMMANDS)) + r")[ \t]+(?:-\S+[ \t]+)*(?P<argument>" + _PATH_CHARS + r"+)"
+    r"|(?!-)(?P<word>[/~]" + _PATH_CHARS + r"*|" + _PATH_CHARS + r"*\.[a-zA-Z0-9]+))"
+    r"(?![^\s;|&<>()`'\"])",
+    re.MULTILINE
+)
+_ZSH_EXTENDED = re.compile(r": *(\d+):\d+;")
+_BASH_TIMESTAMP = re.compile(r"#(\d+)\n")
+
+
+def _resolve_candidate(word: str, cwd: str = None) -> str:
+    """Expand ~ and anchor relative paths to the directory the command ran in"""
+    if word.startswith('~'):
+        return os.path.expanduser(word)
+    if cwd and not word.startswith('/'):
+        return os.path.normpath(os.path.join(cwd, word))
+    return word
+
+
+def extract_path_candidates(command: str, cwd: str = None) -> List[str]:
+    """Return the words of one command line that look like file paths"""
+    return [_resolve_candidate(match.group("argument") or match.group("word"), cwd)
+            for match in _CANDIDATE_PATTERN.finditer(command)]
+
+
+def _command_end(text: str, position: int) -> int:
+    """End of the command line containing position, following backslash continuations"""
+    end = text.find('\n', position)
+    while end > 0 and text[end - 1] == '\\':
+        end = text.find('\n', end + 1)
+    return len(text) if end == -1 else end
+
+
+def _zsh_header(text: str, line_start: int) -> Tuple[Optional[float], int]:
+    """Timestamp of a zsh line and where its command starts"""
+    match = _ZSH_EXTENDED.match(text, line_start)
+    if match:
+        return float(match.group(1)), match.end()
+    return None, line_start
+
+
+def _bash_header(text: str, line_start: int) -> Tuple[Optional[float], int]:
+    """Timestamp from the '#<epoch>' line just above a bash command"""
+    if line_start:
+        previous_start = text.rfind('\n', 0, line_start - 1) + 1
+        match = _BASH_TIMESTAMP.fullmatch(text, previous_start, line_start)
+        if match:
+            return float(match.group(1)), line_start
+    return None, line_start
+
+
+def _scan_records(text: str, header, cwd: str = None) -> Iterator[HistoryRecord]:
+    """Group path candidates by the command line they appear on.
+
+    Only lines that mention a path cost any Python work; headers are looked up per line hit.
+    """
+    line_start = end = -1
+    record = None
+    for match in _CANDIDATE_PATTERN.finditer(text):
+        position = match.start()
+        if position >= end:
+            if record and record[2]:
+                yield HistoryRecord(record[0], cwd, text[record[1]:end], record[2])
+            line_start = text.rfind('\n', 0, position) + 1
+            while line_start > 1 and text[line_start - 2] == '\\':
+                line_start = text.rfind('\n', 0, line_start - 1) + 1
+            end = _command_end(text, position)
+            timestamp, command_start = header(text, line_start)
+            record = (timestamp, command_start, [])
+        record[2].append(_resolve_candidate(match.group("argument") or match.group("word"), cwd))
+
+    if record and record[2]:
+        yield HistoryRecord(record[0], cwd, text[record[1]:end], record[2])
+
+
+def _unmetafy(data: bytes) -> bytes:
+    """Undo zsh's history metafication of non-ASCII bytes"""
+    if b'\x83' not in data:
+        return data
+    output = bytearray()
+    meta = False
+    for byte in data:
+        if meta:
+            output.append(byte ^ 32)
+            meta = False
+        elif byte == 0x83:
+            meta = True
+        else:
+            output.append(byte)
+    return bytes(output)
+
+
+def parse_zsh_history(data: bytes, cwd: str = None) -> Iterator[HistoryRecord]:
+    """Parse zsh history, plain or EXTENDED_HISTORY (': <start>:<elapsed>;command')"""
+    return _scan_records(_unmetafy(data).decode('utf-8', errors='ignore'), _zsh_header, cwd)
+
+
+def parse_bash_history(data: bytes, cwd: str = None) -> Iterator[HistoryRecord]:
+    """Parse bash history, including HISTTIMEFORMAT '#<epoch>' lines"""
+    return _scan_records(data.decode('utf-8', errors='ignore'), _bash_header, cwd)
+
+
+def parse_fish_history(data: bytes, cwd: str = None) -> Iterator[HistoryRecord]:
+    """Parse fish's YAML-like history ('- cmd:', 'when:', 'paths:' entries)"""
+    command = None
+    timestamp = None
+    for line in data.decode('utf-8', errors='ignore').split('\n'):
+        if line.startswith('- cmd: '):
+            if command is not None:
+                yield HistoryRecord(timestamp, cwd, command, extract_path_candidates(command, cwd))
+            # fish escapes backslashes and newlines inside the command
+            command = line[7:].replace('\\n', '\n').replace('\\\\', '\\')
+            timestamp = None
+        elif line.startswith('  when: ') and line[8:].strip().isdigit():
+            timestamp = float(line[8:])
+    if command is not None:
+        yield HistoryRecord(timestamp, cwd, command, extract_path_candidates(command, cwd))
+
+
+def read_atuin_history(db_path: str, since_ns: int = 0) -> Iterator[Tuple[int, HistoryRecord]]:
+    """Read commands newer than `since_ns` from atuin's SQLite database.
+
+    Yields each record with its raw nanosecond timestamp, which is what a checkpoint has to
+    keep: converting to float seconds and back can land below the original.
+    """
+    import sqlite3
+
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT timestamp, cwd, command FROM history "
+            "WHERE timestamp > ? AND deleted_at IS NULL ORDER BY timestamp",
+            (since_ns,)
+        )
+        for timestamp_ns, cwd, command in rows:
+            cwd = cwd if cwd and os.path.isabs(cwd) else None
+            yield timestamp_ns, HistoryRecord(timestamp_ns / 1_000_000_000, cwd, command,
+                                              extract_path_candidates(command, cwd))
+    finally:
+        connection.close()
+
+
+HISTORY_PARSERS = {
+    "zsh": parse_zsh_history,
+    "bash": parse_bash_history,
+    "fish": parse_fish_history,
+}
+
+
+# Path validation - batched, cached existence checks for history candidates
+class PathInfo(NamedTuple):
+    """Cached result of checking one candidate path"""
+    checked: float  # time.monotonic() of the check
+    exists: bool
+    mtime: float
+    kind: str  # "file", "dir", "other" or "missing"
+
+
+def _stat_kind(mode: int) -> str:
+    """Classify an st_mode as file, dir or other"""
+    if S_ISREG(mode):
+        return "file"
+    return "dir" if S_ISDIR(mode) else "other"
+
+
+_MISSING = (False, 0.0, "missing")
+
+
+@lru_cache(maxsize=1024)
+def _is_recognized_name(name: str) -> bool:
+    """Whether a file name has a known extension or a text-like mime type"""
+    ext = os.path.splitext(name)[1].lower().lstrip('.')
+    if ext in FILE_EXTENSIONS:
+        return True
+    mime = mimetypes.guess_type(name)[0]
+    return bool(mime and ('text' in mime or 'json' in mime or 'xml' in mime))
+
+
+class PathValidator:
+    """Checks many candidate paths at once.
+
+    Candidates are grouped by parent directory so a crowded directory costs one scandir
+    instead of a stat per file, results are cached for PATH_CACHE_TTL seconds, and groups
+    can be checked on a thread pool when the filesystem is slow (e.g. NFS homes).
+    """
+
+    def __init__(self, workers: int = 0, ttl: float = PATH_CACHE_TTL):
+        self.workers = workers
+        self.ttl = ttl
+        self._cache: Dict[str, PathInfo] = {}
+        self._lock = threading.Lock()
+
+    def _check_group(self, directory: str, paths: List[str]) -> Dict[str, tuple]:
+        """Stat the paths of one directory, with a single scandir when there are many"""
+        results = {}
+        if len(paths) >= SCANDIR_MIN_GROUP:
+            wanted = {os.path.basename(path): path for path in paths}
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        path = wanted.get(entry.name)
+                        if path is None:
+                            continue
+                        try:
+                            st = entry.stat()  # Follows symlinks, like os.path.isfile
+                            results[path] = (True, st.st_mtime, _stat_kind(st.st_mode))
+                        except OSError:
+                            results[path] = _MISSING
+            except OSError:
+                pass
+            for path in paths:
+                results.setdefault(path, _MISSING)
+            return results
+
+        for path in paths:
+            try:
+                st = os.stat(path)
+                results[path] = (True, st.st_mtime, _stat_kind(st.st_mode))
+            except (OSError, ValueError):
+                results[path] = _MISSING
+        return results
+
+    def check(self, paths: List[str]) -> Dict[str, PathInfo]:
+        """Return PathInfo for every path, statting only those missing from the cache"""
+        now = time.monotonic()
+        found = {}
+        groups: Dict[str, List[str]] = {}
+        with self._lock:
+            for path in paths:
+                info = self._cache.get(path)
+                if info is not None and now - info.checked < self.ttl:
+                    found[path] = info
+                elif path not in found:
+                    groups.setdefault(os.path.dirname(path), []).append(path)
+
+        if groups:
+            if self.workers > 1 and len(groups) > 1:
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(groups))) as pool:
+                    checked = list(pool.map(lambda item: self._check_group(*item), groups.items()))
+            else:
+                checked = [self._check_group(directory, group) for directory, group in groups.items()]
+
+            with self._lock:
+                for results in checked:
+                    for path, result in results.items():
+                        info = PathInfo(now, *result)
+                        self._cache[path] = info
+                        found[path] = info
+        return found
+
+    def invalidate(self, path: str = None):
+        """Forget one cached path, or everything"""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
+
+    def filter_files(self, paths: List[str], count: int) -> List[str]:
+        """First count paths that are existing files with a recognized name, in order.
+
+        Paths are validated in batches so a long history does not stat far past count.
+        """
+        valid = []
+        batch_size = max(count * 4, 64)
+        for start in range(0, len(paths), batch_size):
+            batch = paths[start:start + batch_size]
+            info = self.check(batch)
+            for path in batch:
+                if info[path].kind == "file" and _is_recognized_name(os.path.basename(path)):
+                    valid.append(path)
+                    if len(valid) >= count:
+                        return valid
+        return valid
+
+
+# Frecency ranking - frequency x recency, kept sorted as uses come in
+def _log2_add(a: float, b: float) -> float:
+    """log2(2**a + 2**b) without overflowing"""
+    if a < b:
+        a, b = b, a
+    return a + math.log2(1.0 + 2.0 ** (b - a))
+
+
+@lru_cache(maxsize=64)
+def _git_root(directory: str) -> Optional[str]:
+    """Top of the git work tree containing directory, if any"""
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def frecency_boosts(cwd: str = None) -> List[Tuple[str, float]]:
+    """(path prefix, log2 bonus) pairs favouring files near the current directory"""
+    cwd = cwd or os.getcwd()
+    boosts = [(os.path.join(cwd, ""), FRECENCY_CWD_BOOST)]
+    root = _git_root(cwd)
+    if root and root != cwd:
+        boosts.append((os.path.join(root, ""), FRECENCY_GIT_BOOST))
+    return boosts
+
+
+class Frecency:
+    """Frecency scores in rank order.
+
+    A score is log2(sum of weight * 2**(t / half_life)) over every use, so all entries decay at
+    the same rate and time alone never reorders them. Only a new use moves a path, and the best
+    entries are always the tail of the sorted list.
+    """
+
+    def __init__(self, half_life: float = FRECENCY_HALF_LIFE):
+        self.half_life = half_life
+        self.scores: Dict[str, float] = {}
+        self._ranked: Optional[List[Tuple[float, str]]] = None  # Ascending; None until sorted
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def bump(self, path: str, timestamp: float = None, weight: float = 1.0):
+        """Record one use of path"""
+        if timestamp is None:
+            timestamp = time.time()
+        score = timestamp / self.half_life + math.log2(weight)
+        if path in self.scores:
+            score = _log2_add(self.scores[path], score)
+        self.set(path, score)
+
+    def set(self, path: str, score: float):
+        """Replace the score of path"""
+        self.remove(path)
+        self.scores[path] = score
+        if self._ranked is not None:
+            insort(self._ranked, (score, path))
+
+    def remove(self, path: str):
+        """Forget path"""
+        score = self.scores.pop(path, None)
+        if score is not None and self._ranked is not None:
+            del self._ranked[bisect_left(self._ranked, (score, path))]
+
+    def clear(self):
+        """Forget everything; a following replay only fills the dict"""
+        self.scores.clear()
+        self._ranked = None
+
+    def load(self, scores: Dict[str, float]):
+        """Replace all scores at once; sorting waits for the next top()"""
+        self.scores = dict(scores)
+        self._ranked = None
+
+    def top(self, count: int, accept=None, boosts: List[Tuple[str, float]] = ()) -> List[Tuple[str, float]]:
+        """Best count (path, boosted score) pairs that pass accept, best first.
+
+        Walks down from the best entry and stops once no boost could lift the remaining ones
+        above the current count-th result.
+        """
+        if self._ranked is None:
+            self._ranked = sorted((score, path) for path, score in self.scores.items())
+        max_boost = max((bonus for _, bonus in boosts), default=0.0)
+        best: List[Tuple[float, str]] = []  # Ascending by negated score
+        for score, path in reversed(self._ranked):
+            if len(best) >= count and score + max_boost <= -best[-1][0]:
+                break
+            if accept is not None and not accept(path):
+                continue
+            boosted = score + max((bonus for prefix, bonus in boosts if path.startswith(prefix)), default=0.0)
+            insort(best, (-boosted, path))
+            del best[count:]
+        return [(path, -score) for score, path in best]
+
+
 # History manager - No changes needed
 class History:
     def __init__(self, config: Config):
         self.config = config
-        self.history_file = HISTORY_FILE
+        self.history_file = HISTORY_JOURNAL_FILE
+        self.lock_file = f"{HISTORY_JOURNAL_FILE}.lock"
+        self.legacy_file = HISTORY_FILE  # Read for clipbard.sh's copies, never written
+        # path -> last copy timestamp, least recent first; loaded lazily from the journal
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._journal_id = None  # (inode, bytes applied) of the journal we have replayed
+        self._journal_lines = 0
+        self._legacy_id = None  # "inode:mtime_ns" of the plain history list last imported
+        self.validator = PathValidator(workers=config.settings.history.validation_workers)
+        self.frecency = Frecency()  # Clipbard copies, fed by the journal
+        self.shell_frecency = Frecency()  # Paths mentioned in shell history, fed by the scanner
+        self._shell_generation = None  # Scan state generation shell_frecency reflects
+
+    def _apply(self, line: str):
+        """Apply one journal record to the in-memory index"""
+        timestamp, op, path = line.split('\t', 2)
+        if op == "add":
+            self._entries[path] = float(timestamp)
+            self._entries.move_to_end(path)
+            self.frecency.bump(path, float(timestamp))
+        elif op == "frecency":
+            # Written by compaction after an entry's add record; carries the score in place of a time
+            if path in self._entries:
+                self.frecency.set(path, float(timestamp))
+            return
+        elif op == "clear":
+            self._entries.clear()
+            self.frecency.clear()
+        elif op == "legacy":
+            self._legacy_id = path
+            return
+        self._journal_lines += 1
+
+    def _trim(self, history_size: int):
+        """Drop the least recent entries beyond history_size"""
+        while len(self._entries) > history_size:
+            path, _ = self._entries.popitem(last=False)
+            self.frecency.remove(path)
+
+    def _refresh(self, locked: bool = False):
+        """Replay journal records appended since the last call (by us or other processes).
+
+        locked means the caller holds the exclusive journal lock.
+        """
+        try:
+            stat = os.stat(self.history_file)
+        except FileNotFoundError:
+            self._entries.clear()
+            self.frecency.clear()
+            self._journal_id = None
+            self._journal_lines = 0
+            self._legacy_id = None
+            self._import_legacy(locked)
+            return
+
+        inode, applied = self._journal_id or (None, 0)
+        if inode != stat.st_ino or stat.st_size < applied:
+            # New or compacted journal: replay from the start
+            self._entries.clear()
+            self.frecency.clear()
+            self._journal_lines = 0
+            applied = 0
+        elif stat.st_size == applied:
+            return
+
+        with open(self.history_file, 'rb') as f:
+            f.seek(applied)
+            data = f.read()
+
+        # Only consume complete lines; a partial record is picked up next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8', errors='ignore').splitlines():
+            try:
+                self._apply(line)
+            except ValueError:
+                continue  # Skip malformed records
+
+        self._journal_id = (stat.st_ino, applied + end)
+        self._import_legacy(locked)
+
+    def _import_legacy(self, locked: bool):
+        """Journal the paths clipbard.sh added to the plain history list since we last looked"""
+        try:
+            stat = os.stat(self.legacy_file)
+        except FileNotFoundError:
+            return
+        legacy_id = f"{stat.st_ino}:{stat.st_mtime_ns}"
+        if legacy_id == self._legacy_id:
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8', errors='ignore') as f:
+                lines = [line.strip() for line in f]
+        except OSError:
+            return
+
+        # clipbard.sh puts each copy at the top, so everything above the first known path is new
+        new_paths = []
+        for path in lines:
+            if path in self._entries:
+                break
+            if path and '\t' not in path and path not in new_paths:
+                new_paths.append(path)
+        records = [f"{stat.st_mtime:.3f}\tadd\t{path}" for path in reversed(new_paths)]
+        records.append(f"0\tlegacy\t{legacy_id}")
+        if locked:
+            # The caller is compacting and writes these out next; appending would wait on its lock
+            for record in records:
+                self._apply(record)
+        else:
+            self._append_records(records)
+
+    def _append(self, op: str, path: str = ""):
+        """Append one record to the journal"""
+        self._append_records([f"{time.time():.3f}\t{op}\t{path}"])
+
+    def _append_records(self, records: List[str]):
+        """Append records to the journal in one write"""
+        record = "".join(f"{line}\n" for line in records).encode('utf-8')
+        # Appenders share the lock; only compaction (which replaces the file) excludes them
+        with file_lock(self.lock_file, exclusive=False):
+            with open(self.history_file, 'a+b') as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        record = b'\n' + record  # Terminate a record torn by a crash
+                f.write(record)
+        self._refresh()
+
+    def _write_journal(self):
+        """Atomically replace the journal with one record per live entry"""
+        temp_file = f"{self.history_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
+            if self._legacy_id:
+                f.write(f"0\tlegacy\t{self._legacy_id}\n")
+            for path, timestamp in self._entries.items():
+                f.write(f"{timestamp:.3f}\tadd\t{path}\n")
+                f.write(f"{self.frecency.scores.get(path, 0.0):.6f}\tfrecency\t{path}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.history_file)
+        self._journal_id = None
+        self._refresh(locked=True)
+
+    def _compact(self):
+        """Rewrite the journal, including anything other processes appended"""
+        history_size = self.config.settings.general.history_size
+        with file_lock(self.lock_file):
+            self._refresh(locked=True)
+            self._trim(history_size)
+            self._write_journal()
 
     def add(self, file_path: str):
         """Add file to history"""
-        if not os.path.exists(file_path):
+        if not os.path.exists(file_path) or '\n' in file_path or '\t' in file_path:
             return
 
-        history_size = self.config.get_int("general", "history_size")
-
-        # Read existing history
-        history = []
-        if os.path.exists(self.history_file):
-            with open(self.history_file, 'r') as f:
-                history = [line.strip() for line in f.readlines()]
+        history_size = self.config.settings.general.history_size
 
-        # Add new entry to the beginning
-        if file_path in history:
-            history.remove(file_path)
-        history.insert(0, file_path)
+        self._refresh()
+        self._append("add", file_path)
 
         # Limit history size
-        history = history[:history_size]
+        self._trim(history_size)
 
-        # Write back to file
-        with open(self.history_file, 'w') as f:
-            f.write('\n'.join(history))
+        # Compact once the journal holds about twice as many records as live entries
+        if self._journal_lines > 2 * max(history_size, HISTORY_COMPACT_MIN):
+            self._compact()
 
     def get(self, count: int = None) -> List[str]:
         """Get history entries"""
         if count is None:
-            count = self.config.get_int("general", "display_count")
-
-        history = []
-        if os.path.exists(self.history_file):
-            with open(self.history_file, 'r') as f:
-                history = [line.strip() for line in f.readlines()]
+            count = self.config.settings.general.display_count
 
-        return history[:count]
+        self._refresh()
+        history_size = self.config.settings.general.history_size
+        count = min(count, history_size)
+        return list(islice(reversed(self._entries), count))
 
     def search(self, term: str, count: int = None) -> List[str]:
         """Search in history"""
         if count is None:
-            count = self.config.get_int("general", "display_count")
+            count = self.config.settings.general.display_count
 
-        history = self.get(None)  # Get all history
-        matches = [entry for entry in history if term.lower() in entry.lower()]
-        return matches[:count]
+        self._refresh()
+        term = term.lower()
+        history_size = self.config.settings.general.history_size
+        entries = islice(reversed(self._entries), history_size)
+        return list(islice((entry for entry in entries if term in entry.lower()), count))
 
     def clear(self):
         """Clear history"""
-        open(self.history_file, 'w').close()
+        self._refresh()  # Imports clipbard.sh's list first, so it is not picked up again afterwards
+        if os.path.exists(self.history_file):
+            self._append("clear")
+            self._compact()
 
-    def extract_files_from_shell_history(self, count: int = None) -> List[str]:
-        """Extract files from shell history"""
-        if count is None:
-            count = self.config.get_int("general", "display_count")
+    def _load_scan_state(self) -> dict:
+        """Per-source checkpoints and candidates from earlier shell history scans"""
+        try:
+            with open(SHELL_SCAN_STATE_FILE, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {"version": SHELL_SCAN_STATE_VERSION, "sources": {}}
+        if state.get("version") != SHELL_SCAN_STATE_VERSION:
+            return {"version": SHELL_SCAN_STATE_VERSION, "sources": {}}
+        return state
+
+    def _save_scan_state(self, state: dict):
+        """Persist scan checkpoints"""
+        try:
+            write_atomic(SHELL_SCAN_STATE_FILE, json.dumps(state).encode('utf-8'))
+        except OSError:
+            pass
+
+    def _merge_candidates(self, entry: dict, records: Iterator[HistoryRecord]):
+        """Fold newly parsed records into a checkpoint's [path, timestamp] list (oldest first)
+        and into the source's frecency scores.
+
+        Relative paths stay unresolved in the list and are left out of the scores; the parsers
+        only make a path absolute when the command's own directory is known.
+        """
+        newest = {}
+        scores = Frecency()
+        scores.load(entry["frecency"])
+        now = time.time()
+        for record in records:
+            for path in record.paths:
+                newest.pop(path, None)
+                newest[path] = record.timestamp
+                if not path.startswith('/'):
+                    # No recorded directory to anchor it to; scores are saved, so don't guess one
+                    continue
+                scores.bump(path, record.timestamp or now, SHELL_FRECENCY_WEIGHT)
+                self.shell_frecency.bump(path, record.timestamp or now, SHELL_FRECENCY_WEIGHT)
+        if not newest:
+            return
+        merged = {path: timestamp for path, timestamp in entry["candidates"] if path not in newest}
+        merged.update(newest)
+        entry["candidates"] = [list(item) for item in merged.items()][-SHELL_SCAN_MAX_CANDIDATES:]
+        entry["frecency"] = dict(scores.top(SHELL_SCAN_MAX_CANDIDATES))
+
+    def _scan_history_source(self, source: str, history_format: str, cwd: Optional[str],
+                             state: dict) -> Tuple[List[Tuple[str, Optional[float]]], bool]:
+        """Return a source's (path, timestamp) candidates newest first, parsing only what is new"""
+        stat = os.stat(source)
+        entry = state["sources"].get(source)
+        changed = False
+        if (not entry or entry.get("inode") != stat.st_ino or entry.get("format") != history_format
+                or stat.st_size < entry.get("offset", 0)):
+            # First scan, or the file was rotated/rewritten/truncated
+            entry = {"inode": stat.st_ino, "format": history_format, "offset": 0,
+                     "candidates": [], "frecency": {}}
+            state["sources"][source] = entry
+            state["generation"] = None  # Scores from the old file are gone; rebuild shell_frecency
+            changed = True
+
+        if history_format == "atuin":
+            # A database is not append-only; checkpoint on the newest command timestamp instead.
+            # New rows usually land in the write-ahead log first, so watch its mtime too.
+            wal_file = f"{source}-wal"
+            mtime = max(stat.st_mtime, os.path.getmtime(wal_file) if os.path.exists(wal_file) else 0)
+            if mtime != entry.get("mtime"):
+                rows = list(read_atuin_history(source, entry.get("since", 0)))
+                if rows:
+                    entry["since"] = rows[-1][0]  # Integer nanoseconds, exactly as atuin stores them
+                self._merge_candidates(entry, [record for _, record in rows])
+                entry["mtime"] = mtime
+                changed = True
+        elif stat.st_size > entry["offset"]:
+            with open(source, 'rb') as f:
+                f.seek(entry["offset"])
+                data = f.read()
+
+            # Leave a partially written (or backslash-continued) last command for the next scan
+            end = data.rfind(b'\n') + 1
+            while end and data[:end].endswith(b'\\\n'):
+                end = data.rfind(b'\n', 0, end - 1) + 1
+            if end:
+                self._merge_candidates(entry, HISTORY_PARSERS[history_format](data[:end], cwd))
+                entry["offset"] += end
+                changed = True
 
+        return [(path, timestamp) for path, timestamp in reversed(entry["candidates"])], changed
+
+    def _history_sources(self) -> List[Tuple[str, str, Optional[str]]]:
+        """(path, format, recorded cwd) for every shell history we should scan, in priority order"""
         # Determine current shell and preferred history
-        preferred_history = self.config.get("history", "preferred_history")
+        preferred_history = self.config.settings.history.preferred_history
         current_shell = preferred_history
 
         if preferred_history == "auto":
             # Try to detect current shell
+            login_shell = os.path.basename(os.environ.get("SHELL", ""))
             if "ZSH_VERSION" in os.environ:
                 current_shell = "zsh"
             elif "BASH_VERSION" in os.environ:
                 current_shell = "bash"
+            elif "FISH_VERSION" in os.environ or login_shell == "fish":
+                current_shell = "fish"
+            elif login_shell == "zsh":
+                current_shell = "zsh"
             else:
                 current_shell = "bash"
 
         history_sources = []
 
+        def add_source(path: str, history_format: str, cwd: str = None, first: bool = False):
+            if path and os.path.isfile(path) and path not in [source for source, _, _ in history_sources]:
+                history_sources.insert(0 if first else len(history_sources), (path, history_format, cwd))
+
+        # atuin records the directory of every command, so it goes first when present
+        atuin_db = os.path.join(os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")),
+                                "atuin", "history.db")
+        if preferred_history in ("auto", "atuin"):
+            add_source(atuin_db, "atuin")
+            if preferred_history == "atuin":
+                return history_sources
+
         # Get history file paths based on shell
         if current_shell == "zsh":
             # ZSH history
-            histfile = os.environ.get("HISTFILE", "")
-            if histfile and os.path.exists(histfile):
-                history_sources.append(histfile)
+            add_source(os.environ.get("HISTFILE", ""), "zsh")
 
             # Check for per-directory-history plugin
             per_dir_hist_base = os.path.expanduser("~/.zsh_history_dirs")
@@ -427,435 +1382,1382 @@ class History:
                 current_dir_hash = hashlib.md5(os.getcwd().encode()).hexdigest()
                 per_dir_hist_file = os.path.join(per_dir_hist_base, current_dir_hash)
 
-                if os.path.exists(per_dir_hist_file):
-                    if self.config.get_bool("history", "prefer_local_history"):
-                        history_sources.insert(0, per_dir_hist_file)
-                    else:
-                        history_sources.append(per_dir_hist_file)
+                # Every command in this file ran in the current directory
+                add_source(per_dir_hist_file, "zsh", os.getcwd(),
+                           first=self.config.settings.history.prefer_local_history)
 
             # Global ZSH history as fallback
-            global_zsh_history = os.path.expanduser("~/.zsh_history")
-            if os.path.exists(global_zsh_history) and global_zsh_history not in history_sources:
-                history_sources.append(global_zsh_history)
+            add_source(os.path.expanduser("~/.zsh_history"), "zsh")
 
         elif current_shell == "bash":
             # Bash history
-            histfile = os.environ.get("HISTFILE", "")
-            if histfile and os.path.exists(histfile):
-                history_sources.append(histfile)
+            add_source(os.environ.get("HISTFILE", ""), "bash")
+            add_source(os.path.expanduser("~/.bash_history"), "bash")
+
+        elif current_shell == "fish":
+            data_home = os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share"))
+            session = os.environ.get("fish_history", "fish") or "fish"
+            add_source(os.path.join(data_home, "fish", f"{session}_history"), "fish")
 
-            bash_history = os.path.expanduser("~/.bash_history")
-            if os.path.exists(bash_history) and bash_history not in history_sources:
-                history_sources.append(bash_history)
+        return history_sources
 
-        # Collect file paths from history sources
-        potential_files = set()
+    def _scan_shell_history(self, history_sources: List[Tuple[str, str, Optional[str]]]) -> List[str]:
+        """Bring every source up to date; returns candidate paths newest first.
 
-        for source in history_sources:
+        New commands are added to shell_frecency as they are parsed. It is only rebuilt from the
+        saved per-source scores when another process (or a rotated file) changed the scan state.
+        """
+        scan_state = self._load_scan_state()
+        sources_key = tuple(source for source, _, _ in history_sources)
+        rebuild = (scan_state.get("generation"), sources_key) != self._shell_generation
+        state_changed = False
+        candidates = []
+        for source, history_format, cwd in history_sources:
             try:
-                with open(source, 'r', errors='ignore') as f:
-                    content = f.read()
-
-                # Extract paths that look like files
-                # Basic pattern for file paths
-                path_pattern = r'(?:^|\s)(/[a-zA-Z0-9._/-]+)'
-                paths = re.findall(path_pattern, content)
-                potential_files.update(paths)
-
-                # Extract filenames with extensions
-                file_pattern = r'(?:^|\s)([a-zA-Z0-9._/-]+\.[a-zA-Z0-9]+)'
-                files = re.findall(file_pattern, content)
-
-                # Convert relative paths to absolute
-                for file in files:
-                    if not file.startswith('/'):
-                        file = os.path.join(os.getcwd(), file)
-                    potential_files.add(file)
-
-                # Extract files used with common commands
-                cmd_pattern = r'(?:cat|nano|vim|vi|emacs|less|more|head|tail|grep|awk|sed)\s+([^\s]+)'
-                cmd_files = re.findall(cmd_pattern, content)
-
-                for file in cmd_files:
-                    if file.startswith('-'):
-                        continue  # Skip command options
-
-                    if not file.startswith('/'):
-                        file = os.path.join(os.getcwd(), file)
-                    potential_files.add(file)
-            except:
-                pass  # Silently ignore errors reading history files
+                source_candidates, source_changed = self._scan_history_source(
+                    source, history_format, cwd, scan_state)
+            except (OSError, ImportError, ValueError):
+                continue  # Silently ignore unreadable history files and databases
+            candidates.extend(path for path, _ in source_candidates)
+            state_changed = state_changed or source_changed
+        rebuild = rebuild or scan_state.get("generation") is None
+
+        if state_changed:
+            scan_state["generation"] = os.urandom(8).hex()
+            self._save_scan_state(scan_state)
+        if rebuild:
+            combined = {}
+            for source in sources_key:
+                for path, score in scan_state["sources"].get(source, {}).get("frecency", {}).items():
+                    combined[path] = _log2_add(combined[path], score) if path in combined else score
+            self.shell_frecency.load(combined)
+        self._shell_generation = (scan_state.get("generation"), sources_key)
+        return candidates
+
+    def ranked(self, count: int = None, cwd: str = None) -> List[str]:
+        """Existing files ranked by frecency across copies and shell history, best first"""
+        if count is None:
+            count = self.config.settings.general.display_count
+
+        self._refresh()
+        boosts = frecency_boosts(cwd)
+
+        def accept(path: str) -> bool:
+            return self.validator.check([path])[path].kind == "file"
+
+        def accept_shell(path: str) -> bool:
+            # Shell history also names executables and system files; offer only what filter_files would
+            return _is_recognized_name(os.path.basename(path)) and accept(path)
+
+        scores = dict(self.frecency.top(count, accept, boosts))
+        if self.config.settings.history.shell_history_scan:
+            self._scan_shell_history(self._history_sources())
+            for path, score in self.shell_frecency.top(count, accept_shell, boosts):
+                scores[path] = _log2_add(scores[path], score) if path in scores else score
+        return sorted(scores, key=scores.get, reverse=True)[:count]
+
+    def extract_files_from_shell_history(self, count: int = None) -> List[str]:
+        """Extract files from shell history"""
+        if count is None:
+            count = self.config.settings.general.display_count
+
+        # Collect file paths from history sources, newest first
+        history_sources = self._history_sources()
+        candidates = self._scan_shell_history(history_sources)
 
         # Fall back to history command if no files found or no history sources
-        if not potential_files and not history_sources:
+        if not candidates and not history_sources:
             try:
                 history_output = subprocess.check_output("history", shell=True, text=True)
-
-                # Extract paths that look like files
-                path_pattern = r'(?:^|\s)(/[a-zA-Z0-9._/-]+)'
-                paths = re.findall(path_pattern, history_output)
-                potential_files.update(paths)
-
-                # Extract filenames with extensions
-                file_pattern = r'(?:^|\s)([a-zA-Z0-9._/-]+\.[a-zA-Z0-9]+)'
-                files = re.findall(file_pattern, history_output)
-                for file in files:
-                    if not file.startswith('/'):
-                        file = os.path.join(os.getcwd(), file)
-                    potential_files.add(file)
-
-                # Extract files used with common commands
-                cmd_pattern = r'(?:cat|nano|vim|vi|emacs|less|more|head|tail|grep|awk|sed)\s+([^\s]+)'
-                cmd_files = re.findall(cmd_pattern, history_output)
-                for file in cmd_files:
-                    if file.startswith('-'):
-                        continue  # Skip command options
-
-                    if not file.startswith('/'):
-                        file = os.path.join(os.getcwd(), file)
-                    potential_files.add(file)
+                records = parse_bash_history(history_output.encode('utf-8'))
+                candidates = [path for record in reversed(list(records)) for path in record.paths]
             except:
                 pass  # Silently ignore errors with history command
 
-        # Filter for existing files with recognized extensions
-        valid_files = []
-        for file in potential_files:
-            if os.path.isfile(file):
-                ext = os.path.splitext(file)[1].lower().lstrip('.')
-
-                # Check if file has recognized extension or is text file
-                is_recognized = ext in FILE_EXTENSIONS
+        # Candidates without a recorded directory are resolved against the one clipbard runs in
+        potential_files = []
+        seen = set()
+        for file in candidates:
+            if not file.startswith('/'):
+                file = os.path.join(os.getcwd(), file)
+            if file not in seen:
+                seen.add(file)
+                potential_files.append(file)
 
-                if not is_recognized:
-                    # Try to determine if it's a text file
-                    try:
-                        mime = mimetypes.guess_type(file)[0]
-                        if mime and ('text' in mime or 'json' in mime or 'xml' in mime):
-                            is_recognized = True
-                    except:
-                        pass
-
-                if is_recognized and file not in valid_files:
-                    valid_files.append(file)
-                    if len(valid_files) >= count:
-                        break
+        # Filter for existing files with recognized extensions
+        valid_files = self.validator.filter_files(potential_files, count)
 
         # If no files found, check current directory
         if not valid_files:
-            for file in os.listdir(os.getcwd()):
-                file_path = os.path.join(os.getcwd(), file)
-                if os.path.isfile(file_path):
-                    ext = os.path.splitext(file_path)[1].lower().lstrip('.')
-                    if ext in FILE_EXTENSIONS:
-                        valid_files.append(file_path)
-                        if len(valid_files) >= count:
-                            break
+            try:
+                with os.scandir(os.getcwd()) as entries:
+                    for entry in entries:
+                        ext = os.path.splitext(entry.name)[1].lower().lstrip('.')
+                        if ext in FILE_EXTENSIONS and entry.is_file():
+                            valid_files.append(entry.path)
+                            if len(valid_files) >= count:
+                                break
+            except OSError:
+                pass
 
         return valid_files
 
 
-# Clipboard manager - No changes needed
-class Clipboard:
-    def __init__(self, config: Config, history: History):
-        self.config = config
-        self.history = history
+# Clipboard backends - one implementation per clipboard tool
+class ClipboardBackend:
+    """Base class for system clipboard access"""
+    name = ""
+    commands: Tuple[str, ...] = ()  # Executables that must be on PATH
+    binary_safe = True  # False if the clipboard only holds text, so binary payloads need armor
 
-    def copy_to_clipboard(self, file_path: str, buffer: int = None) -> bool:
-        """Copy file content to clipboard"""
-        if buffer is None:
-            buffer = self.config.get_int("clipboard", "default_buffer")
+    @classmethod
+    def available(cls) -> bool:
+        return all(shutil.which(cmd) for cmd in cls.commands)
 
-        if not os.path.exists(file_path):
-            return False
+    def copy(self, data: bytes) -> bool:
+        raise NotImplementedError
 
-        # Check file size against max_file_size
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        max_size_mb = self.config.get_int("clipboard", "max_file_size")
+    def paste(self) -> bytes:
+        raise NotImplementedError
 
-        if file_size_mb > max_size_mb:
-            return False  # File too large
+    def copy_file(self, f: BinaryIO) -> bool:
+        """Copy an open file's contents; backends that can read the file directly override this"""
+        if os.fstat(f.fileno()).st_size == 0:
+            return self.copy(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return self.copy(data)
 
-        # Handle compression if enabled
-        if self.config.get_bool("security", "compression") and file_size_mb > 0.1:  # >100KB
-            compressed_file = self._compress_content(file_path)
-            target_file = compressed_file
-        else:
-            target_file = file_path
+    def clear(self) -> bool:
+        return self.copy(b"")
 
-        try:
-            # Read file content
-            with open(target_file, 'rb') as f:
-                content = f.read()
 
-            # Handle encryption if enabled
-            if self.config.get_bool("security", "encryption"):
-                content = self._encrypt_content(content)
+class CommandBackend(ClipboardBackend):
+    """Backend driven by external copy/paste commands"""
+    copy_cmd: List[str] = []
+    paste_cmd: List[str] = []
+    clear_cmd: List[str] = []
 
-            # Copy to clipboard based on platform
-            if sys.platform == 'darwin':  # macOS
-                subprocess.run('pbcopy', input=content, check=True)
-            elif sys.platform == 'win32':  # Windows
-                try:
-                    import win32clipboard
-                    win32clipboard.OpenClipboard()
-                    win32clipboard.EmptyClipboard()
-                    win32clipboard.SetClipboardData(win32clipboard.CF_UNICODETEXT,
-                                                    content.decode('utf-8', errors='replace'))
-                    win32clipboard.CloseClipboard()
-                except ImportError:
-                    return False
-            else:  # Linux/Unix
-                try:
-                    # Try wayland
-                    process = subprocess.Popen(['wl-copy'], stdin=subprocess.PIPE)
-                    process.communicate(input=content)
-                except FileNotFoundError:
-                    try:
-                        # Try X11
-                        process = subprocess.Popen(['xclip', '-selection', 'clipboard'], stdin=subprocess.PIPE)
-                        process.communicate(input=content)
-                    except FileNotFoundError:
-                        return False  # No clipboard utility found
+    def copy(self, data: bytes) -> bool:
+        return subprocess.run(self.copy_cmd, input=data).returncode == 0
 
-            # Handle auto-clear if enabled
-            if self.config.get_bool("clipboard", "auto_clear"):
-                # Schedule auto-clear after 60 seconds
-                def clear_clipboard():
-                    time.sleep(60)
-                    self.clear_clipboard(buffer)
+    def copy_file(self, f: BinaryIO) -> bool:
+        # The tool reads the file itself, so its contents never pass through this process
+        f.seek(0)
+        return subprocess.run(self.copy_cmd, stdin=f).returncode == 0
 
-                import threading
-                import time
-                threading.Thread(target=clear_clipboard, daemon=True).start()
+    def paste(self) -> bytes:
+        return subprocess.run(self.paste_cmd, stdout=subprocess.PIPE, check=True).stdout
 
-            # Update history
-            self.history.add(file_path)
+    def clear(self) -> bool:
+        if self.clear_cmd:
+            return subprocess.run(self.clear_cmd).returncode == 0
+        return self.copy(b"")
 
-            # Show notification if enabled
-            if self.config.get_bool("security", "notification"):
-                self.show_notification("CLIPBARD", f"Copied: {os.path.basename(file_path)}")
 
-            # Clean up temporary compressed file if created
-            if target_file != file_path and os.path.exists(target_file):
-                os.unlink(target_file)
+class WaylandBackend(CommandBackend):
+    name = "wayland"
+    commands = ("wl-copy", "wl-paste")
+    copy_cmd = ["wl-copy"]
+    paste_cmd = ["wl-paste", "--no-newline"]
+    clear_cmd = ["wl-copy", "--clear"]
 
-            return True
-        except Exception as e:
-            print(f"Error copying to clipboard: {e}")
-            return False
 
-    def copy_text_to_clipboard(self, text: str, buffer: int = None) -> bool:
-        """Copy text directly to clipboard"""
-        if buffer is None:
-            buffer = self.config.get_int("clipboard", "default_buffer")
+class XclipBackend(CommandBackend):
+    name = "xclip"
+    commands = ("xclip",)
+    copy_cmd = ["xclip", "-selection", "clipboard"]
+    paste_cmd = ["xclip", "-selection", "clipboard", "-o"]
 
-        # Handle encryption if enabled
-        if self.config.get_bool("security", "encryption"):
-            encrypted_text = self._encrypt_content(text.encode('utf-8'))
-            text = encrypted_text.decode('utf-8', errors='replace')
 
-        try:
-            # Copy to clipboard based on platform
-            if sys.platform == 'darwin':  # macOS
-                subprocess.run('pbcopy', input=text.encode('utf-8'), check=True)
-            elif sys.platform == 'win32':  # Windows
-                try:
-                    import win32clipboard
-                    win32clipboard.OpenClipboard()
-                    win32clipboard.EmptyClipboard()
-                    win32clipboard.SetClipboardData(win32clipboard.CF_UNICODETEXT, text)
-                    win32clipboard.CloseClipboard()
-                except ImportError:
-                    return False
-            else:  # Linux/Unix
-                try:
-                    # Try wayland
-                    process = subprocess.Popen(['wl-copy'], stdin=subprocess.PIPE)
-                    process.communicate(input=text.encode('utf-8'))
-                except FileNotFoundError:
-                    try:
-                        # Try X11
-                        process = subprocess.Popen(['xclip', '-selection', 'clipboard'], stdin=subprocess.PIPE)
-                        process.communicate(input=text.encode('utf-8'))
-                    except FileNotFoundError:
-                        return False  # No clipboard utility found
+class XselBackend(CommandBackend):
+    name = "xsel"
+    commands = ("xsel",)
+    copy_cmd = ["xsel", "--clipboard", "--input"]
+    paste_cmd = ["xsel", "--clipboard", "--output"]
+    clear_cmd = ["xsel", "--clipboard", "--clear"]
 
-            # Handle auto-clear if enabled
-            if self.config.get_bool("clipboard", "auto_clear"):
-                # Schedule auto-clear after 60 seconds
-                def clear_clipboard():
-                    time.sleep(60)
-                    self.clear_clipboard(buffer)
 
-                import threading
-                import time
-                threading.Thread(target=clear_clipboard, daemon=True).start()
+class PbcopyBackend(CommandBackend):
+    name = "pbcopy"
+    commands = ("pbcopy", "pbpaste")
+    copy_cmd = ["pbcopy"]
+    paste_cmd = ["pbpaste"]
 
-            # Show notification if enabled
-            if self.config.get_bool("security", "notification"):
-                self.show_notification("CLIPBARD", "Text copied to clipboard")
 
+class Win32Backend(ClipboardBackend):
+    name = "win32"
+    binary_safe = False
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import win32clipboard
             return True
-        except Exception as e:
-            print(f"Error copying text to clipboard: {e}")
+        except ImportError:
             return False
 
-    def get_clipboard_content(self, buffer: int = None) -> str:
-        """Get clipboard content"""
-        if buffer is None:
-            buffer = self.config.get_int("clipboard", "default_buffer")
+    def copy(self, data: bytes) -> bool:
+        import win32clipboard
+        win32clipboard.OpenClipboard()
+        try:
+            win32clipboard.EmptyClipboard()
+            if data:
+                win32clipboard.SetClipboardData(win32clipboard.CF_UNICODETEXT,
+                                                bytes(data).decode('utf-8', errors='replace'))
+        finally:
+            win32clipboard.CloseClipboard()
+        return True
 
+    def paste(self) -> bytes:
+        import win32clipboard
+        win32clipboard.OpenClipboard()
         try:
-            content = ""
-            if sys.platform == 'darwin':  # macOS
-                content = subprocess.check_output('pbpaste', universal_newlines=True)
-            elif sys.platform == 'win32':  # Windows
-                try:
-                    import win32clipboard
-                    win32clipboard.OpenClipboard()
-                    if win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT):
-                        content = win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT)
-                    win32clipboard.CloseClipboard()
-                except ImportError:
-                    return ""
-            else:  # Linux/Unix
-                try:
-                    # Try wayland
-                    content = subprocess.check_output(['wl-paste'], universal_newlines=True)
-                except FileNotFoundError:
-                    try:
-                        # Try X11
-                        content = subprocess.check_output(['xclip', '-selection', 'clipboard', '-o'],
-                                                          universal_newlines=True)
-                    except FileNotFoundError:
-                        return ""  # No clipboard utility found
-
-            # Handle decryption if needed
-            if self.config.get_bool("security", "encryption") and content.startswith("ENCRYPTED:"):
-                decrypted_content = self._decrypt_content(content[10:].encode('utf-8'))
-                content = decrypted_content.decode('utf-8', errors='replace')
-
-            return content
-        except Exception as e:
-            print(f"Error getting clipboard content: {e}")
-            return ""
+            if win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT):
+                return win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT).encode('utf-8')
+            return b""
+        finally:
+            win32clipboard.CloseClipboard()
 
-    def clear_clipboard(self, buffer: int = None) -> bool:
-        """Clear clipboard"""
-        if buffer is None:
-            buffer = self.config.get_int("clipboard", "default_buffer")
 
-        try:
-            if sys.platform == 'darwin':  # macOS
-                subprocess.run('pbcopy', input=b'', check=True)
-            elif sys.platform == 'win32':  # Windows
-                try:
-                    import win32clipboard
-                    win32clipboard.OpenClipboard()
-                    win32clipboard.EmptyClipboard()
-                    win32clipboard.CloseClipboard()
-                except ImportError:
-                    return False
-            else:  # Linux/Unix
-                try:
-                    # Try wayland
-                    process = subprocess.Popen(['wl-copy', '--clear'])
-                    process.wait()
-                except FileNotFoundError:
-                    try:
-                        # Try X11
-                        process = subprocess.Popen(['xclip', '-selection', 'clipboard'], stdin=subprocess.PIPE)
-                        process.communicate(input=b'')
-                    except FileNotFoundError:
-                        return False  # No clipboard utility found
+class FileBackend(ClipboardBackend):
+    """Stand-in clipboard stored in a plain file, for headless machines and tests"""
+    name = "file"
 
-            return True
-        except Exception as e:
-            print(f"Error clearing clipboard: {e}")
-            return False
+    def __init__(self, path: str = None):
+        self.path = path or os.environ.get("CLIPBARD_CLIPBOARD_FILE") or FILE_BACKEND_PATH
 
-    def show_notification(self, title: str, message: str) -> bool:
-        """Show notification"""
-        if not self.config.get_bool("security", "notification"):
-            return False
+    @classmethod
+    def available(cls) -> bool:
+        return True
 
-        try:
-            if sys.platform == 'darwin':  # macOS
-                subprocess.run([
-                    'osascript', '-e',
-                    f'display notification "{message}" with title "{title}"'
-                ])
-            elif sys.platform == 'win32':  # Windows
-                try:
-                    from win10toast import ToastNotifier
-                    toaster = ToastNotifier()
-                    toaster.show_toast(title, message, duration=3)
-                except ImportError:
-                    return False
-            else:  # Linux/Unix
-                try:
-                    subprocess.run(['notify-send', '-a', 'CLIPBARD', title, message])
-                except FileNotFoundError:
-                    return False
+    def copy(self, data: bytes) -> bool:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        return True
 
+    def copy_file(self, f: BinaryIO) -> bool:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        f.seek(0)
+        with open(self.path, 'wb') as out:
+            shutil.copyfileobj(f, out, COPY_CHUNK_SIZE)
+        return True
+
+    def paste(self) -> bytes:
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return b""
+
+
+CLIPBOARD_BACKENDS = {
+    backend.name: backend
+    for backend in (WaylandBackend, XclipBackend, XselBackend, PbcopyBackend, Win32Backend, FileBackend)
+}
+
+# Backend chosen for this process, keyed by the requested name
+_backend_cache: Dict[str, ClipboardBackend] = {}
+
+
+def _backend_environment() -> str:
+    """Signature of the session the cached detection result belongs to"""
+    return "|".join([sys.platform, os.environ.get("WAYLAND_DISPLAY", ""), os.environ.get("DISPLAY", "")])
+
+
+def _detect_backend_name() -> Optional[str]:
+    """Probe PATH for a usable clipboard tool"""
+    if sys.platform == 'darwin':
+        candidates = ["pbcopy"]
+    elif sys.platform == 'win32':
+        candidates = ["win32"]
+    elif os.environ.get("WAYLAND_DISPLAY"):
+        candidates = ["wayland", "xclip", "xsel"]
+    else:
+        candidates = ["xclip", "xsel", "wayland"]
+
+    for name in candidates:
+        if CLIPBOARD_BACKENDS[name].available():
+            return name
+    return None
+
+
+def get_backend(preferred: str = DEFAULT_CLIPBOARD_BACKEND, refresh: bool = False) -> Optional[ClipboardBackend]:
+    """Return the clipboard backend, detecting it at most once per process"""
+    preferred = os.environ.get("CLIPBARD_BACKEND") or preferred or DEFAULT_CLIPBOARD_BACKEND
+    if not refresh and preferred in _backend_cache:
+        return _backend_cache[preferred]
+
+    if preferred != "auto":
+        backend_class = CLIPBOARD_BACKENDS.get(preferred)
+        name = preferred if backend_class and backend_class.available() else None
+    else:
+        # Reuse the last detection for this session so we don't walk PATH on every run
+        name = None
+        environment = _backend_environment()
+        if not refresh:
+            try:
+                with open(BACKEND_CACHE_FILE, 'r') as f:
+                    cached = json.load(f)
+                if cached.get("environment") == environment and cached.get("name") in CLIPBOARD_BACKENDS:
+                    name = cached["name"]
+            except (OSError, ValueError):
+                pass
+
+        if name is None:
+            name = _detect_backend_name()
+            if name:
+                try:
+                    os.makedirs(CONFIG_DIR, exist_ok=True)
+                    with open(BACKEND_CACHE_FILE, 'w') as f:
+                        json.dump({"name": name, "environment": environment}, f)
+                except OSError:
+                    pass
+
+    backend = CLIPBOARD_BACKENDS[name]() if name else None
+    _backend_cache[preferred] = backend
+    return backend
+
+
+# Compression codecs - streaming compressors for clipboard payloads
+class CompressionCodec:
+    """Base class for a compression format usable as a copy stage"""
+    name = ""
+    default_level = 0
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def compressor(self, level: int):
+        """Object with compress(bytes) and flush() returning compressed bytes"""
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class GzipCodec(CompressionCodec):
+    name = "gzip"
+    default_level = 6
+
+    def compressor(self, level: int):
+        import zlib
+        return zlib.compressobj(level, zlib.DEFLATED, 31)  # gzip container
+
+    def decompress(self, data: bytes) -> bytes:
+        import zlib
+        return zlib.decompress(data, 31)
+
+
+class LzmaCodec(CompressionCodec):
+    name = "lzma"
+    default_level = 6
+
+    def compressor(self, level: int):
+        import lzma
+        return lzma.LZMACompressor(preset=level)
+
+    def decompress(self, data: bytes) -> bytes:
+        import lzma
+        return lzma.decompress(data)
+
+
+class ZstdCodec(CompressionCodec):
+    """Zstandard, from the standard library (3.14+) or the zstandard package"""
+    name = "zstd"
+    default_level = 3
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            from compression import zstd
+            return True
+        except ImportError:
+            pass
+        try:
+            import zstandard
             return True
+        except ImportError:
+            return False
+
+    def compressor(self, level: int):
+        try:
+            from compression import zstd
+            return zstd.ZstdCompressor(level=level)
+        except ImportError:
+            import zstandard
+            return zstandard.ZstdCompressor(level=level).compressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        try:
+            from compression import zstd
+            return zstd.decompress(data)
+        except ImportError:
+            import zstandard
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+COMPRESSION_CODECS = {codec.name: codec for codec in (GzipCodec, LzmaCodec, ZstdCodec)}
+
+
+def get_codec(name: str) -> CompressionCodec:
+    """Codec by name, falling back to gzip when it is unknown or its module is missing"""
+    codec_class = COMPRESSION_CODECS.get(name)
+    if codec_class is None or not codec_class.available():
+        show_message(f"Compression codec '{name}' is not available, using {DEFAULT_COMPRESSION_CODEC}", "warning")
+        codec_class = COMPRESSION_CODECS[DEFAULT_COMPRESSION_CODEC]
+    return codec_class()
+
+
+def compress_stream(chunks: Iterator[bytes], codec: CompressionCodec, level: int = DEFAULT_COMPRESSION_LEVEL) -> Iterator[bytes]:
+    """Compress chunks behind a COMPRESSION_HEADER, or pass them through unchanged if a sample
+    of the first chunk shows the data does not compress (archives, images, media)"""
+    import zlib
+    chunks = iter(chunks)
+    first = next(chunks, b"")
+    sample = first[:COMPRESSION_SAMPLE_SIZE]
+    if not sample or len(zlib.compress(sample, 1)) > len(sample) * (1 - COMPRESSION_MIN_SAVING):
+        yield first
+        yield from chunks
+        return
+
+    yield COMPRESSION_HEADER + codec.name.encode('ascii') + b"\n"
+    compressor = codec.compressor(codec.default_level if level < 0 else level)
+    for chunk in chain([first], chunks):
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def decompress_payload(data: bytes) -> bytes:
+    """Undo compress_stream; data without a COMPRESSION_HEADER is returned as is"""
+    if not data.startswith(COMPRESSION_HEADER):
+        return data
+    header_end = data.index(b"\n", len(COMPRESSION_HEADER))
+    name = data[len(COMPRESSION_HEADER):header_end].decode('ascii')
+    codec_class = COMPRESSION_CODECS.get(name)
+    if codec_class is None or not codec_class.available():
+        raise ValueError(f"Clipboard content uses unavailable compression codec '{name}'")
+    return codec_class().decompress(data[header_end + 1:])
+
+
+# Encryption - chunked AES-GCM under a passphrase-derived key cached for the session
+_ENCRYPTION_HEADER = struct.Struct("5s16s7s")  # Magic, KDF salt, nonce prefix
+_ENCRYPTION_TAG_SIZE = 16
+
+# Derived keys by salt; a running daemon keeps them for the whole session
+_key_cache: Dict[bytes, bytes] = {}
+_passphrase_prompt = False  # Whether a missing passphrase may be asked for on the terminal
+
+
+def allow_passphrase_prompt(allowed: bool = True):
+    """Only the interactive CLI allows it: the TUI owns the terminal, and daemon threads have nobody to ask"""
+    global _passphrase_prompt
+    _passphrase_prompt = allowed
+
+
+def _aead(key: bytes):
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError:
+        raise ValueError("Encryption requires the 'cryptography' package (pip install cryptography)")
+    return AESGCM(key)
+
+
+def _encryption_salt() -> bytes:
+    """This installation's KDF salt, created on first use"""
+    try:
+        with open(ENCRYPTION_SALT_FILE, 'rb') as f:
+            salt = f.read()
+        if len(salt) == 16:
+            return salt
+    except FileNotFoundError:
+        pass
+    salt = os.urandom(16)
+    write_atomic(ENCRYPTION_SALT_FILE, salt)
+    return salt
+
+
+def _encryption_passphrase() -> bytes:
+    """Passphrase from CLIPBARD_PASSPHRASE, the keyring package, or the terminal (CLI only)"""
+    passphrase = os.environ.get("CLIPBARD_PASSPHRASE")
+    if not passphrase:
+        try:
+            import keyring
+            passphrase = keyring.get_password("clipbard", "passphrase")
+        except Exception:
+            passphrase = None
+    if not passphrase and _passphrase_prompt and sys.stdin.isatty():
+        import getpass
+        passphrase = getpass.getpass("Clipbard passphrase: ")
+    if not passphrase:
+        raise ValueError("No encryption passphrase: set CLIPBARD_PASSPHRASE or store one with keyring "
+                         "(service 'clipbard', user 'passphrase')")
+    return passphrase.encode('utf-8')
+
+
+def _kernel_keyring(salt: bytes, key: bytes = None) -> Optional[bytes]:
+    """Look up (or, given key, store) a derived key in the kernel user keyring via keyctl"""
+    if not shutil.which("keyctl"):
+        return None
+    description = f"clipbard:{salt.hex()}"
+    try:
+        if key is None:
+            found = subprocess.run(["keyctl", "search", "@u", "user", description],
+                                   capture_output=True, text=True)
+            if found.returncode != 0:
+                return None
+            key = subprocess.run(["keyctl", "pipe", found.stdout.strip()],
+                                 capture_output=True, check=True).stdout
+            return key if len(key) == 32 else None
+        added = subprocess.run(["keyctl", "padd", "user", description, "@u"],
+                               input=key, capture_output=True, check=True)
+        subprocess.run(["keyctl", "timeout", added.stdout.decode().strip(), str(KEY_CACHE_TTL)],
+                       capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return None
+
+
+def encryption_key(salt: bytes, refresh: bool = False) -> bytes:
+    """Key for salt, derived with scrypt only when neither this process nor the kernel keyring has it"""
+    key = None if refresh else _key_cache.get(salt) or _kernel_keyring(salt)
+    if key is None:
+        key = hashlib.scrypt(_encryption_passphrase(), salt=salt, n=2 ** 15, r=8, p=1,
+                             maxmem=64 * 1024 * 1024, dklen=32)
+        _kernel_keyring(salt, key)
+    _key_cache[salt] = key
+    return key
+
+
+def _record_nonce(prefix: bytes, counter: int, last: bool) -> bytes:
+    # STREAM construction: a final-record flag stops truncation at a record boundary going unnoticed
+    return prefix + counter.to_bytes(4, 'big') + (b"\x01" if last else b"\x00")
+
+
+def encrypt_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Seal chunks as a header followed by AES-GCM records of ENCRYPTION_CHUNK_SIZE plaintext bytes"""
+    salt = _encryption_salt()
+    aead = _aead(encryption_key(salt))
+    prefix = os.urandom(7)
+    header = _ENCRYPTION_HEADER.pack(ENCRYPTION_MAGIC, salt, prefix)
+    yield header
+
+    counter = 0
+    pending = b""
+    for chunk in chunks:
+        data = memoryview(pending + chunk if pending else chunk)
+        start = 0
+        # Hold back the last full record until we know whether more data follows
+        while len(data) - start > ENCRYPTION_CHUNK_SIZE:
+            yield aead.encrypt(_record_nonce(prefix, counter, False),
+                               data[start:start + ENCRYPTION_CHUNK_SIZE], header)
+            start += ENCRYPTION_CHUNK_SIZE
+            counter += 1
+        pending = bytes(data[start:])
+    yield aead.encrypt(_record_nonce(prefix, counter, True), pending, header)
+
+
+def decrypt_payload(data: bytes) -> bytes:
+    """Open a payload made by encrypt_stream; raises ValueError for a wrong key or tampered data"""
+    if len(data) < _ENCRYPTION_HEADER.size + _ENCRYPTION_TAG_SIZE:
+        raise ValueError("Encrypted clipboard content is truncated")
+    header = bytes(data[:_ENCRYPTION_HEADER.size])
+    _, salt, prefix = _ENCRYPTION_HEADER.unpack(header)
+    body = memoryview(data)[_ENCRYPTION_HEADER.size:]
+    from cryptography.exceptions import InvalidTag
+
+    key = _key_cache.get(salt) or _kernel_keyring(salt)
+    if key is not None:
+        try:
+            return _open_records(_aead(key), header, prefix, body)
+        except InvalidTag:
+            pass  # Cached from an earlier passphrase; derive again from the current one
+    try:
+        return _open_records(_aead(encryption_key(salt, refresh=True)), header, prefix, body)
+    except InvalidTag:
+        raise ValueError("Cannot decrypt clipboard content: wrong passphrase or corrupted data")
+
+
+def _open_records(aead, header: bytes, prefix: bytes, body: memoryview) -> bytes:
+    record_size = ENCRYPTION_CHUNK_SIZE + _ENCRYPTION_TAG_SIZE
+    plain = []
+    for counter, start in enumerate(range(0, len(body), record_size)):
+        last = start + record_size >= len(body)
+        plain.append(aead.decrypt(_record_nonce(prefix, counter, last), body[start:start + record_size], header))
+    return b"".join(plain)
+
+
+def armor_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Base85-encode chunks behind ENCRYPTION_ARMOR, for clipboards that only carry text"""
+    import base64
+    yield ENCRYPTION_ARMOR
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        whole = len(pending) - len(pending) % 4  # base85 maps 4 bytes to 5 without padding
+        yield base64.b85encode(pending[:whole])
+        pending = pending[whole:]
+    if pending:
+        yield base64.b85encode(pending)
+
+
+def dearmor(data: bytes) -> bytes:
+    """Undo armor_stream"""
+    import base64
+    return base64.b85decode(bytes(data[len(ENCRYPTION_ARMOR):]))
+
+
+# Buffer store - content-addressed blobs for clipboard buffers 0-9 and named buffers
+class BufferStore:
+    """Keeps every buffer's payload as a deduplicated blob under BUFFER_DIR"""
+
+    def __init__(self, config: Config, root: str = None):
+        self.config = config
+        self.root = root or BUFFER_DIR
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.index_file = os.path.join(self.root, "index.json")
+        self.lock_file = os.path.join(self.root, "index.lock")
+        self._index = None
+        self._index_mtime = None
+
+    @staticmethod
+    def normalize(buffer: Union[int, str]) -> str:
+        """Validate a buffer number or name and return its index key"""
+        name = str(buffer).strip()
+        if not re.fullmatch(r'[A-Za-z0-9_-]{1,64}', name):
+            raise ValueError(f"Invalid buffer name: {buffer!r}")
+        return name
+
+    def _load_index(self, refresh: bool = False) -> dict:
+        """Read the index, reusing the cached copy while the file is unchanged"""
+        try:
+            mtime = os.stat(self.index_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if refresh or self._index is None or mtime != self._index_mtime:
+            index = {"active": None, "buffers": {}}
+            if mtime is not None:
+                try:
+                    with open(self.index_file, 'r') as f:
+                        index.update(json.load(f))
+                except (OSError, ValueError):
+                    pass
+            self._index = index
+            self._index_mtime = mtime
+        return self._index
+
+    def _save_index(self, index: dict):
+        """Write the index atomically"""
+        write_atomic(self.index_file, json.dumps(index).encode('utf-8'))
+        self._index = index
+        self._index_mtime = os.stat(self.index_file).st_mtime_ns
+
+    @contextmanager
+    def _update_index(self):
+        """Re-read the index under the store lock and save it when the block completes"""
+        with file_lock(self.lock_file):
+            index = self._load_index(refresh=True)  # mtimes are too coarse to trust here
+            yield index
+            self._save_index(index)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest)
+
+    @property
+    def active(self) -> str:
+        """Buffer currently mirrored to the system clipboard"""
+        active = self._load_index().get("active")
+        if active is None:
+            active = self.normalize(self.config.settings.clipboard.default_buffer)
+        return active
+
+    def set_active(self, buffer: Union[int, str]):
+        name = self.normalize(buffer)
+        with self._update_index() as index:
+            index["active"] = name
+
+    def buffers(self) -> Dict[str, dict]:
+        """Metadata for every stored buffer"""
+        return dict(self._load_index()["buffers"])
+
+    def _make_dirs(self):
+        """Create the store's directories, readable by the current user only"""
+        for path in (self.root, self.blob_dir):
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            os.chmod(path, 0o700)  # Also tightens directories made by older versions
+
+    def store(self, buffer: Union[int, str], data: bytes, source: str = None) -> str:
+        """Store data in a buffer and return its content hash"""
+        f, digest = self._store(buffer, [data], source)
+        f.close()
+        return digest
+
+    def store_stream(self, buffer: Union[int, str], chunks: Iterator[bytes], source: str = None) -> BinaryIO:
+        """Store chunks in a buffer, hashing them as they are written.
+
+        Returns the stored blob opened for reading, for the caller to close. It stays
+        readable even if the buffer is cleared or replaced before the caller is done.
+        """
+        return self._store(buffer, chunks, source)[0]
+
+    def _store(self, buffer: Union[int, str], chunks: Iterator[bytes], source: Optional[str]) -> Tuple[BinaryIO, str]:
+        name = self.normalize(buffer)
+        self._make_dirs()
+        # Until it is recorded the payload is a .tmp file, which garbage collection leaves
+        # alone while the process that is writing it is alive
+        temp_file = os.path.join(self.blob_dir, f"{os.getpid()}-{threading.get_ident()}.tmp")
+        f = os.fdopen(os.open(temp_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600), 'w+b')
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+            f.flush()
+            digest = digest.hexdigest()
+
+            # The blob takes its final name in the same locked update that records it, so
+            # garbage collection never sees it unreferenced
+            with self._update_index() as index:
+                blob = self._blob_path(digest)
+                if os.path.exists(blob):
+                    # Identical payloads share one blob
+                    existing = open(blob, 'rb')
+                    f.close()
+                    os.unlink(temp_file)
+                    f = existing
+                else:
+                    os.replace(temp_file, blob)  # f keeps reading the same inode
+                    f.seek(0)
+                now = time.time()
+                index["buffers"][name] = {
+                    "blob": digest, "size": size, "source": source, "stored": now, "accessed": now
+                }
+                self._evict(index, keep=name)
+                self._collect_garbage(index)
+        except BaseException:
+            f.close()
+            if os.path.exists(temp_file):
+                os.unlink(temp_file)
+            raise
+        return f, digest
+
+    def load(self, buffer: Union[int, str]) -> Optional[Union[mmap.mmap, bytes]]:
+        """Memory-map a buffer's blob; returns None for an empty buffer slot"""
+        name = self.normalize(buffer)
+        with self._update_index() as index:
+            entry = index["buffers"].get(name)
+            if entry is None:
+                return None
+
+            try:
+                with open(self._blob_path(entry["blob"]), 'rb') as f:
+                    if entry["size"] == 0:
+                        data = b""
+                    else:
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except FileNotFoundError:
+                del index["buffers"][name]
+                return None
+
+            entry["accessed"] = time.time()
+        return data
+
+    def remove(self, buffer: Union[int, str], digest: str = None) -> bool:
+        """Drop a buffer (only while it holds digest, if given) and delete its blob right
+        away unless another buffer references it"""
+        name = self.normalize(buffer)
+        with self._update_index() as index:
+            entry = index["buffers"].get(name)
+            if entry is None or digest is not None and entry["blob"] != digest:
+                return False
+            del index["buffers"][name]
+            self._collect_garbage(index)
+        return True
+
+    def discard(self, digest: str):
+        """Delete a blob now if no buffer references it"""
+        with file_lock(self.lock_file):
+            if digest not in self._referenced(self._load_index(refresh=True)):
+                try:
+                    os.unlink(self._blob_path(digest))
+                except OSError:
+                    pass
+
+    def _evict(self, index: dict, keep: str):
+        """Evict least recently used buffers until the store fits its quota"""
+        quota = self.config.settings.clipboard.buffer_quota * 1024 * 1024
+        protected = {keep, index.get("active") or self.active}
+
+        def total_size() -> int:
+            blobs = {entry["blob"]: entry["size"] for entry in index["buffers"].values()}
+            return sum(blobs.values())
+
+        candidates = sorted(
+            (name for name in index["buffers"] if name not in protected),
+            key=lambda name: index["buffers"][name]["accessed"]
+        )
+        while candidates and total_size() > quota:
+            del index["buffers"][candidates.pop(0)]
+
+    @staticmethod
+    def _referenced(index: dict) -> set:
+        return {entry["blob"] for entry in index["buffers"].values()}
+
+    def _collect_garbage(self, index: dict):
+        """Delete blobs that no buffer references any more (called under the store lock).
+
+        Blobs are only renamed into place under the same lock, so anything unreferenced here
+        is garbage. Temp files are kept while the process writing them is alive.
+        """
+        referenced = self._referenced(index)
+        try:
+            blob_names = os.listdir(self.blob_dir)
+        except FileNotFoundError:
+            return
+        for blob_name in blob_names:
+            if blob_name.endswith(".tmp"):
+                writer = blob_name.split("-", 1)[0]
+                if not writer.isdigit() or int(writer) == os.getpid() or _process_alive(int(writer)):
+                    continue
+            elif blob_name in referenced:
+                continue
+            try:
+                os.unlink(self._blob_path(blob_name))
+            except OSError:
+                pass
+
+
+# Notifier - Desktop notifications, shown from a background thread
+class Notifier:
+    """Fire-and-forget desktop notifications.
+
+    post() only queues the message; a single thread waits NOTIFY_COALESCE_WINDOW for more
+    and shows the burst as one notification. On Linux it is sent over a session bus
+    connection that is kept open (needs the optional jeepney package), replacing the
+    previous clipbard notification, or else through notify-send.
+    """
+
+    _shared = None
+
+    def __init__(self):
+        self._pending: List[Tuple[str, str]] = []
+        self._deadline = 0.0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._bus = None  # Open session bus connection; False once found unusable
+        self._replaces_id = 0  # Id of our last notification, replaced by the next one
+        atexit.register(self.flush)
+
+    @classmethod
+    def shared(cls) -> "Notifier":
+        """Process-wide instance, so every copy shares one thread and one bus connection"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def post(self, title: str, message: str):
+        with self._condition:
+            if not self._pending:
+                self._deadline = time.monotonic() + NOTIFY_COALESCE_WINDOW
+            self._pending.append((title, message))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self):
+        """Show anything still queued without waiting on the notification daemon (at exit)"""
+        with self._condition:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._show(*self._summarize(batch), wait=False)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending or time.monotonic() < self._deadline:
+                    self._condition.wait(self._deadline - time.monotonic() if self._pending else None)
+                batch, self._pending = self._pending, []
+            try:
+                self._show(*self._summarize(batch), wait=True)
+            except Exception as e:
+                show_message(f"Error showing notification: {e}", "warning")
+
+    @staticmethod
+    def _summarize(batch: List[Tuple[str, str]]) -> Tuple[str, str]:
+        title, message = batch[-1]
+        if len(batch) > 1:
+            message = f"{message} (+{len(batch) - 1} more)"
+        return title, message
+
+    def _show(self, title: str, message: str, wait: bool):
+        if sys.platform == 'darwin':  # macOS
+            self._spawn([
+                'osascript', '-e', 'on run argv',
+                '-e', 'display notification (item 2 of argv) with title (item 1 of argv)',
+                '-e', 'end run', title, message
+            ], wait)
+        elif sys.platform == 'win32':  # Windows
+            try:
+                from win10toast import ToastNotifier
+            except ImportError:
+                return
+            ToastNotifier().show_toast(title, message, duration=NOTIFY_EXPIRE_MS // 1000, threaded=True)
+        elif not self._send_dbus(title, message, wait):  # Linux/Unix
+            self._spawn(['notify-send', '-a', 'CLIPBARD', '-t', str(NOTIFY_EXPIRE_MS), title, message], wait)
+
+    def _send_dbus(self, title: str, message: str, wait: bool) -> bool:
+        """Call org.freedesktop.Notifications.Notify on the session bus; False if unavailable"""
+        if self._bus is False:
+            return False
+        try:
+            from jeepney import DBusAddress, new_method_call
+            from jeepney.io.blocking import open_dbus_connection
+            from jeepney.wrappers import unwrap_msg
+        except ImportError:
+            self._bus = False
+            return False
+
+        try:
+            if self._bus is None:
+                self._bus = open_dbus_connection(bus='SESSION')
+            notifications = DBusAddress('/org/freedesktop/Notifications',
+                                        bus_name='org.freedesktop.Notifications',
+                                        interface='org.freedesktop.Notifications')
+            call = new_method_call(notifications, 'Notify', 'susssasa{sv}i', (
+                'CLIPBARD', self._replaces_id, '', title, message, [], {}, NOTIFY_EXPIRE_MS
+            ))
+            if wait:
+                self._replaces_id = unwrap_msg(self._bus.send_and_get_reply(call, timeout=NOTIFY_TIMEOUT))[0]
+            else:
+                self._bus.send(call)
+            return True
+        except Exception:
+            # No session bus or no notification daemon on it; stop trying for this process
+            if self._bus:
+                self._bus.close()
+            self._bus = False
+            return False
+
+    @staticmethod
+    def _spawn(command: List[str], wait: bool):
+        """Run a notification command in its own session, reaping it unless we are exiting"""
+        try:
+            process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL, start_new_session=True)
+        except FileNotFoundError:
+            return
+        if wait:
+            try:
+                process.wait(timeout=NOTIFY_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                pass
+
+
+# Clipboard manager - No changes needed
+class Clipboard:
+    def __init__(self, config: Config, history: History):
+        self.config = config
+        self.history = history
+        self.buffers = BufferStore(config)
+        self.scheduler: Optional["ClearScheduler"] = None  # Set in the process that runs auto-clears
+
+    @property
+    def backend(self) -> Optional[ClipboardBackend]:
+        """System clipboard backend (detected once per process)"""
+        return get_backend(self.config.settings.clipboard.backend)
+
+    def _backend_call(self, operation: str, *args):
+        """Run a backend operation, re-detecting once if the cached tool has vanished"""
+        backend = self.backend
+        if backend is None:
+            raise FileNotFoundError("No clipboard utility found")
+        try:
+            return getattr(backend, operation)(*args)
+        except FileNotFoundError:
+            backend = get_backend(self.config.settings.clipboard.backend, refresh=True)
+            if backend is None:
+                raise
+            return getattr(backend, operation)(*args)
+
+    def _resolve_buffer(self, buffer: Union[int, str, None]) -> str:
+        """Buffer name to use, defaulting to the active buffer"""
+        if buffer is None:
+            return self.buffers.active
+        return self.buffers.normalize(buffer)
+
+    def _publish(self, buffer: str, content: bytes, source: str = None) -> bool:
+        """Store content in a buffer, pushing it to the system clipboard only if it is active"""
+        self.buffers.store(buffer, content, source)
+        if buffer != self.buffers.active:
+            return True
+        return bool(self._backend_call("copy", content))
+
+    def _publish_stream(self, buffer: str, chunks: Iterator[bytes], source: str = None) -> bool:
+        """Like _publish, but content arrives in chunks and the backend reads the stored blob"""
+        with self.buffers.store_stream(buffer, chunks, source) as blob:
+            if buffer != self.buffers.active:
+                return True
+            return bool(self._backend_call("copy_file", blob))
+
+    def select_buffer(self, buffer: Union[int, str]) -> bool:
+        """Make a buffer active and mirror its content to the system clipboard"""
+        try:
+            buffer = self.buffers.normalize(buffer)
+            self.buffers.set_active(buffer)
+            content = self.buffers.load(buffer)
+            if content is None:
+                return bool(self._backend_call("clear"))
+            try:
+                return bool(self._backend_call("copy", content))
+            finally:
+                if isinstance(content, mmap.mmap):
+                    content.close()
         except Exception as e:
-            print(f"Error showing notification: {e}")
+            show_message(f"Error switching buffer: {e}")
             return False
 
-    def _compress_content(self, file_path: str) -> str:
-        """Compress file content"""
-        import gzip
-        output_file = os.path.join(TMP_DIR, f"{os.path.basename(file_path)}.gz")
+    def copy_to_clipboard(self, file_path: str, buffer: Union[int, str] = None) -> bool:
+        """Copy file content to clipboard"""
+        settings = self.config.settings
+        try:
+            file_size_mb = os.stat(file_path).st_size / (1024 * 1024)
+        except OSError:
+            return False
+
+        # Check file size against max_file_size
+        if file_size_mb > settings.clipboard.max_file_size:
+            return False  # File too large
 
         try:
-            with open(file_path, 'rb') as f_in:
-                with gzip.open(output_file, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            return output_file
+            # Stream the file through the enabled transforms in fixed-size chunks
+            content = self._read_chunks(file_path)
+
+            # Handle compression if enabled
+            if settings.security.compression and file_size_mb * 1024 * 1024 > COMPRESSION_MIN_SIZE:
+                content = compress_stream(content, get_codec(settings.security.compression_codec),
+                                          settings.security.compression_level)
+
+            # Handle encryption if enabled
+            if settings.security.encryption:
+                content = self._encrypt_stage(content)
+
+            buffer = self._resolve_buffer(buffer)
+            if not self._publish_stream(buffer, content, file_path):
+                return False
+
+            # Handle auto-clear if enabled
+            if settings.clipboard.auto_clear:
+                self._auto_clear(buffer)
+
+            # Update history
+            self.history.add(file_path)
+
+            # Show notification if enabled
+            if settings.security.notification:
+                self.show_notification("CLIPBARD", f"Copied: {os.path.basename(file_path)}")
+
+            return True
         except Exception as e:
-            print(f"Error compressing file: {e}")
-            return file_path
+            show_message(f"Error copying to clipboard: {e}")
+            return False
 
-    def _encrypt_content(self, content: bytes) -> bytes:
-        """Encrypt content"""
+    def copy_text_to_clipboard(self, text: str, buffer: Union[int, str] = None) -> bool:
+        """Copy text directly to clipboard"""
+        settings = self.config.settings
         try:
-            # Simple encryption (not secure, for demo purposes)
-            # In a real implementation, use proper encryption with a user password
-            import base64
-            return b"ENCRYPTED:" + base64.b64encode(content)
+            content = text.encode('utf-8')
+
+            # Handle encryption if enabled
+            if settings.security.encryption:
+                content = b"".join(self._encrypt_stage([content]))
+
+            buffer = self._resolve_buffer(buffer)
+            if not self._publish(buffer, content):
+                return False
+
+            # Handle auto-clear if enabled
+            if settings.clipboard.auto_clear:
+                self._auto_clear(buffer)
+
+            # Show notification if enabled
+            if settings.security.notification:
+                self.show_notification("CLIPBARD", "Text copied to clipboard")
+
+            return True
         except Exception as e:
-            print(f"Error encrypting content: {e}")
-            return content
+            show_message(f"Error copying text to clipboard: {e}")
+            return False
 
-    def _decrypt_content(self, content: bytes) -> bytes:
-        """Decrypt content"""
+    def get_clipboard_content(self, buffer: Union[int, str] = None) -> str:
+        """Get clipboard content"""
         try:
-            # Simple decryption (not secure, for demo purposes)
-            import base64
-            return base64.b64decode(content)
+            buffer = self._resolve_buffer(buffer)
+            if buffer == self.buffers.active:
+                # The system clipboard may have changed outside clipbard
+                content = self._backend_call("paste")
+            else:
+                data = self.buffers.load(buffer)
+                if data is None:
+                    return ""
+                content = data[:]
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+            # Encrypted payloads are recognised by their header, even with encryption now off
+            content = self._decrypt_content(content)
+
+            # Compressed copies carry a header naming their codec
+            return decompress_payload(content).decode('utf-8', errors='replace')
+        except Exception as e:
+            show_message(f"Error getting clipboard content: {e}")
+            return ""
+
+    def clear_timeout(self, buffer: str) -> int:
+        """Seconds before an auto-clear of buffer; 0 disables it for that buffer"""
+        settings = self.config.settings
+        return settings.auto_clear.get(buffer, settings.clipboard.auto_clear_timeout)
+
+    def _auto_clear(self, buffer: str):
+        """Arrange for what was just copied to buffer to be cleared after its timeout"""
+        timeout = self.clear_timeout(buffer)
+        entry = self.buffers.buffers().get(buffer)
+        if timeout > 0 and entry is not None:
+            self.schedule_clear(buffer, entry["blob"], timeout)
+
+    def schedule_clear(self, buffer: str, digest: str, timeout: float) -> bool:
+        """Queue an auto-clear with the daemon, starting one if needed, so it outlives this process"""
+        if self.scheduler is None:
+            client = DaemonClient()
+            response = client.request("schedule_clear", buffer=buffer, digest=digest, timeout=timeout)
+            if response is None and start_background_daemon(buffer, digest, time.time() + timeout):
+                return True  # The new daemon schedules the clear itself once it is up
+            if response and response.get("ok"):
+                return True
+            # No daemon; the clear happens only if this process is still running by then
+            self.scheduler = ClearScheduler(self)
+        self.scheduler.schedule(buffer, digest, timeout)
+        return True
+
+    def expire(self, buffer: str, digest: str) -> bool:
+        """Auto-clear buffer, but only while it (and the system clipboard) still hold digest"""
+        try:
+            if not self.buffers.remove(buffer, digest):
+                self.buffers.discard(digest)  # Cleared or replaced since; don't leave the payload behind
+                return False
+            if buffer != self.buffers.active:
+                return True
+            if hashlib.sha256(self._backend_call("paste")).hexdigest() != digest:
+                return False  # Something else was copied outside clipbard; leave it
+            return bool(self._backend_call("clear"))
+        except Exception as e:
+            show_message(f"Error auto-clearing clipboard: {e}")
+            return False
+
+    def clear_clipboard(self, buffer: Union[int, str] = None) -> bool:
+        """Clear clipboard"""
+        try:
+            buffer = self._resolve_buffer(buffer)
+            self.buffers.remove(buffer)
+            if buffer != self.buffers.active:
+                return True
+            return bool(self._backend_call("clear"))
         except Exception as e:
-            print(f"Error decrypting content: {e}")
-            return content
+            show_message(f"Error clearing clipboard: {e}")
+            return False
+
+    def show_notification(self, title: str, message: str) -> bool:
+        """Queue a desktop notification; it is shown from a background thread"""
+        if not self.config.settings.security.notification:
+            return False
+        Notifier.shared().post(title, message)
+        return True
+
+    @staticmethod
+    def _read_chunks(file_path: str) -> Iterator[bytes]:
+        """File contents, COPY_CHUNK_SIZE bytes at a time"""
+        with open(file_path, 'rb') as f:
+            yield from iter(partial(f.read, COPY_CHUNK_SIZE), b'')
+
+    def _encrypt_stage(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Encrypt a stream of chunks, armored when the clipboard only carries text"""
+        chunks = encrypt_stream(chunks)
+        armor = self.config.settings.security.armor
+        if armor == "always" or (armor != "never" and self.backend is not None and not self.backend.binary_safe):
+            chunks = armor_stream(chunks)
+        return chunks
+
+    def _decrypt_content(self, content: bytes) -> bytes:
+        """Decrypt content if it is encrypted, whatever the current settings"""
+        if content.startswith(ENCRYPTION_ARMOR):
+            content = dearmor(content)
+        if content.startswith(ENCRYPTION_MAGIC):
+            return decrypt_payload(content)
+        if content.startswith(b"ENCRYPTED:"):
+            # Base64 payloads from older versions
+            import base64
+            return base64.b64decode(content[10:])
+        return content
+
+
+# Line offsets - seekable line ranges in large files
+_LINE_INDEX_HEADER = struct.Struct("<8sQqQ")  # Magic, file size, mtime_ns, line count
+_LINE_INDEX_MAGIC = b"CBLINES1"
+
+
+class LineIndex:
+    """Byte offsets of every LINE_INDEX_STRIDE-th line of a file.
+
+    offsets[k] is where line k * stride + 1 starts, so a line is found by seeking to the
+    checkpoint before it and skipping fewer than stride lines of a memory-mapped file.
+    Indexes of files above LINE_INDEX_MIN_SIZE are cached in LINE_INDEX_DIR, keyed by path
+    and valid while the file's size and mtime are unchanged.
+    """
+
+    def __init__(self, file_path: str, size: int, mtime_ns: int, lines: int, offsets: array):
+        self.file_path = file_path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.lines = lines
+        self.offsets = offsets
+
+    @staticmethod
+    def sidecar_path(file_path: str) -> str:
+        """Where the index of file_path is cached"""
+        digest = hashlib.sha1(os.path.realpath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(LINE_INDEX_DIR, f"{digest}.idx")
+
+    @classmethod
+    def load(cls, file_path: str) -> "LineIndex":
+        """Index for the current contents of file_path, from cache when still valid"""
+        st = os.stat(file_path)
+        return _cached_line_index(file_path, st.st_size, st.st_mtime_ns)
+
+    @classmethod
+    def _read(cls, file_path: str, size: int, mtime_ns: int) -> Optional["LineIndex"]:
+        try:
+            with open(cls.sidecar_path(file_path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _LINE_INDEX_HEADER.size:
+            return None
+        magic, cached_size, cached_mtime, lines = _LINE_INDEX_HEADER.unpack_from(data)
+        if magic != _LINE_INDEX_MAGIC or cached_size != size or cached_mtime != mtime_ns:
+            return None
+        offsets = array('Q')
+        offsets.frombytes(data[_LINE_INDEX_HEADER.size:])
+        return cls(file_path, size, mtime_ns, lines, offsets)
+
+    def _save(self):
+        header = _LINE_INDEX_HEADER.pack(_LINE_INDEX_MAGIC, self.size, self.mtime_ns, self.lines)
+        try:
+            write_atomic(self.sidecar_path(self.file_path), header + self.offsets.tobytes())
+            sidecars = sorted(os.scandir(LINE_INDEX_DIR), key=lambda entry: entry.stat().st_mtime)
+            for entry in sidecars[:-LINE_INDEX_MAX_FILES]:
+                os.unlink(entry.path)
+        except OSError:
+            pass  # The index still works, it is just rebuilt next time
+
+    @classmethod
+    def build(cls, file_path: str) -> "LineIndex":
+        """Count lines in fixed-size pieces, scanning only the pieces where a checkpoint falls"""
+        offsets = array('Q', [0])
+        lines = 0  # Newlines before the current position
+        next_mark = LINE_INDEX_STRIDE
+        base = 0
+        last = b''
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            for chunk in iter(partial(f.read, LINE_COUNT_CHUNK_SIZE), b''):
+                for piece in range(0, len(chunk), LINE_INDEX_PIECE):
+                    piece_end = min(piece + LINE_INDEX_PIECE, len(chunk))
+                    count = chunk.count(b'\n', piece, piece_end)
+                    if lines + count < next_mark:
+                        lines += count
+                        continue
+                    pos = piece
+                    while True:
+                        pos = chunk.find(b'\n', pos, piece_end) + 1
+                        if not pos:
+                            break
+                        lines += 1
+                        if lines == next_mark:
+                            offsets.append(base + pos)
+                            next_mark += LINE_INDEX_STRIDE
+                base += len(chunk)
+                last = chunk
+        if last and not last.endswith(b'\n'):
+            lines += 1  # Unterminated last line
+        if offsets[-1] == base:
+            offsets.pop()  # Checkpoint at end of file, for a line that does not exist
+        return cls(file_path, st.st_size, st.st_mtime_ns, lines, offsets)
+
+    def _skip(self, data, line: int, from_line: int = 1, pos: int = 0) -> int:
+        """Offset where line starts, reached from the nearest known earlier line"""
+        checkpoint = (line - 1) // LINE_INDEX_STRIDE
+        if checkpoint * LINE_INDEX_STRIDE + 1 > from_line:
+            from_line, pos = checkpoint * LINE_INDEX_STRIDE + 1, self.offsets[checkpoint]
+        for _ in range(line - from_line):
+            pos = data.find(b'\n', pos) + 1
+        return pos
+
+    def line_range(self, start: int, end: int) -> Optional[bytes]:
+        """Raw bytes of lines start..end (1-based, inclusive), or None if out of range"""
+        if start < 1 or end > self.lines or start > end:
+            return None
+        with open(self.file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if len(data) != self.size:
+                    return None  # Changed since it was indexed
+                begin = self._skip(data, start)
+                stop = self._skip(data, end + 1, start, begin) if end < self.lines else len(data)
+                return data[begin:stop]
+
+
+@lru_cache(maxsize=8)
+def _cached_line_index(file_path: str, size: int, mtime_ns: int) -> LineIndex:
+    """Memory-cached LineIndex; the key changes whenever the file does"""
+    index = LineIndex._read(file_path, size, mtime_ns) if size >= LINE_INDEX_MIN_SIZE else None
+    if index is None:
+        index = LineIndex.build(file_path)
+        if index.size >= LINE_INDEX_MIN_SIZE:
+            index._save()
+    return index
 
 
 # File utility functions - No changes needed
 class FileUtils:
     @staticmethod
-    def preview_file(file_path: str) -> dict:
-        """Preview file and return metadata"""
-        if not os.path.exists(file_path):
+    def preview_file(file_path: str, tail: bool = False) -> dict:
+        """Preview file and return metadata.
+
+        Only the first (and with tail, the last) PREVIEW_BLOCK_SIZE bytes are read. Lines are
+        counted exactly up to PREVIEW_COUNT_LIMIT; beyond that "lines" is estimated from the
+        head and "lines_estimated" is set, and count_lines() gives the exact figure.
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
             return None
 
         result = {
             "filename": os.path.basename(file_path),
             "path": file_path,
-            "size": os.path.getsize(file_path),
-            "size_human": FileUtils.human_readable_size(os.path.getsize(file_path)),
-            "modified": datetime.fromtimestamp(os.path.getmtime(file_path)).strftime("%Y-%m-%d %H:%M:%S"),
+            "size": st.st_size,
+            "size_human": FileUtils.human_readable_size(st.st_size),
+            "modified": datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
             "type": "unknown",
             "preview": "",
-            "lines": 0
+            "tail": "",
+            "lines": 0,
+            "lines_estimated": False
         }
 
         # Determine file type and generate preview
@@ -867,10 +2769,23 @@ class FileUtils:
 
             # If text file, count lines and show preview
             if mime and 'text' in mime:
-                with open(file_path, 'r', errors='ignore') as f:
-                    lines = f.readlines()
-                    result["lines"] = len(lines)
-                    result["preview"] = ''.join(lines[:10])
+                with open(file_path, 'rb') as f:
+                    head = f.read(PREVIEW_BLOCK_SIZE)
+                    result["preview"] = FileUtils._preview_lines(head, partial=len(head) < st.st_size)
+                    if tail and st.st_size > len(head):
+                        f.seek(max(len(head), st.st_size - PREVIEW_BLOCK_SIZE))
+                        block = f.read(PREVIEW_BLOCK_SIZE)
+                        lines = block.splitlines(keepends=True)
+                        if f.tell() - len(block) > len(head):
+                            lines = lines[1:]  # The first line of the block is cut
+                        result["tail"] = b''.join(lines[-PREVIEW_LINES:]).decode('utf-8', errors='ignore')
+                    if st.st_size <= PREVIEW_COUNT_LIMIT:
+                        f.seek(0)
+                        result["lines"] = FileUtils._count_newlines(f)
+                    else:
+                        # Average line length of the head block, applied to the whole file
+                        result["lines"] = max(1, round(st.st_size * (head.count(b'\n') or 1) / len(head)))
+                        result["lines_estimated"] = True
             elif mime and ('image' in mime or 'video' in mime or 'audio' in mime):
                 result["type"] = mime
             else:
@@ -884,6 +2799,35 @@ class FileUtils:
 
         return result
 
+    @staticmethod
+    def _preview_lines(head: bytes, partial: bool) -> str:
+        """First PREVIEW_LINES lines of a head block, dropping a line cut by the block end"""
+        lines = head.splitlines(keepends=True)
+        if partial and 1 < len(lines) <= PREVIEW_LINES and not lines[-1].endswith((b'\n', b'\r')):
+            lines.pop()
+        return b''.join(lines[:PREVIEW_LINES]).decode('utf-8', errors='ignore')
+
+    @staticmethod
+    def _count_newlines(f) -> int:
+        """Lines in an open binary file, counted in fixed-size chunks"""
+        lines = 0
+        last = b''
+        for chunk in iter(partial(f.read, LINE_COUNT_CHUNK_SIZE), b''):
+            lines += chunk.count(b'\n')
+            last = chunk
+        if last and not last.endswith(b'\n'):
+            lines += 1  # Unterminated last line
+        return lines
+
+    @staticmethod
+    def count_lines(file_path: str) -> int:
+        """Exact line count of a file in constant memory (slow for huge files, run it off the UI thread)"""
+        try:
+            with open(file_path, 'rb') as f:
+                return FileUtils._count_newlines(f)
+        except OSError:
+            return 0
+
     @staticmethod
     def human_readable_size(size: int) -> str:
         """Convert size in bytes to human-readable format"""
@@ -895,23 +2839,21 @@ class FileUtils:
 
     @staticmethod
     def copy_line_range(file_path: str, start: int, end: int = None) -> str:
-        """Copy specific line range from file"""
+        """Copy specific line range from file, using its LineIndex"""
         if not os.path.exists(file_path):
             return ""
 
         try:
-            with open(file_path, 'r', errors='ignore') as f:
-                lines = f.readlines()
-
             if end is None:
                 end = start
 
-            if start < 1 or end > len(lines) or start > end:
+            content = LineIndex.load(file_path).line_range(start, end)
+            if content is None:
                 return ""
 
-            return ''.join(lines[start - 1:end])
+            return content.decode('utf-8', errors='ignore')
         except Exception as e:
-            print(f"Error copying line range: {e}")
+            show_message(f"Error copying line range: {e}")
             return ""
 
     @staticmethod
@@ -921,6 +2863,7 @@ class FileUtils:
             return ""
 
         current_format = os.path.splitext(file_path)[1].lower().lstrip('.')
+        os.makedirs(TMP_DIR, exist_ok=True)
         output_file = os.path.join(TMP_DIR, f"{os.path.splitext(os.path.basename(file_path))[0]}.{target_format}")
 
         try:
@@ -979,1284 +2922,1188 @@ class FileUtils:
                 shutil.copy(file_path, output_file)
                 return output_file
         except Exception as e:
-            print(f"Error converting file: {e}")
+            show_message(f"Error converting file: {e}")
             return ""
 
 
-# Helper function to generate safe IDs - No changes needed
-def generate_safe_id(text: str) -> str:
-    """Generate a safe ID from any string"""
-    # Use hashlib to create a hash of the input text
-    # Add 'id_' prefix to ensure it never starts with a number
-    # This ensures we have a valid ID that complies with Textual's requirements
-    return "id_" + hashlib.md5(text.encode()).hexdigest()
-
-
-# UI Classes
-
-# Main welcome screen - No changes needed
-class WelcomeScreen(Screen):
-    BINDINGS = [
-        Binding("q", "quit", "Quit"),
-        Binding("escape", "app.pop_screen", "Back"),
-        Binding("h", "app.push_screen('help')", "Help"),
-        Binding("c", "app.push_screen('config')", "Config"),
-        Binding("b", "app.push_screen('browse')", "Browse"),
-        Binding("s", "app.push_screen('search')", "Search"),
-        Binding("v", "app.push_screen('view')", "View Clipboard"),
-    ]
-
-    def __init__(self, config: Config, history: History, clipboard: Clipboard):
-        super().__init__()
-        self.config = config
-        self.history = history
-        self.clipboard = clipboard
-        # Dictionary to store file paths by their safe IDs
-        self.file_id_map = {}
-
-    def compose(self) -> ComposeResult:
-        yield Header()
-        yield Static(self.get_logo(), id="logo")
-
-        with Vertical(id="main-menu"):
-            yield Button("Copy From History", variant="primary", id="history-btn")
-            yield Button("Browse Files", variant="primary", id="browse-btn")
-            yield Button("Search", variant="primary", id="search-btn")
-            yield Button("View Clipboard", variant="primary", id="view-btn")
-            yield Button("Settings", variant="primary", id="config-btn")
-            yield Button("Help", variant="primary", id="help-btn")
-            yield Button("Quit", variant="error", id="quit-btn")
-
-        with Container(id="recent-history"):
-            yield Static("Recent Files:", classes="heading")
-            yield ListView(id="recent-files-list")
-
-        yield Footer()
-
-    def on_mount(self) -> None:
-        """Update recent files on mount"""
-        self.update_recent_files()
-
-    def update_recent_files(self) -> None:
-        """Update the list of recent files"""
-        recent_files_list = self.query_one("#recent-files-list", ListView)
-        recent_files_list.clear()
-        self.file_id_map.clear()
-
-        recent_files = self.history.get()
-        for file_path in recent_files:
-            # Generate a safe ID and store it in the map
-            safe_id = generate_safe_id(file_path)
-            self.file_id_map[safe_id] = file_path
-
-            # Add list item with safe ID
-            recent_files_list.append(ListItem(Label(os.path.basename(file_path)), id=safe_id))
-
-    def on_list_view_selected(self, event: ListView.Selected) -> None:
-        """Handle list view selection"""
-        # Get the file path from the map using the safe ID
-        safe_id = event.item.id
-        file_path = self.file_id_map.get(safe_id)
-
-        if file_path:
-            self.clipboard.copy_to_clipboard(file_path)
-            self.app.push_screen(
-                MessageScreen(f"Copied to clipboard: {os.path.basename(file_path)}")
-            )
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button presses"""
-        button_id = event.button.id
-
-        if button_id == "history-btn":
-            self.action_shell_history()
-        elif button_id == "browse-btn":
-            self.app.push_screen("browse")
-        elif button_id == "search-btn":
-            self.app.push_screen("search")
-        elif button_id == "view-btn":
-            self.app.push_screen("view")
-        elif button_id == "config-btn":
-            self.app.push_screen("config")
-        elif button_id == "help-btn":
-            self.app.push_screen("help")
-        elif button_id == "quit-btn":
-            self.app.exit()
-
-    def get_logo(self) -> str:
-        """Get the ASCII art logo"""
-        return f"""
-╔═╗╦  ╦╔═╗╔╗ ╔═╗╦═╗╔╦╗
-║  ║  ║╠═╝╠╩╗╠═╣╠╦╝ ║║
-╚═╝╩═╝╩╩  ╚═╝╩ ╩╩╚══╩╝
-
-A  R A D I C A L  clipboard utility
-Python Edition v{VERSION}
-        """
-
-    @work
-    async def action_shell_history(self) -> None:
-        """Extract files from shell history"""
-        # Show loading screen
-        self.app.push_screen(LoadingScreen("Scanning shell history..."))
-
-        # Extract files in background
-        worker = get_current_worker()
-        files = self.history.extract_files_from_shell_history()
-
-        # Remove loading screen
-        self.app.pop_screen()
-
-        if not files:
-            self.app.push_screen(
-                MessageScreen("No files found in shell history.")
-            )
-            return
-
-        # Show file selection screen
-        self.app.push_screen(
-            FileSelectionScreen("Shell History Files", files, self.clipboard)
-        )
-
-
-# File selection screen - No changes needed
-class FileSelectionScreen(Screen):
-    def __init__(self, title: str, files: List[str], clipboard: Clipboard):
-        super().__init__()
-        self.title = title
-        self.files = files
-        self.clipboard = clipboard
-        # Dictionary to store file paths by their safe IDs
-        self.file_id_map = {}
-
-    def compose(self) -> ComposeResult:
-        yield Header(self.title)
-
-        with Vertical(id="file-selection"):
-            for file_path in self.files:
-                # Generate a safe ID and store the mapping
-                safe_id = generate_safe_id(file_path)
-                self.file_id_map[safe_id] = file_path
-
-                # Create button with safe ID
-                yield Button(os.path.basename(file_path), id=safe_id, classes="file-btn")
-
-        yield Button("Cancel", variant="error", id="cancel-btn")
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "cancel-btn":
-            self.app.pop_screen()
-        else:
-            # Get the file path from the map using the safe ID
-            file_path = self.file_id_map.get(button_id)
-
-            if file_path and os.path.exists(file_path):
-                self.clipboard.copy_to_clipboard(file_path)
-                self.app.pop_screen()
-                self.app.push_screen(
-                    MessageScreen(f"Copied to clipboard: {os.path.basename(file_path)}")
-                )
-
-
-# Loading screen - No changes needed
-class LoadingScreen(Screen):
-    def __init__(self, message: str):
-        super().__init__()
-        self.message = message
-
-    def compose(self) -> ComposeResult:
-        yield Static(self.message, id="loading-message")
-
-
-# Message screen - No changes needed
-class MessageScreen(Screen):
-    def __init__(self, message: str):
-        super().__init__()
-        self.message = message
-
-    def compose(self) -> ComposeResult:
-        yield Static(self.message, id="message")
-        yield Button("OK", variant="primary", id="ok-btn")
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        self.app.pop_screen()
-
-
-# Browse files screen - No changes needed
-class BrowseScreen(Screen):
-    BINDINGS = [
-        Binding("escape", "app.pop_screen", "Back"),
-    ]
-
-    def __init__(self, config: Config, history: History, clipboard: Clipboard):
-        super().__init__()
-        self.config = config
-        self.history = history
-        self.clipboard = clipboard
-
-    def compose(self) -> ComposeResult:
-        yield Header("Browse Files")
-        yield DirectoryTree(os.path.expanduser("~"), id="directory-tree")
-        yield Footer()
-
-    def on_directory_tree_file_selected(self, event: DirectoryTree.FileSelected) -> None:
-        """Handle file selection"""
-        file_path = event.path
-        file_preview = FileUtils.preview_file(file_path)
-
-        if file_preview:
-            self.app.push_screen(
-                FilePreviewScreen(file_preview, self.clipboard)
-            )
-
-
-# File preview screen - No changes needed
-class FilePreviewScreen(Screen):
-    BINDINGS = [
-        Binding("escape", "app.pop_screen", "Back"),
-        Binding("c", "copy", "Copy"),
-        Binding("l", "copy_lines", "Copy Lines"),
-    ]
-
-    def __init__(self, file_data: dict, clipboard: Clipboard):
-        super().__init__()
-        self.file_data = file_data
-        self.clipboard = clipboard
-
-    def compose(self) -> ComposeResult:
-        yield Header(f"Preview: {self.file_data['filename']}")
-
-        with Vertical(id="file-info"):
-            yield Static(f"Path: {self.file_data['path']}")
-            yield Static(f"Size: {self.file_data['size_human']}")
-            yield Static(f"Type: {self.file_data['type']}")
-            yield Static(f"Modified: {self.file_data['modified']}")
-            if 'lines' in self.file_data and self.file_data['lines'] > 0:
-                yield Static(f"Lines: {self.file_data['lines']}")
-
-        with Vertical(id="file-preview"):
-            yield Static("Preview:", classes="heading")
-            yield Log(id="preview-content", highlight=True)
-
-        with Horizontal(id="action-buttons"):
-            yield Button("Copy to Clipboard", variant="primary", id="copy-btn")
-            if 'lines' in self.file_data and self.file_data['lines'] > 0:
-                yield Button("Copy Line Range", variant="primary", id="copy-lines-btn")
-            yield Button("Back", variant="error", id="back-btn")
-
-        yield Footer()
-
-    def on_mount(self) -> None:
-        """Update preview content on mount"""
-        preview_log = self.query_one("#preview-content", Log)
-
-        if 'preview' in self.file_data and self.file_data['preview']:
-            # Add preview content
-            if isinstance(self.file_data['preview'], str):
-                for line in self.file_data['preview'].splitlines()[:10]:
-                    preview_log.write(line)
+# Directory walking - scandir with .gitignore/.ignore rules, excludes and symlink loop checks
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore-style glob to a regex over '/'-separated relative paths"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append("\\[")
+                i += 1
             else:
-                preview_log.write(str(self.file_data['preview']))
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                out.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+                i = end + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
         else:
-            preview_log.write("Preview not available for this file type.")
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "copy-btn":
-            self.action_copy()
-        elif button_id == "copy-lines-btn":
-            self.action_copy_lines()
-        elif button_id == "back-btn":
-            self.app.pop_screen()
-
-    def action_copy(self) -> None:
-        """Copy file to clipboard"""
-        result = self.clipboard.copy_to_clipboard(self.file_data['path'])
-
-        if result:
-            self.app.pop_screen()
-            self.app.push_screen(
-                MessageScreen(f"Copied to clipboard: {self.file_data['filename']}")
-            )
-        else:
-            self.app.push_screen(
-                MessageScreen("Failed to copy to clipboard.")
-            )
-
-    def action_copy_lines(self) -> None:
-        """Show dialog to copy line range"""
-        self.app.push_screen(
-            LineRangeScreen(self.file_data, self.clipboard)
-        )
-
-
-# Line range selection screen - No changes needed
-class LineRangeScreen(Screen):
-    def __init__(self, file_data: dict, clipboard: Clipboard):
-        super().__init__()
-        self.file_data = file_data
-        self.clipboard = clipboard
-
-    def compose(self) -> ComposeResult:
-        yield Header(f"Select Line Range: {self.file_data['filename']}")
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
 
-        with Vertical(id="line-range-form"):
-            yield Static("Enter line range (e.g., 5-10 or just 5 for single line):")
-            yield Input(placeholder="5-10", id="line-range-input")
 
-            with Horizontal(id="action-buttons"):
-                yield Button("Copy", variant="primary", id="copy-btn")
-                yield Button("Cancel", variant="error", id="cancel-btn")
+class IgnoreRules:
+    """Patterns from the ignore files of one directory; the last matching pattern wins"""
 
-        yield Footer()
+    def __init__(self, base: str):
+        self.base = base
+        self.patterns: List[Tuple["re.Pattern", bool, bool]] = []  # (regex, negated, directories only)
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
+    @classmethod
+    def load(cls, directory: str, names) -> Optional["IgnoreRules"]:
+        """Rules from the ignore files among names in directory, or None if there are none"""
+        rules = cls(directory)
+        for name in IGNORE_FILES:
+            if name not in names:
+                continue
+            try:
+                with open(os.path.join(directory, name), 'r', errors='ignore') as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                continue
+            for line in lines:
+                rules.add(line)
+        return rules if rules.patterns else None
 
-        if button_id == "copy-btn":
-            line_range = self.query_one("#line-range-input", Input).value
-            self.copy_line_range(line_range)
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
+    def add(self, line: str):
+        """Add one ignore-file line"""
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            return
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]  # Escaped leading '#' or '!'
+        directories_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+        # A slash anywhere but the end anchors the pattern to this directory
+        prefix = "" if "/" in line else "(?:.*/)?"
+        regex = re.compile(prefix + _glob_to_regex(line.lstrip("/")) + "$")
+        self.patterns.append((regex, negated, directories_only))
+
+    def match(self, path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if explicitly re-included, None if no pattern applies"""
+        relative = os.path.relpath(path, self.base)
+        for regex, negated, directories_only in reversed(self.patterns):
+            if directories_only and not is_dir:
+                continue
+            if regex.match(relative):
+                return not negated
+        return None
+
+
+class FileWalker:
+    """Walks a tree with os.scandir, pruning what a search should never look at.
+
+    Directories matched by the exclude list or by .gitignore/.ignore rules are not entered;
+    hidden directories are skipped unless hidden is set. Symlinked directories are only
+    followed with follow_symlinks, and then every directory is entered once (by device and
+    inode), so links cannot loop or repeat a subtree. Yielded DirEntry objects carry their
+    cached stat results.
+    """
 
-    def copy_line_range(self, line_range: str) -> None:
-        """Copy selected line range"""
+    def __init__(self, excludes: List[str] = None, hidden: bool = False, ignore_files: bool = True,
+                 follow_symlinks: bool = False):
+        if excludes is None:
+            excludes = DEFAULT_SEARCH_EXCLUDES.split(",")
+        import fnmatch
+        patterns = [fnmatch.translate(pattern.strip()) for pattern in excludes if pattern.strip()]
+        self._excluded = re.compile("|".join(patterns)) if patterns else None
+        self.hidden = hidden
+        self.ignore_files = ignore_files
+        self.follow_symlinks = follow_symlinks
+
+    @classmethod
+    def from_config(cls, config: Config) -> "FileWalker":
+        """Build a walker from the [search] settings"""
+        settings = config.settings.search
+        return cls(excludes=settings.exclude.split(","),
+                   hidden=settings.hidden,
+                   ignore_files=settings.ignore_files,
+                   follow_symlinks=settings.follow_symlinks)
+
+    def _rules(self, directory: str, rules: tuple, names) -> tuple:
+        """rules extended with those of directory's own ignore files"""
+        if self.ignore_files:
+            own = IgnoreRules.load(directory, names)
+            if own is not None:
+                return rules + (own,)
+        return rules
+
+    def skip(self, path: str, name: str, is_dir: bool, rules: tuple) -> bool:
+        """Whether an entry is pruned"""
+        if self._excluded is not None and self._excluded.match(name):
+            return True
+        if is_dir and not self.hidden and name.startswith("."):
+            return True
+        for ruleset in reversed(rules):
+            ignored = ruleset.match(path, is_dir)
+            if ignored is not None:
+                return ignored
+        return False
+
+    def rules_for(self, root: str, directory: str) -> tuple:
+        """Ignore rules in force inside directory when walking from root"""
+        rules = ()
+        current = root
+        parts = [] if directory == root else os.path.relpath(directory, root).split(os.sep)
+        for part in [None] + parts:
+            if part is not None:
+                current = os.path.join(current, part)
+            try:
+                rules = self._rules(current, rules, set(os.listdir(current)) & set(IGNORE_FILES))
+            except OSError:
+                break
+        return rules
+
+    def walk(self, root: str, cancelled: threading.Event = None) -> Iterator[os.DirEntry]:
+        """Every file under root that survives pruning, directory by directory"""
+        visited = set()
         try:
-            if '-' in line_range:
-                start, end = map(int, line_range.split('-'))
-            else:
-                start = end = int(line_range)
-
-            content = FileUtils.copy_line_range(self.file_data['path'], start, end)
-
-            if content:
-                self.clipboard.copy_text_to_clipboard(content)
-                self.app.pop_screen()
-                self.app.pop_screen()  # Also pop the preview screen
-                self.app.push_screen(
-                    MessageScreen(f"Copied lines {start}-{end} to clipboard.")
-                )
-            else:
-                self.app.push_screen(
-                    MessageScreen("Invalid line range or failed to copy.")
-                )
-        except ValueError:
-            self.app.push_screen(
-                MessageScreen("Invalid line range format. Use '5-10' or '5'.")
-            )
-
-
-# Search screen - No changes needed
-class SearchScreen(Screen):
-    BINDINGS = [
-        Binding("escape", "app.pop_screen", "Back"),
-    ]
-
-    def __init__(self, config: Config, history: History, clipboard: Clipboard):
-        super().__init__()
-        self.config = config
-        self.history = history
-        self.clipboard = clipboard
-
-    def compose(self) -> ComposeResult:
-        yield Header("Search")
-
-        with Vertical(id="search-options"):
-            yield Button("Search App History", variant="primary", id="history-search-btn")
-            yield Button("Search File Contents", variant="primary", id="content-search-btn")
-            yield Button("Back", variant="error", id="back-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "history-search-btn":
-            self.app.push_screen(
-                HistorySearchScreen(self.history, self.clipboard)
-            )
-        elif button_id == "content-search-btn":
-            self.app.push_screen(
-                ContentSearchScreen(self.clipboard)
-            )
-        elif button_id == "back-btn":
-            self.app.pop_screen()
-
-
-# History search screen - No changes needed
-class HistorySearchScreen(Screen):
-    def __init__(self, history: History, clipboard: Clipboard):
-        super().__init__()
-        self.history = history
-        self.clipboard = clipboard
-
-    def compose(self) -> ComposeResult:
-        yield Header("Search App History")
-
-        with Vertical(id="search-form"):
-            yield Static("Enter search term:")
-            yield Input(placeholder="Search term", id="search-input")
-            yield Button("Search", variant="primary", id="search-btn")
-            yield Button("Cancel", variant="error", id="cancel-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "search-btn":
-            search_term = self.query_one("#search-input", Input).value
-            if search_term:
-                self.perform_search(search_term)
-            else:
-                self.app.push_screen(
-                    MessageScreen("Please enter a search term.")
-                )
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
-
-    def perform_search(self, search_term: str) -> None:
-        """Search in app history"""
-        results = self.history.search(search_term)
-
-        if results:
-            self.app.push_screen(
-                FileSelectionScreen("Search Results", results, self.clipboard)
-            )
-        else:
-            self.app.push_screen(
-                MessageScreen("No matching files found.")
-            )
-
-
-# Content search screen - No changes needed
-class ContentSearchScreen(Screen):
-    def __init__(self, clipboard: Clipboard):
-        super().__init__()
-        self.clipboard = clipboard
-
-    def compose(self) -> ComposeResult:
-        yield Header("Search File Contents")
-
-        with Vertical(id="search-form"):
-            yield Static("Enter search term:")
-            yield Input(placeholder="Search term", id="search-input")
-
-            yield Static("Search directory:")
-            yield Input(placeholder="Directory path", id="dir-input", value=os.path.expanduser("~"))
-
-            with Horizontal(id="action-buttons"):
-                yield Button("Search", variant="primary", id="search-btn")
-                yield Button("Cancel", variant="error", id="cancel-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "search-btn":
-            search_term = self.query_one("#search-input", Input).value
-            search_dir = self.query_one("#dir-input", Input).value
-
-            if not search_term:
-                self.app.push_screen(
-                    MessageScreen("Please enter a search term.")
-                )
-                return
-
-            if not os.path.isdir(search_dir):
-                self.app.push_screen(
-                    MessageScreen("Invalid directory path.")
-                )
-                return
-
-            self.action_content_search(search_term, search_dir)
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
-
-    @work
-    async def action_content_search(self, search_term: str, search_dir: str) -> None:
-        """Search in file contents"""
-        # Show loading screen
-        self.app.push_screen(LoadingScreen("Searching in files..."))
-
-        # Perform search in background
-        worker = get_current_worker()
-        results = []
-
-        for root, dirs, files in os.walk(search_dir):
-            for file in files:
-                if worker.is_cancelled:
-                    break
-
-                file_path = os.path.join(root, file)
-                # Skip large files and non-text files
+            st = os.stat(root)
+            visited.add((st.st_dev, st.st_ino))
+        except OSError:
+            return
+        stack = [(root, ())]
+        while stack:
+            directory, rules = stack.pop()
+            try:
+                with os.scandir(directory) as iterator:
+                    entries = list(iterator)
+            except OSError:
+                continue
+            rules = self._rules(directory, rules, {entry.name for entry in entries})
+
+            subdirectories = []
+            for entry in entries:
+                if cancelled is not None and cancelled.is_set():
+                    return
                 try:
-                    if os.path.getsize(file_path) > 1024 * 1024:  # Skip files > 1MB
+                    is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                    if not is_dir and entry.is_dir():
+                        continue  # A symlinked directory we are not following
+                except OSError:
+                    continue
+                if self.skip(entry.path, entry.name, is_dir, rules):
+                    continue
+                if not is_dir:
+                    if entry.is_file():
+                        yield entry
+                    continue
+                if self.follow_symlinks:
+                    # Any directory may also be reachable through a link; enter each one once
+                    try:
+                        st = entry.stat()
+                    except OSError:
                         continue
-
-                    mime = mimetypes.guess_type(file_path)[0]
-                    if mime and not ('text' in mime or 'json' in mime or 'xml' in mime):
+                    if (st.st_dev, st.st_ino) in visited:
                         continue
-
-                    with open(file_path, 'r', errors='ignore') as f:
-                        content = f.read()
-                        if search_term.lower() in content.lower():
-                            results.append(file_path)
-                            if len(results) >= 20:  # Limit to 20 results
-                                break
-                except:
-                    continue
-
-        # Remove loading screen
-        self.app.pop_screen()
-
-        if results:
-            self.app.push_screen(
-                FileSelectionScreen("Content Search Results", results, self.clipboard)
-            )
+                    visited.add((st.st_dev, st.st_ino))
+                subdirectories.append((entry.path, rules))
+            stack.extend(reversed(subdirectories))
+
+    def text_files(self, root: str, cancelled: threading.Event = None) -> Iterator[os.DirEntry]:
+        """Files under root whose name does not mark them as binary"""
+        for entry in self.walk(root, cancelled):
+            # Skip non-text files without touching the disk
+            mime = mimetypes.guess_type(entry.name)[0]
+            if mime and not ('text' in mime or 'json' in mime or 'xml' in mime):
+                continue
+            yield entry
+
+
+# Content search - file reads spread over a thread pool, matches streamed as they are found
+def sniff_encoding(head: bytes) -> Optional[str]:
+    """Encoding of a file judged by its first block, or None if it looks binary"""
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8"
+    if head.startswith(b"\xff\xfe"):
+        return "utf-16-le"
+    if head.startswith(b"\xfe\xff"):
+        return "utf-16-be"
+    if b"\0" in head:
+        return None
+    return "utf-8"
+
+
+@contextmanager
+def open_text(file_path: str, max_size: int = SEARCH_MAX_FILE_SIZE):
+    """Yield (UTF-8 contents, mtime) of a text file, or (None, None) if it should be skipped.
+
+    Small files come from a single read and larger ones are memory-mapped; the rare UTF-16
+    file is re-encoded.
+    """
+    with open(file_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        encoding = None
+        if 0 < st.st_size <= max_size:
+            head = f.read(SEARCH_SNIFF_SIZE)
+            encoding = sniff_encoding(head)
+        if encoding is None:
+            yield None, None
+        elif st.st_size <= len(head):
+            yield (head if encoding == "utf-8" else head.decode(encoding, errors='ignore').encode('utf-8')), st.st_mtime
         else:
-            self.app.push_screen(
-                MessageScreen("No matching content found.")
-            )
-
-
-# View clipboard screen - No changes needed
-class ViewScreen(Screen):
-    BINDINGS = [
-        Binding("escape", "app.pop_screen", "Back"),
-    ]
-
-    def __init__(self, config: Config, clipboard: Clipboard):
-        super().__init__()
-        self.config = config
-        self.clipboard = clipboard
-
-    def compose(self) -> ComposeResult:
-        yield Header("View Clipboard")
-
-        with Vertical(id="clipboard-view"):
-            yield Static(f"Buffer: {self.config.get_int('clipboard', 'default_buffer')}")
-            yield Static("Content:", classes="heading")
-            yield Log(id="clipboard-content", highlight=True)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if encoding != "utf-8":
+                    mapped = mapped[:].decode(encoding, errors='ignore').encode('utf-8')
+                yield mapped, st.st_mtime
+
+
+class SearchHit(NamedTuple):
+    """One matching line and the lines around it"""
+    line_number: int
+    line: str
+    before: List[str]
+    after: List[str]
+
+
+class FileMatch(NamedTuple):
+    """A file that contains the search term"""
+    path: str
+    count: int  # Occurrences seen, up to the SEARCH_MAX_HITS lines recorded
+    hits: List[SearchHit]
+    mtime: float
+    score: float = 0.0
+
+    def matching_lines(self) -> str:
+        """The matching lines, one per line"""
+        return "\n".join(hit.line for hit in self.hits)
+
+    def with_context(self, lines: int = None) -> str:
+        """Matching lines with up to lines of recorded context, grep-style '--' between groups"""
+        window = {}
+        for hit in self.hits:
+            before = hit.before if lines is None else hit.before[len(hit.before) - lines:] if lines else []
+            after = hit.after if lines is None else hit.after[:lines]
+            first = hit.line_number - len(before)
+            for offset, text in enumerate(before + [hit.line] + after):
+                window[first + offset] = text
+        output = []
+        previous = None
+        for number in sorted(window):
+            if previous is not None and number != previous + 1:
+                output.append("--")
+            output.append(window[number])
+            previous = number
+        return "\n".join(output)
+
+
+def _decode_line(data: bytes) -> str:
+    return data[:SEARCH_MAX_LINE_LENGTH].decode('utf-8', errors='replace').strip('\ufeff\r')
+
+
+class BytesMatcher:
+    """Case-insensitive search for a term in the raw bytes of files.
+
+    Files are memory-mapped and never decoded as a whole. An ASCII term in UTF-8 text is
+    found by lowering the mapping one chunk at a time and looking for the lowered needle,
+    which is several times faster than an IGNORECASE regex. Other terms use a bytes regex
+    that spells out each character's case variants. Line numbers and context come from the
+    same mapping, so results need no second read.
+    """
 
-        with Horizontal(id="action-buttons"):
-            yield Button("Save to File", variant="primary", id="save-btn")
-            yield Button("Clear Clipboard", variant="primary", id="clear-btn")
-            yield Button("Back", variant="error", id="back-btn")
+    def __init__(self, term: str):
+        self.term = term
+        self.needle = term.lower().encode('ascii') if term.isascii() else None
+        self._pattern = None
+
+    @property
+    def pattern(self) -> "re.Pattern":
+        """Compiled pattern matching the term in UTF-8"""
+        if self._pattern is None:
+            parts = []
+            for char in self.term:
+                variants = sorted({re.escape(variant.encode('utf-8'))
+                                   for variant in (char, char.lower(), char.upper())})
+                parts.append(variants[0] if len(variants) == 1 else b"(?:" + b"|".join(variants) + b")")
+            self._pattern = re.compile(b"".join(parts))
+        return self._pattern
+
+    def find(self, file_path: str, max_size: int = SEARCH_MAX_FILE_SIZE,
+             context: int = DEFAULT_SEARCH_CONTEXT) -> Optional[FileMatch]:
+        """Matching lines of the file with context, in the same pass; None if it has none"""
+        with open_text(file_path, max_size) as (data, mtime):
+            if data is None:
+                return None
+            return self.locate(data, file_path, mtime, context)
+
+    def _positions(self, data) -> Iterator[int]:
+        """Byte offsets of the term in UTF-8 data, ascending"""
+        if self.needle is None:
+            for match in self.pattern.finditer(data):
+                yield match.start()
+            return
+        overlap = len(self.needle) - 1
+        for start in range(0, len(data), SEARCH_CHUNK_SIZE):
+            chunk = data[start:start + SEARCH_CHUNK_SIZE + overlap].lower()
+            index = chunk.find(self.needle)
+            # Occurrences starting in the overlap belong to the next chunk
+            while index != -1 and index < SEARCH_CHUNK_SIZE:
+                yield start + index
+                index = chunk.find(self.needle, index + 1)
+
+    def locate(self, data, file_path: str, mtime: float, context: int) -> Optional[FileMatch]:
+        """Hits in already opened UTF-8 contents"""
+        size = len(data)
+        count = 0
+        hits = []
+        line_number = 1
+        counted_to = 0
+        line_end = -1
+        for position in self._positions(data):
+            if position < line_end:
+                count += 1  # Another occurrence on the line just recorded
+                continue
+            if len(hits) >= SEARCH_MAX_HITS:
+                break
+            count += 1
+            line_start = data.rfind(b"\n", 0, position) + 1
+            line_end = data.find(b"\n", position)
+            if line_end == -1:
+                line_end = size
+            line_number += data[counted_to:line_start].count(b"\n")
+            counted_to = line_start
+
+            before = []
+            start = line_start
+            while start > 0 and len(before) < context:
+                previous = data.rfind(b"\n", 0, start - 1) + 1
+                before.insert(0, _decode_line(data[previous:start - 1]))
+                start = previous
+            after = []
+            end = line_end
+            while end < size and len(after) < context:
+                following = data.find(b"\n", end + 1)
+                if following == -1:
+                    following = size
+                after.append(_decode_line(data[end + 1:following]))
+                end = following
+
+            hits.append(SearchHit(line_number, _decode_line(data[line_start:line_end]), before, after))
+        if not count:
+            return None
+        return FileMatch(file_path, count, hits, mtime)
 
-        yield Footer()
 
-    def on_mount(self) -> None:
-        """Update clipboard content on mount"""
-        content_log = self.query_one("#clipboard-content", Log)
-        content = self.clipboard.get_clipboard_content()
+class RegexMatcher(BytesMatcher):
+    """A regular expression term, matched case-insensitively on the UTF-8 bytes"""
 
-        if content:
-            lines = content.splitlines()
-            for line in lines:
-                content_log.write(line)
-        else:
-            content_log.write("Clipboard is empty.")
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "save-btn":
-            self.app.push_screen(
-                SaveClipboardScreen(self.clipboard)
-            )
-        elif button_id == "clear-btn":
-            self.clipboard.clear_clipboard()
-            self.app.pop_screen()
-            self.app.push_screen(
-                MessageScreen("Clipboard cleared.")
-            )
-        elif button_id == "back-btn":
-            self.app.pop_screen()
-
-
-# Save clipboard to file screen - No changes needed
-class SaveClipboardScreen(Screen):
-    def __init__(self, clipboard: Clipboard):
-        super().__init__()
-        self.clipboard = clipboard
+    def __init__(self, expression: str):
+        super().__init__(expression)
+        self.needle = None
+        try:
+            self._pattern = re.compile(expression.encode('utf-8'), re.IGNORECASE | re.MULTILINE)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression '{expression}': {e}")
+        if self._pattern.match(b""):
+            raise ValueError(f"Regular expression '{expression}' matches empty text")
 
-    def compose(self) -> ComposeResult:
-        yield Header("Save Clipboard to File")
 
-        with Vertical(id="save-form"):
-            yield Static("Enter filename:")
-            yield Input(placeholder="output.txt", id="filename-input")
+_QUERY_TOKEN = re.compile(r'(?P<prefix>[a-z]+:)?"(?P<quoted>[^"]*)"|(?P<word>\S+)')
+_QUERY_PREFIX = re.compile(r"(?:re|name|size|mtime):")
+_SIZE_PREDICATE = re.compile(r"([<>])(\d+(?:\.\d+)?)([kmg]?)b?$", re.IGNORECASE)
+_AGE_PREDICATE = re.compile(r"([<>])(\d+(?:\.\d+)?)([smhdw])$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+_AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
 
-            with Horizontal(id="action-buttons"):
-                yield Button("Save", variant="primary", id="save-btn")
-                yield Button("Cancel", variant="error", id="cancel-btn")
 
-        yield Footer()
+class SearchQuery:
+    """A parsed content search query.
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
+    Terms separated by spaces must all match; OR starts an alternative. "re:EXPR" is a
+    regular expression. "name:GLOB" filters file names, "size:<10M" / "size:>1k" sizes and
+    "mtime:<7d" / "mtime:>30d" the time since last modification. Quote terms with spaces.
+    A query of filters only lists every text file that passes them.
+    """
 
-        if button_id == "save-btn":
-            filename = self.query_one("#filename-input", Input).value
-            if filename:
-                self.save_to_file(filename)
+    def __init__(self):
+        self.groups: List[List[BytesMatcher]] = []  # Alternatives, each a list of terms to AND
+        self.name_globs: List[str] = []
+        self.min_size = self.max_size = None
+        self.min_age = self.max_age = None  # Seconds since modification
+
+    @classmethod
+    def parse(cls, text: str) -> "SearchQuery":
+        """Build a query from the search box text; raises ValueError for malformed input"""
+        query = cls()
+        group = []
+        for token in _QUERY_TOKEN.finditer(text):
+            prefix, value = token.group("prefix"), token.group("quoted")
+            if value is None:
+                value = token.group("word")
+                if value == "OR":
+                    if group:
+                        query.groups.append(group)
+                    group = []
+                    continue
+                prefixed = _QUERY_PREFIX.match(value)
+                if prefixed:
+                    prefix, value = prefixed.group(0), value[prefixed.end():]
+            if not value:
+                continue
+            if prefix == "re:":
+                group.append(RegexMatcher(value))
+            elif prefix == "name:":
+                query.name_globs.append(value)
+            elif prefix == "size:":
+                query._add_size(value)
+            elif prefix == "mtime:":
+                query._add_age(value)
             else:
-                self.app.push_screen(
-                    MessageScreen("Please enter a filename.")
-                )
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
-
-    def save_to_file(self, filename: str) -> None:
-        """Save clipboard content to file"""
-        content = self.clipboard.get_clipboard_content()
-
-        if not content:
-            self.app.push_screen(
-                MessageScreen("Clipboard is empty.")
-            )
-            return
-
-        # Check if file exists
-        if os.path.exists(filename):
-            self.app.push_screen(
-                FileExistsScreen(filename, content)
-            )
-            return
+                group.append(BytesMatcher((prefix or "") + value))
+        if group:
+            query.groups.append(group)
+        for group in query.groups:
+            group.sort(key=lambda term: isinstance(term, RegexMatcher))  # Literal scans first
+        if query.name_globs:
+            import fnmatch
+            query._names = re.compile("|".join(fnmatch.translate(glob) for glob in query.name_globs),
+                                      re.IGNORECASE)
+        return query
+
+    def _add_size(self, value: str):
+        match = _SIZE_PREDICATE.match(value)
+        if not match:
+            raise ValueError(f"Invalid size filter '{value}' (use e.g. <10M or >1k)")
+        size = float(match.group(2)) * _SIZE_UNITS[match.group(3).lower()]
+        if match.group(1) == "<":
+            self.max_size = size
+        else:
+            self.min_size = size
+
+    def _add_age(self, value: str):
+        match = _AGE_PREDICATE.match(value)
+        if not match:
+            raise ValueError(f"Invalid mtime filter '{value}' (use e.g. <7d or >2w)")
+        age = float(match.group(2)) * _AGE_UNITS[match.group(3).lower()]
+        if match.group(1) == "<":
+            self.max_age = age
+        else:
+            self.min_age = age
 
+    def accepts(self, name: str, stat) -> bool:
+        """Metadata filters; stat is called (once) only if a size or mtime filter needs it"""
+        if self.name_globs and not self._names.match(name):
+            return False
+        if self.min_size is None and self.max_size is None and self.min_age is None and self.max_age is None:
+            return True
         try:
-            with open(filename, 'w') as f:
-                f.write(content)
-
-            self.app.pop_screen()
-            self.app.pop_screen()  # Also pop the view screen
-            self.app.push_screen(
-                MessageScreen(f"Saved to: {filename}")
-            )
-        except Exception as e:
-            self.app.push_screen(
-                MessageScreen(f"Error saving file: {e}")
-            )
-
-
-# File exists confirmation screen - No changes needed
-class FileExistsScreen(Screen):
-    def __init__(self, filename: str, content: str):
-        super().__init__()
-        self.filename = filename
-        self.content = content
-
-    def compose(self) -> ComposeResult:
-        yield Header("File Exists")
+            st = stat()
+        except OSError:
+            return False
+        if self.min_size is not None and st.st_size <= self.min_size:
+            return False
+        if self.max_size is not None and st.st_size >= self.max_size:
+            return False
+        age = time.time() - st.st_mtime
+        if self.min_age is not None and age <= self.min_age:
+            return False
+        if self.max_age is not None and age >= self.max_age:
+            return False
+        return True
+
+    def find(self, file_path: str, max_size: int = SEARCH_MAX_FILE_SIZE,
+             context: int = DEFAULT_SEARCH_CONTEXT) -> Optional[FileMatch]:
+        """Match the file against every alternative, opening it once"""
+        with open_text(file_path, max_size) as (data, mtime):
+            if data is None:
+                return None
+            if not self.groups:
+                return FileMatch(file_path, 0, [], mtime)
+            located = {}
+            for group in self.groups:
+                matches = []
+                for term in group:
+                    if term not in located:
+                        located[term] = term.locate(data, file_path, mtime, context)
+                    if located[term] is None:
+                        break
+                    matches.append(located[term])
+                else:
+                    if len(matches) == 1:
+                        return matches[0]
+                    hits = {hit.line_number: hit for match in matches for hit in match.hits}
+                    return FileMatch(file_path, sum(match.count for match in matches),
+                                     [hits[number] for number in sorted(hits)][:SEARCH_MAX_HITS], mtime)
+        return None
+
+    def index_candidates(self, index: "TrigramIndex", directory: str) -> Optional[List[str]]:
+        """Files an index says may match, or None if some alternative has no literal to look up"""
+        if not self.groups:
+            return None
+        paths = set()
+        for group in self.groups:
+            narrowed = None
+            for term in group:
+                if isinstance(term, RegexMatcher):
+                    continue
+                found = index.candidates(term.term, directory)
+                if found is not None:
+                    narrowed = set(found) if narrowed is None else narrowed & set(found)
+            if narrowed is None:
+                return None
+            paths |= narrowed
+        return sorted(paths)
+
+
+def _trigrams(text: str) -> set:
+    """Distinct 3-byte sequences of the lowercased UTF-8 text"""
+    data = text.lower().encode('utf-8')
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+class TrigramIndex:
+    """On-disk trigram index of the text files under one directory.
+
+    Lives in SEARCH_INDEX_DIR as a SQLite database: files(path, mtime, size) and, for every
+    committed batch of files, one postings row per trigram listing the batch's files that
+    contain it as one-byte offsets from the batch's first id. Rows are only ever inserted, so
+    a refresh costs the same however large the index already is. A query intersects the
+    offsets of the term's trigrams batch by batch; callers still verify the files. refresh()
+    only re-reads files whose mtime or size changed. A changed file gets a new id, and ids of
+    changed or deleted files are purged in bulk once they make up half of them.
+    """
 
-        with Vertical(id="confirm-form"):
-            yield Static(f"File '{self.filename}' already exists.")
+    _refreshing = set()  # Index paths with a refresh running in this process
+    _refreshing_lock = threading.Lock()
 
-            with Horizontal(id="action-buttons"):
-                yield Button("Overwrite", variant="primary", id="overwrite-btn")
-                yield Button("Append", variant="primary", id="append-btn")
-                yield Button("Cancel", variant="error", id="cancel-btn")
+    def __init__(self, root: str, walker: FileWalker = None):
+        self.root = os.path.realpath(root)
+        self.path = self.index_path(self.root)
+        self.walker = walker or FileWalker()
 
-        yield Footer()
+    @staticmethod
+    def index_path(root: str) -> str:
+        """Database file for a root directory"""
+        digest = hashlib.sha1(os.path.realpath(root).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(SEARCH_INDEX_DIR, f"{digest}.sqlite")
+
+    @classmethod
+    def find(cls, directory: str, walker: FileWalker = None) -> Optional["TrigramIndex"]:
+        """Existing index covering directory: its own or one of a parent's"""
+        current = os.path.realpath(directory)
+        while True:
+            if os.path.exists(cls.index_path(current)):
+                return cls(current, walker)
+            parent = os.path.dirname(current)
+            if parent == current:
+                return None
+            current = parent
+
+    def _connect(self):
+        import sqlite3
+        os.makedirs(SEARCH_INDEX_DIR, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SEARCH_INDEX_VERSION:
+            with connection:
+                # Every write starts with BEGIN IMMEDIATE so concurrent refreshes take turns;
+                # check again once we have the lock, another process may have built the schema
+                connection.execute("BEGIN IMMEDIATE")
+                if connection.execute("PRAGMA user_version").fetchone()[0] != SEARCH_INDEX_VERSION:
+                    for statement in (
+                        "DROP TABLE IF EXISTS files",
+                        "DROP TABLE IF EXISTS postings",
+                        "DROP TABLE IF EXISTS meta",
+                        "CREATE TABLE files (id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT UNIQUE, mtime REAL, "
+                        "size INTEGER, trigrams INTEGER)",
+                        "CREATE TABLE postings (trigram BLOB, batch INTEGER, files BLOB, "
+                        "PRIMARY KEY (trigram, batch)) WITHOUT ROWID",
+                        "CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER)",
+                        "INSERT INTO meta VALUES ('stale', 0), ('live', 0)",
+                        f"PRAGMA user_version = {SEARCH_INDEX_VERSION}",
+                    ):
+                        connection.execute(statement)
+        return connection
+
+    def refresh(self, max_file_size: int = SEARCH_INDEX_MAX_FILE_SIZE,
+                cancelled: threading.Event = None) -> Tuple[int, int]:
+        """Bring the index up to date; returns (files indexed, files dropped)"""
+        connection = self._connect()
+        try:
+            known = {row[1]: row for row in
+                     connection.execute("SELECT id, path, mtime, size, trigrams FROM files")}
+            indexed = 0
+            pending = []
+
+            def flush():
+                # One new row per trigram, keyed by the batch's first file id. Ids assigned in
+                # one transaction are consecutive, so each file is a one-byte offset from it.
+                # Rows are looked up again under the write lock: another refresh of the same
+                # index may have replaced them since `known` was read
+                grouped: Dict[bytes, bytearray] = {}
+                batch = None
+                if not pending:
+                    return
+                live = stale = 0
+                with connection:
+                    connection.execute("BEGIN IMMEDIATE")
+                    for path, mtime, size, trigrams in pending:
+                        current = connection.execute("SELECT id, mtime, size, trigrams FROM files WHERE path = ?",
+                                                     (path,)).fetchone()
+                        if current is not None:
+                            if (current[1], current[2]) == (mtime, size):
+                                continue  # Indexed by a concurrent refresh
+                            connection.execute("DELETE FROM files WHERE id = ?", (current[0],))
+                            stale += max(current[3], 0)
+                        file_id = connection.execute(
+                            "INSERT INTO files (path, mtime, size, trigrams) VALUES (?, ?, ?, ?)",
+                            (path, mtime, size, -1 if trigrams is None else len(trigrams))
+                        ).lastrowid
+                        if batch is None:
+                            batch = file_id
+                        offset = file_id - batch
+                        for trigram in trigrams or ():
+                            offsets = grouped.get(trigram)
+                            if offsets is None:
+                                grouped[trigram] = offsets = bytearray()
+                            offsets.append(offset)
+                        live += len(trigrams or ())
+                    connection.execute("UPDATE meta SET value = value + ? WHERE key = 'stale'", (stale,))
+                    connection.execute("UPDATE meta SET value = value + ? WHERE key = 'live'", (live,))
+                    connection.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                                           ((trigram, batch, bytes(offsets)) for trigram, offsets in grouped.items()))
+                pending.clear()
+
+            for entry in self.walker.text_files(self.root, cancelled):
+                file_path = entry.path
+                old = known.pop(file_path, None)
+                try:
+                    st = entry.stat()
+                    if old is not None and (old[2], old[3]) == (st.st_mtime, st.st_size):
+                        continue
+                    if st.st_size > max_file_size:
+                        trigrams = None  # Not indexed; always a candidate
+                    else:
+                        with open(file_path, 'rb') as f:
+                            data = f.read()
+                        encoding = sniff_encoding(data[:SEARCH_SNIFF_SIZE])
+                        # Binary files get no trigrams, so they are never candidates
+                        trigrams = _trigrams(data.decode(encoding, errors='ignore')) if encoding else set()
+                except (OSError, ValueError):
+                    continue
+                pending.append((file_path, st.st_mtime, st.st_size, trigrams))
+                indexed += 1
+                if len(pending) >= SEARCH_INDEX_BATCH:
+                    flush()
+            flush()
+
+            if cancelled is not None and cancelled.is_set():
+                return indexed, 0
+
+            # Whatever was not seen on this walk is gone
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                stale = 0
+                for old in known.values():
+                    # A concurrent refresh may already have dropped it; count it once
+                    if connection.execute("DELETE FROM files WHERE id = ?", (old[0],)).rowcount:
+                        stale += max(old[4], 0)
+                connection.execute("UPDATE meta SET value = value + ? WHERE key = 'stale'", (stale,))
+                meta = dict(connection.execute("SELECT key, value FROM meta"))
+                if meta["stale"] > meta["live"] // 2:
+                    self._purge(connection)
+            return indexed, len(known)
+        finally:
+            connection.close()
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
+    @staticmethod
+    def _purge(connection):
+        """Drop files that no longer exist from every posting row"""
+        live_ids = {file_id for file_id, in connection.execute("SELECT id FROM files")}
+        total = 0
+        for trigram, batch, files in connection.execute("SELECT trigram, batch, files FROM postings").fetchall():
+            offsets = bytes(offset for offset in files if batch + offset in live_ids)
+            if not offsets:
+                connection.execute("DELETE FROM postings WHERE trigram = ? AND batch = ?", (trigram, batch))
+            elif len(offsets) < len(files):
+                connection.execute("UPDATE postings SET files = ? WHERE trigram = ? AND batch = ?",
+                                   (offsets, trigram, batch))
+            total += len(offsets)
+        connection.execute("UPDATE meta SET value = ? WHERE key = 'live'", (total,))
+        connection.execute("UPDATE meta SET value = 0 WHERE key = 'stale'")
+
+    def refresh_in_background(self):
+        """Start a refresh on a daemon thread unless one is already running"""
+        with self._refreshing_lock:
+            if self.path in self._refreshing:
+                return
+            self._refreshing.add(self.path)
 
-        if button_id == "overwrite-btn":
+        def run():
             try:
-                with open(self.filename, 'w') as f:
-                    f.write(self.content)
-
-                self.app.pop_screen()
-                self.app.pop_screen()
-                self.app.pop_screen()  # Pop all the way back to view screen
-                self.app.push_screen(
-                    MessageScreen(f"Overwritten: {self.filename}")
-                )
-            except Exception as e:
-                self.app.push_screen(
-                    MessageScreen(f"Error saving file: {e}")
-                )
-        elif button_id == "append-btn":
-            try:
-                with open(self.filename, 'a') as f:
-                    f.write(self.content)
-
-                self.app.pop_screen()
-                self.app.pop_screen()
-                self.app.pop_screen()  # Pop all the way back to view screen
-                self.app.push_screen(
-                    MessageScreen(f"Appended to: {self.filename}")
-                )
-            except Exception as e:
-                self.app.push_screen(
-                    MessageScreen(f"Error saving file: {e}")
-                )
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
+                self.refresh()
+            except Exception:
+                pass  # A failed refresh leaves the previous index in place
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(self.path)
+
+        threading.Thread(target=run, name="clipbard-index", daemon=True).start()
+
+    def candidates(self, term: str, directory: str = None) -> Optional[List[str]]:
+        """Indexed files under directory that may contain term, or None if the index can't tell"""
+        trigrams = _trigrams(term)
+        if not trigrams or not os.path.exists(self.path):
+            return None
+        prefix = os.path.join(os.path.realpath(directory or self.root), "")
+        connection = self._connect()
+        try:
+            if connection.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None:
+                return None  # Never built
+            placeholders = ",".join("?" * len(trigrams))
+            postings: Dict[bytes, Dict[int, bytes]] = {}
+            for trigram, batch, files in connection.execute(
+                    f"SELECT trigram, batch, files FROM postings WHERE trigram IN ({placeholders})",
+                    tuple(trigrams)):
+                postings.setdefault(trigram, {})[batch] = files
+            ids = []
+            if len(postings) == len(trigrams):  # Otherwise some trigram occurs in no indexed file
+                # Only batches holding every trigram can match; start from the rarest trigram
+                rarest, *others = sorted(postings.values(), key=len)
+                for batch, files in rarest.items():
+                    offsets = set(files)
+                    for other in others:
+                        offsets.intersection_update(other.get(batch, b""))
+                        if not offsets:
+                            break
+                    ids.extend(batch + offset for offset in offsets)
+
+            # Files too large to index could contain anything
+            paths = [path for path, in connection.execute("SELECT path FROM files WHERE trigrams < 0")]
+            ids = sorted(ids)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                paths.extend(path for path, in connection.execute(
+                    f"SELECT path FROM files WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+            return sorted(path for path in paths if path.startswith(prefix))
+        finally:
+            connection.close()
 
 
-# Configuration screen - No changes needed
-class ConfigScreen(Screen):
-    BINDINGS = [
-        Binding("escape", "app.pop_screen", "Back"),
-    ]
+class ContentSearch:
+    """Find files under a directory whose contents contain a term.
 
-    def __init__(self, config: Config):
-        super().__init__()
-        self.config = config
+    Iterating results() walks the tree lazily (or reads the candidates of a TrigramIndex),
+    keeps a bounded number of files in flight on a thread pool, and yields each matching path
+    as soon as its read finishes. The walk stops at limit matches or when cancel() is called
+    from any thread.
+    """
 
-    def compose(self) -> ComposeResult:
-        yield Header("Configuration")
-
-        with Vertical(id="config-menu"):
-            yield Button("General Settings", variant="primary", id="general-btn")
-            yield Button("Clipboard Settings", variant="primary", id="clipboard-btn")
-            yield Button("Security Settings", variant="primary", id="security-btn")
-            yield Button("History Settings", variant="primary", id="history-btn")
-            yield Button("Back", variant="error", id="back-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "general-btn":
-            self.app.push_screen(
-                GeneralConfigScreen(self.config)
-            )
-        elif button_id == "clipboard-btn":
-            self.app.push_screen(
-                ClipboardConfigScreen(self.config)
-            )
-        elif button_id == "security-btn":
-            self.app.push_screen(
-                SecurityConfigScreen(self.config)
-            )
-        elif button_id == "history-btn":
-            self.app.push_screen(
-                HistoryConfigScreen(self.config)
-            )
-        elif button_id == "back-btn":
-            self.app.pop_screen()
-
-
-# General configuration screen - No changes needed
-class GeneralConfigScreen(Screen):
-    def __init__(self, config: Config):
-        super().__init__()
-        self.config = config
+    def __init__(self, root: str, term: str, limit: int = DEFAULT_SEARCH_LIMIT,
+                 workers: int = DEFAULT_SEARCH_WORKERS, max_file_size: int = SEARCH_MAX_FILE_SIZE):
+        self.root = root
+        self.query = SearchQuery.parse(term)
+        self.limit = limit
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_file_size = max_file_size
+        self.context = DEFAULT_SEARCH_CONTEXT
+        self.files_searched = 0
+        self.walker = FileWalker()
+        self.index: Optional[TrigramIndex] = None  # Consulted for candidates when set
+        self.used_index = False
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: Config, root: str, term: str) -> "ContentSearch":
+        """Build a search using the [search] settings.
+
+        An existing index covering root is always used; with [search] index enabled, one is
+        created for root on first search.
+        """
+        settings = config.settings.search
+        search = cls(root, term, limit=settings.result_limit, workers=settings.workers)
+        search.walker = FileWalker.from_config(config)
+        search.context = max(0, settings.context_lines)
+        search.index = TrigramIndex.find(root, search.walker)
+        if search.index is None and settings.index:
+            search.index = TrigramIndex(root, search.walker)
+        return search
+
+    def cancel(self):
+        """Stop the search; results() returns promptly"""
+        self._cancelled.set()
+
+    def _candidates(self) -> Iterator[str]:
+        """Paths worth opening: the index's candidates when it has an answer, else the whole tree"""
+        # Name, size and mtime filters are checked before any file is opened
+        if self.index is not None:
+            candidates = self.query.index_candidates(self.index, self.root)
+            # Refresh after the query so the next search sees files changed since the last one
+            self.index.refresh_in_background()
+            if candidates is not None:
+                self.used_index = True
+                for file_path in candidates:
+                    if self.query.accepts(os.path.basename(file_path), partial(os.stat, file_path)):
+                        yield file_path
+                return
+        for entry in self.walker.text_files(self.root, self._cancelled):
+            if self.query.accepts(entry.name, entry.stat):
+                yield entry.path
 
-    def compose(self) -> ComposeResult:
-        yield Header("General Settings")
-
-        with Vertical(id="general-settings"):
-            yield Static("Theme:")
-            yield Select(
-                [(theme, theme) for theme in ["synthwave", "matrix", "cyberpunk", "midnight"]],
-                value=self.config.get("general", "theme"),
-                id="theme-select"
-            )
-
-            yield Static("History Size:")
-            yield Input(
-                value=self.config.get("general", "history_size"),
-                id="history-size-input"
-            )
-
-            yield Static("Display Count:")
-            yield Input(
-                value=self.config.get("general", "display_count"),
-                id="display-count-input"
-            )
-
-            yield Static("Verbose Logging:")
-            yield Switch(
-                value=self.config.get_bool("general", "verbose_logging"),
-                id="verbose-logging-switch"
-            )
-
-        with Horizontal(id="action-buttons"):
-            yield Button("Save", variant="primary", id="save-btn")
-            yield Button("Cancel", variant="error", id="cancel-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "save-btn":
-            self.save_settings()
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
-
-    def on_select_changed(self, event: Select.Changed) -> None:
-        """Handle theme selection change"""
-        if event.select.id == "theme-select":
-            self.config.set("general", "theme", event.value)
-
-    def save_settings(self) -> None:
-        """Save settings"""
+    def _match(self, file_path: str) -> Optional[FileMatch]:
+        """Hits in one file, scored by match count, recency and depth below the root"""
         try:
-            # History size
-            history_size = self.query_one("#history-size-input", Input).value
-            if history_size.isdigit() and 1 <= int(history_size) <= 999:
-                self.config.set("general", "history_size", history_size)
-
-            # Display count
-            display_count = self.query_one("#display-count-input", Input).value
-            if display_count.isdigit() and 1 <= int(display_count) <= 99:
-                self.config.set("general", "display_count", display_count)
-
-            # Verbose logging
-            verbose_logging = self.query_one("#verbose-logging-switch", Switch).value
-            self.config.set("general", "verbose_logging", str(verbose_logging).lower())
-
-            # Theme already saved in on_select_changed
-
-            self.app.pop_screen()
-            self.app.push_screen(
-                MessageScreen("Settings saved.")
-            )
-        except Exception as e:
-            self.app.push_screen(
-                MessageScreen(f"Error saving settings: {e}")
-            )
-
-
-# Clipboard configuration screen - No changes needed
-class ClipboardConfigScreen(Screen):
-    def __init__(self, config: Config):
-        super().__init__()
-        self.config = config
-
-    def compose(self) -> ComposeResult:
-        yield Header("Clipboard Settings")
-
-        with Vertical(id="clipboard-settings"):
-            yield Static("Auto Clear:")
-            yield Switch(
-                value=self.config.get_bool("clipboard", "auto_clear"),
-                id="auto-clear-switch"
-            )
-
-            yield Static("Default Buffer:")
-            yield Input(
-                value=self.config.get("clipboard", "default_buffer"),
-                id="default-buffer-input"
-            )
-
-            yield Static("Max File Size (MB):")
-            yield Input(
-                value=self.config.get("clipboard", "max_file_size"),
-                id="max-file-size-input"
-            )
-
-        with Horizontal(id="action-buttons"):
-            yield Button("Save", variant="primary", id="save-btn")
-            yield Button("Cancel", variant="error", id="cancel-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "save-btn":
-            self.save_settings()
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
-
-    def save_settings(self) -> None:
-        """Save settings"""
+            match = self.query.find(file_path, self.max_file_size, self.context)
+        except (OSError, ValueError):
+            return None
+        if match is None:
+            return None
+        depth = os.path.relpath(file_path, self.root).count(os.sep)
+        age = max(0.0, time.time() - match.mtime)
+        score = (math.log2(1 + match.count) + 2.0 ** (-age / SEARCH_RECENCY_HALF_LIFE)
+                 - SEARCH_DEPTH_PENALTY * depth)
+        return match._replace(score=score)
+
+    def _search_batch(self, batch: List[str]) -> List[FileMatch]:
+        """Matches in one batch (runs on a pool thread)"""
+        matches = []
+        for file_path in batch:
+            if self._cancelled.is_set():
+                break
+            match = self._match(file_path)
+            if match is not None:
+                matches.append(match)
+        return matches
+
+    def results(self) -> Iterator[FileMatch]:
+        """Yield matches as they are found"""
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        found = 0
+        pending = {}
+        pool = ThreadPoolExecutor(max_workers=self.workers)
         try:
-            # Auto clear
-            auto_clear = self.query_one("#auto-clear-switch", Switch).value
-            self.config.set("clipboard", "auto_clear", str(auto_clear).lower())
-
-            # Default buffer
-            default_buffer = self.query_one("#default-buffer-input", Input).value
-            if default_buffer.isdigit() and 0 <= int(default_buffer) <= 9:
-                self.config.set("clipboard", "default_buffer", default_buffer)
-
-            # Max file size
-            max_file_size = self.query_one("#max-file-size-input", Input).value
-            if max_file_size.isdigit() and 1 <= int(max_file_size) <= 9999:
-                self.config.set("clipboard", "max_file_size", max_file_size)
-
-            self.app.pop_screen()
-            self.app.push_screen(
-                MessageScreen("Settings saved.")
-            )
-        except Exception as e:
-            self.app.push_screen(
-                MessageScreen(f"Error saving settings: {e}")
-            )
-
-
-# Security configuration screen - No changes needed
-class SecurityConfigScreen(Screen):
-    def __init__(self, config: Config):
-        super().__init__()
-        self.config = config
+            candidates = self._candidates()
+            while not self._cancelled.is_set():
+                # Keep the pool fed without queueing the whole tree
+                while len(pending) < self.workers * SEARCH_QUEUE_FACTOR:
+                    batch = list(islice(candidates, SEARCH_BATCH_SIZE))
+                    if not batch:
+                        break
+                    pending[pool.submit(self._search_batch, batch)] = len(batch)
+                if not pending:
+                    return
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.files_searched += pending.pop(future)
+                    for match in future.result():
+                        if self._cancelled.is_set():
+                            return
+                        yield match
+                        found += 1
+                        if found >= self.limit:
+                            return
+        finally:
+            self._cancelled.set()
+            pool.shutdown(wait=False, cancel_futures=True)
 
-    def compose(self) -> ComposeResult:
-        yield Header("Security Settings")
-
-        with Vertical(id="security-settings"):
-            yield Static("Notifications:")
-            yield Switch(
-                value=self.config.get_bool("security", "notification"),
-                id="notification-switch"
-            )
-
-            yield Static("Compression:")
-            yield Switch(
-                value=self.config.get_bool("security", "compression"),
-                id="compression-switch"
-            )
-
-            yield Static("Encryption:")
-            yield Switch(
-                value=self.config.get_bool("security", "encryption"),
-                id="encryption-switch"
-            )
-
-        with Horizontal(id="action-buttons"):
-            yield Button("Save", variant="primary", id="save-btn")
-            yield Button("Cancel", variant="error", id="cancel-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
-
-        if button_id == "save-btn":
-            self.save_settings()
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
-
-    def save_settings(self) -> None:
-        """Save settings"""
-        try:
-            # Notification
-            notification = self.query_one("#notification-switch", Switch).value
-            self.config.set("security", "notification", str(notification).lower())
-
-            # Compression
-            compression = self.query_one("#compression-switch", Switch).value
-            self.config.set("security", "compression", str(compression).lower())
-
-            # Encryption
-            encryption = self.query_one("#encryption-switch", Switch).value
-            self.config.set("security", "encryption", str(encryption).lower())
-
-            self.app.pop_screen()
-            self.app.push_screen(
-                MessageScreen("Settings saved.")
-            )
-        except Exception as e:
-            self.app.push_screen(
-                MessageScreen(f"Error saving settings: {e}")
-            )
 
+# Auto-clear - one timer heap for every pending clear
+class ClearScheduler:
+    """Runs Clipboard.expire for each scheduled clear from a single thread.
 
-# History configuration screen - Fixed the Select widget error
-class HistoryConfigScreen(Screen):
-    def __init__(self, config: Config):
-        super().__init__()
-        self.config = config
+    Rescheduling a buffer replaces its pending clear; superseded heap entries are skipped
+    when they come up. on_idle is called whenever the last pending clear has run.
+    """
 
-    def compose(self) -> ComposeResult:
-        yield Header("History Settings")
-
-        with Vertical(id="history-settings"):
-            yield Static("Shell History Scan:")
-            yield Switch(
-                value=self.config.get_bool("history", "shell_history_scan"),
-                id="shell-history-scan-switch"
-            )
-
-            yield Static("Prefer Local History:")
-            yield Switch(
-                value=self.config.get_bool("history", "prefer_local_history"),
-                id="prefer-local-history-switch"
-            )
-
-            # Create options for the select dropdown
-            preferred_history = self.config.get("history", "preferred_history")
-            history_options = [("Auto Detect", "auto"), ("Bash", "bash"), ("ZSH", "zsh")]
-
-            # Find the value in the options list
-            selected_value = None
-            for label, val in history_options:
-                if val == preferred_history:
-                    selected_value = val
+    def __init__(self, clipboard: "Clipboard", lock: threading.Lock = None, on_idle=None):
+        self.clipboard = clipboard
+        self.lock = lock  # Held while clearing, if the clipboard is shared with other threads
+        self.on_idle = on_idle
+        self._heap: List[Tuple[float, str, str]] = []
+        self._pending: Dict[str, Tuple[float, str]] = {}  # Latest (deadline, digest) per buffer
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, buffer: str, digest: str, timeout: float):
+        deadline = time.time() + timeout
+        with self._condition:
+            self._pending[buffer] = (deadline, digest)
+            heappush(self._heap, (deadline, buffer, digest))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            due = []
+            with self._condition:
+                while not due:
+                    now = time.time()
+                    while self._heap and self._heap[0][0] <= now:
+                        deadline, buffer, digest = heappop(self._heap)
+                        if self._pending.get(buffer) == (deadline, digest):
+                            del self._pending[buffer]
+                            due.append((buffer, digest))
+                    if not due:
+                        self._condition.wait(self._heap[0][0] - now if self._heap else None)
+
+            with self.lock or nullcontext():
+                for buffer, digest in due:
+                    self.clipboard.expire(buffer, digest)
+            if self.on_idle is not None and not self.pending():
+                self.on_idle()
+
+
+def start_background_daemon(buffer: str, digest: str, deadline: float) -> bool:
+    """Start a daemon that clears buffer at deadline and exits once no auto-clears are pending.
+
+    Returns once the process is spawned, without waiting for it to answer: the copy path
+    (and the TUI's UI thread) must not block on daemon startup.
+    """
+    if os.environ.get("CLIPBARD_NO_DAEMON"):
+        return False
+    try:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "daemon", "timers",
+                          buffer, digest, repr(deadline)],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+    except OSError:
+        return False
+    return True
+
+
+# Resident daemon - keeps Config, History and the clipboard backend warm
+def handle_request(request: dict, config: Config, history: History, clipboard: Clipboard) -> dict:
+    """Execute one client request against the given core objects"""
+    op = request.get("op")
+    buffer = request.get("buffer")
+
+    if op == "copy":
+        return {"ok": clipboard.copy_to_clipboard(request["path"], buffer)}
+    elif op == "copy_text":
+        return {"ok": clipboard.copy_text_to_clipboard(request["text"], buffer)}
+    elif op == "paste":
+        return {"ok": True, "content": clipboard.get_clipboard_content(buffer)}
+    elif op == "clear":
+        return {"ok": clipboard.clear_clipboard(buffer)}
+    elif op == "reload_config":
+        return {"ok": True, "changed": sorted(".".join(key) for key in config.reload())}
+    elif op == "schedule_clear":
+        return {"ok": clipboard.schedule_clear(buffer, request["digest"], request["timeout"])}
+    elif op == "select_buffer":
+        return {"ok": clipboard.select_buffer(buffer)}
+    elif op == "buffers":
+        return {"ok": True, "active": clipboard.buffers.active, "buffers": clipboard.buffers.buffers()}
+    elif op == "history":
+        term = request.get("term")
+        count = request.get("count")
+        entries = history.search(term, count) if term else history.get(count)
+        return {"ok": True, "entries": entries}
+    elif op == "ping":
+        return {"ok": True, "version": VERSION, "pid": os.getpid()}
+
+    return {"ok": False, "error": f"Unknown operation: {op}"}
+
+
+class ClipbardDaemon:
+    """Long-lived server answering DaemonClient requests over a Unix socket"""
+
+    def __init__(self, socket_path: str = None, idle_exit: bool = False):
+        self.socket_path = socket_path or daemon_socket_path()
+        self.lock_file = f"{self.socket_path}.lock"  # Held for the daemon's lifetime
+        self.config = Config.shared()
+        self.config.notify_daemon = False  # We are the daemon
+        allow_passphrase_prompt(False)  # A handler thread must never block on the terminal
+        self.history = History(self.config)
+        self.clipboard = Clipboard(self.config, self.history)
+        # History and clipboard writes are not re-entrant, so requests run one at a time
+        self._lock = threading.Lock()
+        self.idle_exit = idle_exit  # Started just to run auto-clears; stop after the last one
+        self.clipboard.scheduler = ClearScheduler(self.clipboard, self._lock,
+                                                  on_idle=self.stop if idle_exit else None)
+        self._server = None
+        self.initial_clear: Optional[Tuple[str, str, float]] = None  # (buffer, digest, deadline) to schedule on start
+
+    def serve(self):
+        """Bind the socket and serve until stopped"""
+        with ExitStack() as stack:
+            # Whoever holds the lock owns the socket path, so checking for a live daemon,
+            # removing a stale socket and binding cannot interleave with another daemon's start
+            give_up = time.time() + DAEMON_TIMEOUT
+            while True:
+                try:
+                    stack.enter_context(file_lock(self.lock_file, blocking=False))
                     break
+                except BlockingIOError:
+                    if self.initial_clear is None or self._hand_over() or time.time() > give_up:
+                        print(f"ClipBard daemon already running on {self.socket_path}")
+                        return
+                    time.sleep(DAEMON_RETRY_INTERVAL)  # It is still binding, or exiting; try again
+            self._serve()
+
+    def _hand_over(self) -> bool:
+        """Pass our pending clear to the daemon holding the lock; False if it is not answering"""
+        buffer, digest, deadline = self.initial_clear
+        return DaemonClient(self.socket_path).request("schedule_clear", buffer=buffer, digest=digest,
+                                                       timeout=max(0.0, deadline - time.time())) is not None
+
+    def _serve(self):
+        """Serve with the daemon lock held"""
+        import socketserver
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Stale socket from a crashed daemon
+
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    return
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "Malformed request"}
+                else:
+                    response = daemon.dispatch(request)
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                if isinstance(request, dict) and request.get("op") == "shutdown":
+                    daemon.stop()  # Only once the reply is out; handler threads die with the process
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        old_umask = os.umask(0o177)  # Socket is private to the current user
+        try:
+            self._server = Server(self.socket_path, RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        print(f"ClipBard daemon listening on {self.socket_path}")
+        if self.initial_clear is not None:
+            buffer, digest, deadline = self.initial_clear
+            self.clipboard.scheduler.schedule(buffer, digest, max(0.0, deadline - time.time()))
+        if self.idle_exit:
+            # Don't linger if the client that started us never schedules anything
+            idle_check = threading.Timer(DAEMON_TIMEOUT, lambda: self.clipboard.scheduler.pending() or self.stop())
+            idle_check.daemon = True
+            idle_check.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
 
-            # If not found, use the first option
-            if selected_value is None:
-                selected_value = history_options[0][1]  # Use value, not label
-
-            yield Static("Preferred History:")
-            yield Select(
-                options=history_options,  # Use named parameter
-                value=selected_value,
-                id="preferred-history-select"
-            )
-
-        with Horizontal(id="action-buttons"):
-            yield Button("Save", variant="primary", id="save-btn")
-            yield Button("Cancel", variant="error", id="cancel-btn")
-
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        button_id = event.button.id
+    def dispatch(self, request: dict) -> dict:
+        """Run a request under the daemon lock"""
+        if request.get("op") == "shutdown":
+            return {"ok": True}  # The handler stops us after replying
 
-        if button_id == "save-btn":
-            self.save_settings()
-        elif button_id == "cancel-btn":
-            self.app.pop_screen()
+        with self._lock:
+            try:
+                return handle_request(request, self.config, self.history, self.clipboard)
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
+
+    def stop(self):
+        """Stop serving; safe to call from a handler thread or a signal"""
+        if self._server:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+
+def daemon_command(args: List[str]):
+    """Handle 'clipbard daemon [start|stop|status]'"""
+    action = args[0] if args else "start"
+    client = DaemonClient()
+
+    if action == "start":
+        ClipbardDaemon().serve()
+    elif action == "timers":
+        # Started in the background by an auto-clear; exits when no clears are pending
+        daemon = ClipbardDaemon(idle_exit=True)
+        if len(args) == 4:
+            daemon.initial_clear = (args[1], args[2], float(args[3]))
+        daemon.serve()
+    elif action == "stop":
+        response = client.request("shutdown")
+        if response is None:
+            print("ClipBard daemon is not running.")
+        else:
+            report(response, "ClipBard daemon stopped.", "Error: Failed to stop the ClipBard daemon.")
+    elif action == "status":
+        response = client.request("ping")
+        if response is None:
+            print("ClipBard daemon is not running.")
+        elif response.get("ok"):
+            print(f"ClipBard daemon v{response['version']} running (pid {response['pid']}) on {client.socket_path}")
+        else:
+            report(response, "", "Error: The ClipBard daemon is not responding.")
+    else:
+        print(f"Error: Unknown daemon action '{action}'. Use start, stop or status.")
 
-    def save_settings(self) -> None:
-        """Save settings"""
-        try:
-            # Shell history scan
-            shell_history_scan = self.query_one("#shell-history-scan-switch", Switch).value
-            self.config.set("history", "shell_history_scan", str(shell_history_scan).lower())
-
-            # Prefer local history
-            prefer_local_history = self.query_one("#prefer-local-history-switch", Switch).value
-            self.config.set("history", "prefer_local_history", str(prefer_local_history).lower())
-
-            # Preferred history
-            preferred_history = self.query_one("#preferred-history-select", Select).value
-            self.config.set("history", "preferred_history", preferred_history)
-
-            self.app.pop_screen()
-            self.app.push_screen(
-                MessageScreen("Settings saved.")
-            )
-        except Exception as e:
-            self.app.push_screen(
-                MessageScreen(f"Error saving settings: {e}")
-            )
-
-
-# Help screen - No changes needed
-class HelpScreen(Screen):
-    BINDINGS = [
-        Binding("escape", "app.pop_screen", "Back"),
-    ]
-
-    def compose(self) -> ComposeResult:
-        yield Header("Help")
-
-        yield Markdown("""
-# ClipBard Python Edition
-
-A radical clipboard utility for terminal users.
-
-## Features:
-- Extract files from shell history for quick copying
-- Browse and search files
-- Copy line ranges from text files
-- Multiple clipboard buffers
-- Clipboard history tracking
-- Security features (encryption, compression)
-- Theme customization
-
-## Navigation:
-- Use arrow keys to navigate
-- Press Escape to go back
-- Use Tab to navigate between fields
-- Press Enter or click buttons to select options
-
-## Keyboard Shortcuts:
-- q: Quit application
-- h: Show this help
-- c: Configuration
-- b: Browse files
-- s: Search
-- v: View clipboard
-        """, id="help-content")
-
-        yield Button("Back", variant="primary", id="back-btn")
-        yield Footer()
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press"""
-        self.app.pop_screen()
-
-
-# Main application - No changes needed
-class ClipbardApp(App):
-    BINDINGS = [
-        Binding("q", "quit", "Quit"),
-    ]
-
-    TITLE = "ClipBard Python Edition"
-
-    # Define CSS for styling the application
-    CSS = """
-    #logo {
-        content-align: center middle;
-        color: $accent;
-        margin: 1 0;
-    }
-
-    #main-menu {
-        align: center middle;
-        width: 100%;
-        height: auto;
-        margin: 1 0;
-    }
-
-    Button {
-        margin: 1 0;
-        min-width: 20;
-    }
-
-    .heading {
-        color: $accent;
-        margin: 1 0;
-    }
-
-    #recent-history {
-        margin: 1 0;
-    }
-
-    .file-btn {
-        width: 100%;
-        margin: 0 0;
-    }
-
-    #search-form, #line-range-form, #save-form, #confirm-form {
-        align: center middle;
-        width: 100%;
-        height: auto;
-        margin: 1 0;
-    }
-
-    #action-buttons {
-        margin: 1 0;
-    }
-
-    #file-info {
-        margin: 1 0;
-    }
-
-    #file-preview {
-        margin: 1 0;
-        height: 50%;
-    }
-
-    #general-settings, #clipboard-settings, #security-settings, #history-settings {
-        margin: 1 0;
-        height: auto;
-    }
-
-    Log {
-        background: $surface;
-        color: $text;
-        margin: 1 0;
-        height: 50%;
-        border: tall $accent;
-    }
-
-    ListView {
-        height: auto;
-        border: tall $accent;
-    }
-
-    DirectoryTree {
-        margin: 1 0;
-        height: 90%;
-    }
-
-    Input {
-        width: 40;
-    }
-
-    Select {
-        width: 40;
-    }
-
-    Switch {
-        margin: 1 0;
-    }
-    """
 
-    def __init__(self):
-        super().__init__()
-        self._config = Config()
-        self._history = History(self._config)
-        self._clipboard = Clipboard(self._config, self._history)
+# TUI loader - keeps Textual off the CLI fast path
+def launch_tui(config: Config = None, history: History = None, clipboard: Clipboard = None):
+    """Import the Textual interface on demand and run it"""
+    # clipbard_tui does "from clipbard import ...". The launcher imports us under that name;
+    # when clipbard.py is run directly, register this module under it so the import resolves
+    # to the already-loaded core instead of executing it a second time.
+    sys.modules.setdefault("clipbard", sys.modules[__name__])
+    allow_passphrase_prompt(False)  # Textual owns the terminal; getpass would hang it
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
 
-    def on_mount(self) -> None:
-        """Initialize screens on mount"""
-        self.install_screen(WelcomeScreen(self._config, self._history, self._clipboard), name="welcome")
-        self.install_screen(BrowseScreen(self._config, self._history, self._clipboard), name="browse")
-        self.install_screen(SearchScreen(self._config, self._history, self._clipboard), name="search")
-        self.install_screen(ViewScreen(self._config, self._clipboard), name="view")
-        self.install_screen(ConfigScreen(self._config), name="config")
-        self.install_screen(HelpScreen(), name="help")
+    try:
+        from clipbard_tui import ClipbardApp
+    except ImportError as e:
+        print(f"Error: Could not load the TUI ({e}).")
+        print(f"Make sure textual is installed and {TUI_MODULE} sits next to clipbard.")
+        return
 
-        self.push_screen("welcome")
+    try:
+        ClipbardApp(config, history, clipboard).run()
+    finally:
+        set_message_handler(None)  # ClipbardApp routes core messages to its notifications
 
 
 # Improved quick copy mode with key capture without Enter
 def quick_copy_mode(config, history, clipboard):
     """Quick copy mode that shows latest history items for selection"""
-    # Get display count from config
-    display_count = config.get_int("general", "display_count")
+    # Best files by frecency across clipbard copies and shell history
+    display_files = history.ranked(QUICK_COPY_SLOTS)
 
-    # Get history items and recent shell files
-    history_items = history.get(display_count)
-    shell_files = []
-    if config.get_bool("history", "shell_history_scan"):
-        try:
-            shell_files = history.extract_files_from_shell_history(display_count)
-        except:
-            pass
-
-    # Combine and remove duplicates while preserving order
-    all_files = []
-    for file_path in history_items + shell_files:
-        if file_path not in all_files and os.path.exists(file_path):
-            all_files.append(file_path)
-
-    if not all_files:
+    if not display_files:
         print("No history items found. Use 'clipbard config' to launch the configuration interface.")
         return
 
     # Print compact list of available files
     print("Select a file to copy (press key):")
 
-    # Show only first 9 options to use single-key selection
-    display_files = all_files[:9]
-
     for i, file_path in enumerate(display_files, 1):
         print(f"{i}. {os.path.basename(file_path)} [{FileUtils.human_readable_size(os.path.getsize(file_path))}]")
 
@@ -2268,7 +4115,7 @@ def quick_copy_mode(config, history, clipboard):
     if choice.lower() in ('c', 'q'):
         return
     elif choice.lower() == 't':
-        ClipbardApp().run()
+        launch_tui(config, history, clipboard)
         return
 
     try:
@@ -2286,26 +4133,36 @@ def quick_copy_mode(config, history, clipboard):
 
 
 # Command-line interface - Updated to improve UX
-def parse_args():
-    """Parse command-line arguments"""
-    args = sys.argv[1:]
+def run_request(request: dict) -> dict:
+    """Run a request on the daemon if one is up, otherwise in this process"""
+    response = DaemonClient().request(**request)
+    if response is not None:
+        return response
 
-    # Initialize core components
-    config = Config()
+    config = Config.shared()
     history = History(config)
     clipboard = Clipboard(config, history)
+    return handle_request(request, config, history, clipboard)
+
+
+def parse_args():
+    """Parse command-line arguments"""
+    args = sys.argv[1:]
+    allow_passphrase_prompt()  # Turned off again by launch_tui and the daemon
 
     # No arguments - show latest history items for quick selection
     if not args:
-        quick_copy_mode(config, history, clipboard)
+        config = Config.shared()
+        history = History(config)
+        quick_copy_mode(config, history, Clipboard(config, history))
         return
 
     # Process commands
     cmd = args[0]
 
-    if cmd == "config":
-        # Launch the full TUI with config option
-        ClipbardApp().run()
+    if cmd == "config" or cmd == "tui":
+        # Launch the full TUI interface
+        launch_tui()
     elif cmd == "install" or cmd == "i":
         install_clipbard()
     elif cmd == "uninstall" or cmd == "u":
@@ -2316,28 +4173,72 @@ def parse_args():
         print_version()
     elif cmd == "help" or cmd == "h":
         print_help()
-    elif cmd == "t":
-        # Copy text directly
-        if len(args) > 1:
-            clipboard.copy_text_to_clipboard(args[1])
-            print(f"Text copied to clipboard.")
-        else:
-            print("Error: No text provided.")
-    elif cmd == "tui":
-        # Launch full TUI interface
-        ClipbardApp().run()
-    elif os.path.isfile(cmd):
-        # Treat as file path
-        if clipboard.copy_to_clipboard(cmd):
-            print(f"Copied to clipboard: {cmd}")
-        else:
-            print(f"Error: Failed to copy {cmd} to clipboard.")
-    else:
+    elif cmd == "daemon":
+        daemon_command(args[1:])
+    elif cmd == "index":
+        index_command(args[1:])
+    elif cmd == "t" and len(args) == 1:
+        print("Error: No text provided.")
+    elif (cmd == "buffer" or cmd == "b") and len(args) == 1:
+        list_buffers()
+    # Copies, pastes, clears, buffer switches and history; shared with the launcher
+    elif not run_command(args, run_request):
         print(f"Error: '{cmd}' is not a valid command or file.")
         print_help()
 
 
+def index_command(args: List[str]):
+    """Handle 'clipbard index [DIR]': build or refresh a content search index"""
+    directory = os.path.abspath(args[0] if args else os.getcwd())
+    if not os.path.isdir(directory):
+        print(f"Error: {directory} is not a directory.")
+        return
+    walker = FileWalker.from_config(Config.shared())
+    index = TrigramIndex.find(directory, walker) or TrigramIndex(directory, walker)
+    start = time.time()
+    indexed, dropped = index.refresh()
+    print(f"Indexed {index.root}: {indexed} files updated, {dropped} removed in {time.time() - start:.1f}s")
+
+
+def list_buffers():
+    """Handle 'clipbard buffer' without a name; switching and copying go through run_command"""
+    response = run_request({"op": "buffers"})
+    if not response.get("ok"):
+        report(response, "", "Error: Failed to list buffers.")
+        return
+    buffers = response.get("buffers", {})
+    if not buffers:
+        print(f"No stored buffers. Active buffer: {response.get('active')}")
+        return
+    for name, entry in sorted(buffers.items()):
+        marker = "*" if name == response.get("active") else " "
+        source = os.path.basename(entry["source"]) if entry.get("source") else "text"
+        print(f"{marker} {name}: {source} [{FileUtils.human_readable_size(entry['size'])}]")
+
+
 # Helper functions for command-line mode - No changes needed
+def install_files(source_dir: str, script_path: str):
+    """Copy the launcher, the core, the daemon client and the TUI from source_dir next to script_path"""
+    script_dir = os.path.dirname(script_path)
+    core = os.path.join(source_dir, CORE_MODULE)
+    # An installed copy has the launcher under its installed name; a checkout
+    # without one installs the core itself as the script
+    launcher = next((path for path in (os.path.join(source_dir, LAUNCHER_MODULE),
+                                       os.path.join(source_dir, os.path.basename(script_path)))
+                     if os.path.isfile(path)), core)
+    copies = [(launcher, script_path),
+              (core, os.path.join(script_dir, CORE_MODULE)),
+              (os.path.join(source_dir, CLIENT_MODULE), os.path.join(script_dir, CLIENT_MODULE)),
+              (os.path.join(source_dir, TUI_MODULE), os.path.join(script_dir, TUI_MODULE))]
+    for source, target in copies:
+        if not os.path.exists(source):
+            continue
+        if os.path.exists(target) and os.path.samefile(source, target):
+            continue
+        shutil.copy(source, target)
+    os.chmod(script_path, 0o755)
+
+
 def install_clipbard():
     """Install clipbard to system"""
     print("Installing ClipBard...")
@@ -2345,10 +4246,9 @@ def install_clipbard():
     script_dir = os.path.expanduser("~/.local/bin")
     os.makedirs(script_dir, exist_ok=True)
 
-    # Copy script to bin directory
+    # Copy the launcher to the bin directory, with the modules it loads beside it
     script_path = os.path.join(script_dir, "clipbard")
-    shutil.copy(sys.argv[0], script_path)
-    os.chmod(script_path, 0o755)
+    install_files(os.path.dirname(os.path.realpath(__file__)), script_path)
 
     # Add to PATH if needed
     if script_dir not in os.environ["PATH"].split(":"):
@@ -2378,6 +4278,11 @@ def uninstall_clipbard():
         os.unlink(script_path)
         print("Removed executable.")
 
+    for module in (CORE_MODULE, CLIENT_MODULE, TUI_MODULE):
+        module_path = os.path.join(os.path.expanduser("~/.local/bin"), module)
+        if os.path.exists(module_path):
+            os.unlink(module_path)
+
     if input("Delete configuration and history too? (y/n): ").lower() == "y":
         shutil.rmtree(CONFIG_DIR, ignore_errors=True)
         print("Removed configuration and history.")
@@ -2389,6 +4294,8 @@ def update_clipbard():
     """Update clipbard"""
     print("Updating ClipBard...")
 
+    import tempfile
+
     # Create temporary directory
     temp_dir = tempfile.mkdtemp()
 
@@ -2397,7 +4304,7 @@ def update_clipbard():
         subprocess.run(["git", "clone", "--depth", "1", GITHUB_REPO, temp_dir], check=True)
 
         # Check if the Python version exists
-        py_script = os.path.join(temp_dir, "clipbard.py")
+        py_script = os.path.join(temp_dir, CORE_MODULE)
         if os.path.exists(py_script):
             # Make backup
             script_path = os.path.join(os.path.expanduser("~/.local/bin"), "clipbard")
@@ -2406,8 +4313,7 @@ def update_clipbard():
                 print(f"Backup saved to: {script_path}.backup")
 
             # Copy new version
-            shutil.copy(py_script, script_path)
-            os.chmod(script_path, 0o755)
+            install_files(temp_dir, script_path)
             print("Update complete!")
         else:
             print("Error: Python version not found in repository.")
@@ -2437,6 +4343,12 @@ Commands:
   config         Launch configuration TUI
   tui            Launch full interface
   t TEXT         Copy text directly to clipboard
+  paste [BUF]    Print clipboard (or buffer) content
+  clear [BUF]    Clear clipboard (or buffer)
+  buffer, b      List buffers; 'b NAME' switches, 'b NAME FILE' stores FILE
+  history [TERM] List (or search) copy history
+  index [DIR]    Build or refresh the content search index for DIR
+  daemon ACTION  Resident daemon: start, stop or status
   install, i     Install ClipBard to system
   uninstall, u   Uninstall ClipBard
   update         Update to latest version
@@ -2445,10 +4357,14 @@ Commands:
     """)
 
 
-# Main entry point - No changes needed
-if __name__ == "__main__":
+# Main entry point - run directly or by the clipbard launcher
+def main():
     try:
         parse_args()
     except KeyboardInterrupt:
         print("\nOperation cancelled by user.")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
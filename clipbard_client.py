@@ -0,0 +1,143 @@
+"""
+ClipBard - A RADICAL clipboard utility
+Python Edition - daemon client
+
+Shared by the launcher and the core: where the daemon listens, how to talk to
+it, and the commands it serves, output included. Loads nothing beyond os and
+sys until a request is actually sent, so the launcher's fast path stays fast.
+
+by Arash Abolhasani (@eraxe)
+"""
+
+import os
+import sys
+
+# Constants
+CONFIG_DIR = os.path.expanduser("~/.config/clipbard")
+DAEMON_SOCKET_NAME = "clipbard.sock"
+DAEMON_TIMEOUT = 30  # Seconds a client waits on the daemon
+
+# Commands clipbard.parse_args handles even when a file of the same name exists
+CORE_COMMANDS = frozenset([
+    "config", "tui", "install", "i", "uninstall", "u", "update", "version", "v", "help", "h",
+    "daemon", "t", "paste", "clear", "buffer", "b", "index", "history"
+])
+
+
+def daemon_socket_path() -> str:
+    """Location of the daemon's Unix socket"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, DAEMON_SOCKET_NAME)
+    return os.path.join(CONFIG_DIR, DAEMON_SOCKET_NAME)
+
+
+class DaemonClient:
+    """Thin client that forwards requests to a running clipbard daemon"""
+
+    def __init__(self, socket_path: str = None, timeout: float = DAEMON_TIMEOUT):
+        self.socket_path = socket_path or daemon_socket_path()
+        self.timeout = timeout
+
+    def request(self, op: str, **kwargs):
+        """Send a request and return the daemon's response.
+
+        Returns None only if no daemon could be reached, so the caller can run the request
+        itself. Once the request is sent the daemon may already have acted on it; a missing
+        or garbled reply comes back as a failed response instead.
+        """
+        if os.environ.get("CLIPBARD_NO_DAEMON") or not os.path.exists(self.socket_path):
+            return None
+
+        import json
+        import socket
+
+        payload = dict(kwargs, op=op)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                return None  # Stale socket; nothing is listening
+            try:
+                sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as reader:
+                    line = reader.readline()
+            except OSError as e:
+                return {"ok": False, "error": f"Lost the daemon while waiting for its reply ({e})"}
+
+        try:
+            return json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "The daemon closed the connection without a valid reply"}
+
+
+def report(response: dict, success: str, failure: str):
+    """Print the outcome of a command, with the daemon's reason if it failed"""
+    if response.get("ok"):
+        print(success)
+        return
+    print(failure)
+    if response.get("error"):
+        print(f"  {response['error']}")
+
+
+def run_command(args: list, send) -> bool:
+    """Run one of the commands a daemon can serve, sending its request through send.
+
+    send(request) returns the response, or None when the request could not be delivered;
+    run_command then returns False without printing anything, as it does for arguments
+    that are not such a command.
+    """
+    if not args:
+        return False
+    cmd = args[0]
+
+    if cmd == "t" and len(args) > 1:
+        response = send({"op": "copy_text", "text": args[1]})
+        if response is None:
+            return False
+        report(response, "Text copied to clipboard.", "Error: Failed to copy text to clipboard.")
+    elif cmd in ("paste", "clear", "history"):
+        request = {"op": cmd}
+        if len(args) > 1:
+            request["term" if cmd == "history" else "buffer"] = args[1]
+        response = send(request)
+        if response is None:
+            return False
+        if cmd == "clear":
+            report(response, "Clipboard cleared.", "Error: Failed to clear clipboard.")
+        elif not response.get("ok"):
+            print(f"Error: {response.get('error', 'Request failed.')}", file=sys.stderr)
+        elif cmd == "paste":
+            sys.stdout.write(response.get("content", ""))
+        else:
+            for entry in response.get("entries", []):
+                print(entry)
+    elif cmd in ("buffer", "b") and len(args) > 1:
+        buffer = args[1]
+        if len(args) > 2:
+            # Copy a file into a buffer without switching to it
+            file_path = args[2]
+            if not os.path.isfile(file_path):
+                print(f"Error: '{file_path}' is not a file.")
+                return True
+            response = send({"op": "copy", "path": os.path.abspath(file_path), "buffer": buffer})
+            if response is None:
+                return False
+            report(response, f"Copied to buffer {buffer}: {file_path}",
+                   f"Error: Failed to copy {file_path} to buffer {buffer}.")
+        else:
+            response = send({"op": "select_buffer", "buffer": buffer})
+            if response is None:
+                return False
+            report(response, f"Switched to buffer {buffer}.", f"Error: Failed to switch to buffer {buffer}.")
+    elif cmd not in CORE_COMMANDS and os.path.isfile(cmd):
+        # The daemon has its own working directory
+        response = send({"op": "copy", "path": os.path.abspath(cmd)})
+        if response is None:
+            return False
+        report(response, f"Copied to clipboard: {cmd}", f"Error: Failed to copy {cmd} to clipboard.")
+    else:
+        return False
+    return True
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+ClipBard - A RADICAL clipboard utility
+Python Edition - launcher
+
+Installed as ~/.local/bin/clipbard next to clipbard.py. Requests a running
+daemon can answer go straight to its socket through clipbard_client, with
+nothing but os, socket and json loaded; everything else (and every request
+when no daemon is up) imports the core from clipbard.py, which Python
+byte-compiles once instead of on every run.
+
+by Arash Abolhasani (@eraxe)
+"""
+
+import os
+import sys
+
+
+def main():
+    # The core and the client sit next to this launcher, whatever name it was installed under
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    from clipbard_client import DaemonClient, run_command
+
+    # Falls through to the core only when no daemon took the request
+    if run_command(sys.argv[1:], lambda request: DaemonClient().request(**request)):
+        return
+
+    import clipbard
+    clipbard.main()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user.")
+        sys.exit(1)
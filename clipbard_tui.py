@@ -0,0 +1,1504 @@
+"""
+ClipBard - A RADICAL clipboard utility
+Python Edition - Textual interface
+
+Imported on demand by clipbard.py so the plain copy commands never pay for
+loading Textual.
+
+by Arash Abolhasani (@eraxe)
+"""
+
+import os
+import bisect
+import hashlib
+from typing import List
+
+from textual.app import App, ComposeResult
+from textual.containers import Container, Horizontal, Vertical
+from textual.widgets import (
+    Button, Static, Input, Label, Header, Footer,
+    DataTable, DirectoryTree, ListView, ListItem, Select,
+    Markdown, Log, Switch
+)
+# Using Log instead of TextLog for compatibility with Textual 3.2.0
+from textual.reactive import reactive
+from textual.binding import Binding
+from textual import events, work
+from textual.worker import Worker, get_current_worker
+from textual.screen import Screen
+from textual.coordinate import Coordinate
+
+from clipbard import VERSION, CLIPBOARD_BACKENDS, COMPRESSION_CODECS, Config, History, Clipboard, FileUtils, ContentSearch, FileMatch, FileWalker, set_message_handler
+
+
+# Helper function to generate safe IDs - No changes needed
+def generate_safe_id(text: str) -> str:
+    """Generate a safe ID from any string"""
+    # Use hashlib to create a hash of the input text
+    # Add 'id_' prefix to ensure it never starts with a number
+    # This ensures we have a valid ID that complies with Textual's requirements
+    return "id_" + hashlib.md5(text.encode()).hexdigest()
+
+
+# UI Classes
+
+# Main welcome screen - No changes needed
+class WelcomeScreen(Screen):
+    BINDINGS = [
+        Binding("q", "quit", "Quit"),
+        Binding("escape", "app.pop_screen", "Back"),
+        Binding("h", "app.push_screen('help')", "Help"),
+        Binding("c", "app.push_screen('config')", "Config"),
+        Binding("b", "app.push_screen('browse')", "Browse"),
+        Binding("s", "app.push_screen('search')", "Search"),
+        Binding("v", "app.push_screen('view')", "View Clipboard"),
+    ]
+
+    def __init__(self, config: Config, history: History, clipboard: Clipboard):
+        super().__init__()
+        self.config = config
+        self.history = history
+        self.clipboard = clipboard
+        # Dictionary to store file paths by their safe IDs
+        self.file_id_map = {}
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Static(self.get_logo(), id="logo")
+
+        with Vertical(id="main-menu"):
+            yield Button("Copy From History", variant="primary", id="history-btn")
+            yield Button("Browse Files", variant="primary", id="browse-btn")
+            yield Button("Search", variant="primary", id="search-btn")
+            yield Button("View Clipboard", variant="primary", id="view-btn")
+            yield Button("Settings", variant="primary", id="config-btn")
+            yield Button("Help", variant="primary", id="help-btn")
+            yield Button("Quit", variant="error", id="quit-btn")
+
+        with Container(id="recent-history"):
+            yield Static("Recent Files:", classes="heading")
+            yield ListView(id="recent-files-list")
+
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Update recent files on mount"""
+        self.update_recent_files()
+
+    @work(thread=True, exclusive=True)
+    def update_recent_files(self) -> None:
+        """Rank recent files off the UI thread; a cold shell history scan can take seconds"""
+        recent_files = self.history.ranked()
+        if get_current_worker().is_cancelled:
+            return
+        self.app.call_from_thread(self.show_recent_files, recent_files)
+
+    def show_recent_files(self, recent_files: List[str]) -> None:
+        """Fill the list of recent files"""
+        recent_files_list = self.query_one("#recent-files-list", ListView)
+        recent_files_list.clear()
+        self.file_id_map.clear()
+
+        for file_path in recent_files:
+            # Generate a safe ID and store it in the map
+            safe_id = generate_safe_id(file_path)
+            self.file_id_map[safe_id] = file_path
+
+            # Add list item with safe ID
+            recent_files_list.append(ListItem(Label(os.path.basename(file_path)), id=safe_id))
+
+    def on_list_view_selected(self, event: ListView.Selected) -> None:
+        """Handle list view selection"""
+        # Get the file path from the map using the safe ID
+        safe_id = event.item.id
+        file_path = self.file_id_map.get(safe_id)
+
+        if file_path:
+            self.clipboard.copy_to_clipboard(file_path)
+            self.app.push_screen(
+                MessageScreen(f"Copied to clipboard: {os.path.basename(file_path)}")
+            )
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button presses"""
+        button_id = event.button.id
+
+        if button_id == "history-btn":
+            self.action_shell_history()
+        elif button_id == "browse-btn":
+            self.app.push_screen("browse")
+        elif button_id == "search-btn":
+            self.app.push_screen("search")
+        elif button_id == "view-btn":
+            self.app.push_screen("view")
+        elif button_id == "config-btn":
+            self.app.push_screen("config")
+        elif button_id == "help-btn":
+            self.app.push_screen("help")
+        elif button_id == "quit-btn":
+            self.app.exit()
+
+    def get_logo(self) -> str:
+        """Get the ASCII art logo"""
+        return f"""
+╔═╗╦  ╦╔═╗╔╗ ╔═╗╦═╗╔╦╗
+║  ║  ║╠═╝╠╩╗╠═╣╠╦╝ ║║
+╚═╝╩═╝╩╩  ╚═╝╩ ╩╩╚══╩╝
+
+A  R A D I C A L  clipboard utility
+Python Edition v{VERSION}
+        """
+
+    @work
+    async def action_shell_history(self) -> None:
+        """Extract files from shell history"""
+        # Show loading screen
+        self.app.push_screen(LoadingScreen("Scanning shell history..."))
+
+        # Extract files in background
+        worker = get_current_worker()
+        files = self.history.extract_files_from_shell_history()
+
+        # Remove loading screen
+        self.app.pop_screen()
+
+        if not files:
+            self.app.push_screen(
+                MessageScreen("No files found in shell history.")
+            )
+            return
+
+        # Show file selection screen
+        self.app.push_screen(
+            FileSelectionScreen("Shell History Files", files, self.clipboard)
+        )
+
+
+# File selection screen - No changes needed
+class FileSelectionScreen(Screen):
+    def __init__(self, title: str, files: List[str], clipboard: Clipboard):
+        super().__init__()
+        self.title = title
+        self.files = files
+        self.clipboard = clipboard
+        # Dictionary to store file paths by their safe IDs
+        self.file_id_map = {}
+
+    def compose(self) -> ComposeResult:
+        yield Header(self.title)
+
+        with Vertical(id="file-selection"):
+            for file_path in self.files:
+                # Generate a safe ID and store the mapping
+                safe_id = generate_safe_id(file_path)
+                self.file_id_map[safe_id] = file_path
+
+                # Create button with safe ID
+                yield Button(os.path.basename(file_path), id=safe_id, classes="file-btn")
+
+        yield Button("Cancel", variant="error", id="cancel-btn")
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "cancel-btn":
+            self.app.pop_screen()
+        else:
+            # Get the file path from the map using the safe ID
+            file_path = self.file_id_map.get(button_id)
+
+            if file_path and os.path.exists(file_path):
+                self.clipboard.copy_to_clipboard(file_path)
+                self.app.pop_screen()
+                self.app.push_screen(
+                    MessageScreen(f"Copied to clipboard: {os.path.basename(file_path)}")
+                )
+
+
+# Loading screen - No changes needed
+class LoadingScreen(Screen):
+    def __init__(self, message: str):
+        super().__init__()
+        self.message = message
+
+    def compose(self) -> ComposeResult:
+        yield Static(self.message, id="loading-message")
+
+
+# Message screen - No changes needed
+class MessageScreen(Screen):
+    def __init__(self, message: str):
+        super().__init__()
+        self.message = message
+
+    def compose(self) -> ComposeResult:
+        yield Static(self.message, id="message")
+        yield Button("OK", variant="primary", id="ok-btn")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        self.app.pop_screen()
+
+
+# Directory tree that hides what content search would prune
+class FilteredDirectoryTree(DirectoryTree):
+    def __init__(self, path: str, walker: FileWalker, **kwargs):
+        super().__init__(path, **kwargs)
+        self.walker = walker
+        self._rules = {}  # Directory -> ignore rules in force there
+
+    def filter_paths(self, paths):
+        """Drop excluded, ignored and hidden-directory entries"""
+        root = str(self.path)
+        visible = []
+        for path in paths:
+            directory = str(path.parent)
+            rules = self._rules.get(directory)
+            if rules is None:
+                rules = self._rules[directory] = self.walker.rules_for(root, directory)
+            if not self.walker.skip(str(path), path.name, path.is_dir(), rules):
+                visible.append(path)
+        return visible
+
+
+# Browse files screen
+class BrowseScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+    ]
+
+    def __init__(self, config: Config, history: History, clipboard: Clipboard):
+        super().__init__()
+        self.config = config
+        self.history = history
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header("Browse Files")
+        yield FilteredDirectoryTree(os.path.expanduser("~"), FileWalker.from_config(self.config),
+                                    id="directory-tree")
+        yield Footer()
+
+    def on_directory_tree_file_selected(self, event: DirectoryTree.FileSelected) -> None:
+        """Handle file selection"""
+        file_path = event.path
+        file_preview = FileUtils.preview_file(file_path, tail=True)
+
+        if file_preview:
+            self.app.push_screen(
+                FilePreviewScreen(file_preview, self.clipboard)
+            )
+
+
+# File preview screen - No changes needed
+class FilePreviewScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+        Binding("c", "copy", "Copy"),
+        Binding("l", "copy_lines", "Copy Lines"),
+    ]
+
+    def __init__(self, file_data: dict, clipboard: Clipboard):
+        super().__init__()
+        self.file_data = file_data
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header(f"Preview: {self.file_data['filename']}")
+
+        with Vertical(id="file-info"):
+            yield Static(f"Path: {self.file_data['path']}")
+            yield Static(f"Size: {self.file_data['size_human']}")
+            yield Static(f"Type: {self.file_data['type']}")
+            yield Static(f"Modified: {self.file_data['modified']}")
+            if 'lines' in self.file_data and self.file_data['lines'] > 0:
+                if self.file_data.get('lines_estimated'):
+                    yield Static(f"Lines: ~{self.file_data['lines']} (counting...)", id="line-count")
+                else:
+                    yield Static(f"Lines: {self.file_data['lines']}", id="line-count")
+
+        with Vertical(id="file-preview"):
+            yield Static("Preview:", classes="heading")
+            yield Log(id="preview-content", highlight=True)
+
+        with Horizontal(id="action-buttons"):
+            yield Button("Copy to Clipboard", variant="primary", id="copy-btn")
+            if 'lines' in self.file_data and self.file_data['lines'] > 0:
+                yield Button("Copy Line Range", variant="primary", id="copy-lines-btn")
+            yield Button("Back", variant="error", id="back-btn")
+
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Update preview content on mount"""
+        preview_log = self.query_one("#preview-content", Log)
+
+        if 'preview' in self.file_data and self.file_data['preview']:
+            # Add preview content
+            if isinstance(self.file_data['preview'], str):
+                for line in self.file_data['preview'].splitlines()[:10]:
+                    preview_log.write_line(line)
+            else:
+                preview_log.write(str(self.file_data['preview']))
+            if self.file_data.get('tail'):
+                preview_log.write_line("...")
+                for line in self.file_data['tail'].splitlines():
+                    preview_log.write_line(line)
+        else:
+            preview_log.write("Preview not available for this file type.")
+
+        if self.file_data.get('lines_estimated'):
+            self.count_lines()
+
+    @work(thread=True, exclusive=True)
+    def count_lines(self) -> None:
+        """Count the lines of a large file without blocking the preview"""
+        lines = FileUtils.count_lines(self.file_data['path'])
+        if get_current_worker().is_cancelled:
+            return
+        self.file_data['lines'] = lines
+        self.file_data['lines_estimated'] = False
+        self.app.call_from_thread(self.query_one("#line-count", Static).update, f"Lines: {lines}")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "copy-btn":
+            self.action_copy()
+        elif button_id == "copy-lines-btn":
+            self.action_copy_lines()
+        elif button_id == "back-btn":
+            self.app.pop_screen()
+
+    def action_copy(self) -> None:
+        """Copy file to clipboard"""
+        result = self.clipboard.copy_to_clipboard(self.file_data['path'])
+
+        if result:
+            self.app.pop_screen()
+            self.app.push_screen(
+                MessageScreen(f"Copied to clipboard: {self.file_data['filename']}")
+            )
+        else:
+            self.app.push_screen(
+                MessageScreen("Failed to copy to clipboard.")
+            )
+
+    def action_copy_lines(self) -> None:
+        """Show dialog to copy line range"""
+        self.app.push_screen(
+            LineRangeScreen(self.file_data, self.clipboard)
+        )
+
+
+# Line range selection screen - No changes needed
+class LineRangeScreen(Screen):
+    def __init__(self, file_data: dict, clipboard: Clipboard):
+        super().__init__()
+        self.file_data = file_data
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header(f"Select Line Range: {self.file_data['filename']}")
+
+        with Vertical(id="line-range-form"):
+            yield Static("Enter line range (e.g., 5-10 or just 5 for single line):")
+            yield Input(placeholder="5-10", id="line-range-input")
+
+            with Horizontal(id="action-buttons"):
+                yield Button("Copy", variant="primary", id="copy-btn")
+                yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "copy-btn":
+            line_range = self.query_one("#line-range-input", Input).value
+            self.copy_line_range(line_range)
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+    def copy_line_range(self, line_range: str) -> None:
+        """Copy selected line range"""
+        try:
+            if '-' in line_range:
+                start, end = map(int, line_range.split('-'))
+            else:
+                start = end = int(line_range)
+        except ValueError:
+            self.app.push_screen(
+                MessageScreen("Invalid line range format. Use '5-10' or '5'.")
+            )
+            return
+
+        self.query_one("#copy-btn", Button).disabled = True
+        self.read_line_range(start, end)
+
+    @work(thread=True, exclusive=True)
+    def read_line_range(self, start: int, end: int) -> None:
+        """Extract the lines off the UI thread; indexing a large file the first time takes a moment"""
+        content = FileUtils.copy_line_range(self.file_data['path'], start, end)
+        self.app.call_from_thread(self.finish_copy, content, start, end)
+
+    def finish_copy(self, content: str, start: int, end: int) -> None:
+        """Put the extracted lines on the clipboard"""
+        self.query_one("#copy-btn", Button).disabled = False
+        if content:
+            self.clipboard.copy_text_to_clipboard(content)
+            self.app.pop_screen()
+            self.app.pop_screen()  # Also pop the preview screen
+            self.app.push_screen(
+                MessageScreen(f"Copied lines {start}-{end} to clipboard.")
+            )
+        else:
+            self.app.push_screen(
+                MessageScreen("Invalid line range or failed to copy.")
+            )
+
+
+# Search screen - No changes needed
+class SearchScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+    ]
+
+    def __init__(self, config: Config, history: History, clipboard: Clipboard):
+        super().__init__()
+        self.config = config
+        self.history = history
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header("Search")
+
+        with Vertical(id="search-options"):
+            yield Button("Search App History", variant="primary", id="history-search-btn")
+            yield Button("Search File Contents", variant="primary", id="content-search-btn")
+            yield Button("Back", variant="error", id="back-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "history-search-btn":
+            self.app.push_screen(
+                HistorySearchScreen(self.history, self.clipboard)
+            )
+        elif button_id == "content-search-btn":
+            self.app.push_screen(
+                ContentSearchScreen(self.config, self.clipboard)
+            )
+        elif button_id == "back-btn":
+            self.app.pop_screen()
+
+
+# History search screen - No changes needed
+class HistorySearchScreen(Screen):
+    def __init__(self, history: History, clipboard: Clipboard):
+        super().__init__()
+        self.history = history
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header("Search App History")
+
+        with Vertical(id="search-form"):
+            yield Static("Enter search term:")
+            yield Input(placeholder="Search term", id="search-input")
+            yield Button("Search", variant="primary", id="search-btn")
+            yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "search-btn":
+            search_term = self.query_one("#search-input", Input).value
+            if search_term:
+                self.perform_search(search_term)
+            else:
+                self.app.push_screen(
+                    MessageScreen("Please enter a search term.")
+                )
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+    def perform_search(self, search_term: str) -> None:
+        """Search in app history"""
+        results = self.history.search(search_term)
+
+        if results:
+            self.app.push_screen(
+                FileSelectionScreen("Search Results", results, self.clipboard)
+            )
+        else:
+            self.app.push_screen(
+                MessageScreen("No matching files found.")
+            )
+
+
+# Content search screen - results stream in while the search runs
+class ContentSearchScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "cancel", "Cancel"),
+    ]
+
+    def __init__(self, config: Config, clipboard: Clipboard):
+        super().__init__()
+        self.config = config
+        self.clipboard = clipboard
+        self.search = None  # ContentSearch currently running, if any
+        # Dictionary to store matches by their safe IDs
+        self.file_id_map = {}
+        self.scores = []  # Negated scores of the listed matches, in list order
+
+    def compose(self) -> ComposeResult:
+        yield Header("Search File Contents")
+
+        with Vertical(id="search-form"):
+            yield Static("Enter search query:")
+            yield Input(placeholder='term "two words" re:EXPR OR other name:*.py size:<1M mtime:<7d',
+                        id="search-input")
+
+            yield Static("Search directory:")
+            yield Input(placeholder="Directory path", id="dir-input", value=os.path.expanduser("~"))
+
+            with Horizontal(id="action-buttons"):
+                yield Button("Search", variant="primary", id="search-btn")
+                yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Static("", id="search-status")
+        yield ListView(id="search-results")
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "search-btn":
+            search_term = self.query_one("#search-input", Input).value
+            search_dir = self.query_one("#dir-input", Input).value
+
+            if not search_term:
+                self.app.push_screen(
+                    MessageScreen("Please enter a search term.")
+                )
+                return
+
+            if not os.path.isdir(search_dir):
+                self.app.push_screen(
+                    MessageScreen("Invalid directory path.")
+                )
+                return
+
+            self.start_search(search_term, search_dir)
+        elif button_id == "cancel-btn":
+            self.action_cancel()
+
+    def action_cancel(self) -> None:
+        """Stop a running search, or leave the screen if none is running"""
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+            self.query_one("#search-status", Static).update("Search cancelled.")
+        else:
+            self.app.pop_screen()
+
+    def on_unmount(self) -> None:
+        """Don't leave a search running behind a closed screen"""
+        if self.search is not None:
+            self.search.cancel()
+
+    def start_search(self, search_term: str, search_dir: str) -> None:
+        """Clear previous results and start a new search"""
+        if self.search is not None:
+            self.search.cancel()
+        self.query_one("#search-results", ListView).clear()
+        self.file_id_map.clear()
+        self.scores.clear()
+        try:
+            self.search = ContentSearch.from_config(self.config, search_dir, search_term)
+        except ValueError as e:
+            self.search = None
+            self.query_one("#search-status", Static).update("")
+            self.app.push_screen(MessageScreen(f"Invalid query: {e}"))
+            return
+        self.query_one("#search-status", Static).update("Searching...")
+        self.action_content_search(self.search)
+
+    @work(thread=True, exclusive=True)
+    def action_content_search(self, search: ContentSearch) -> None:
+        """Search in file contents, posting each match to the list as it is found"""
+        worker = get_current_worker()
+        found = 0
+        for match in search.results():
+            if worker.is_cancelled:
+                search.cancel()
+                break
+            found += 1
+            self.app.call_from_thread(self.add_result, search, match, found)
+        self.app.call_from_thread(self.finish_search, search, found)
+
+    def add_result(self, search: ContentSearch, match: FileMatch, found: int) -> None:
+        """Show one match at its place in the ranking"""
+        if search is not self.search:
+            return  # Late result from a search that was replaced
+        safe_id = generate_safe_id(match.path)
+        if safe_id in self.file_id_map:
+            return
+        self.file_id_map[safe_id] = match
+        label = os.path.relpath(match.path, search.root)
+        if match.hits:
+            first = match.hits[0]
+            label = f"{label}:{first.line_number}  {first.line.strip()[:80]}"
+        position = bisect.bisect(self.scores, -match.score)
+        self.scores.insert(position, -match.score)
+        self.query_one("#search-results", ListView).insert(position, [ListItem(Label(label), id=safe_id)])
+        self.query_one("#search-status", Static).update(
+            f"Searching... {found} found, {search.files_searched} files read"
+        )
+
+    def finish_search(self, search: ContentSearch, found: int) -> None:
+        """Report how the search ended"""
+        if search is not self.search:
+            return
+        self.search = None
+        source = "index candidates" if search.used_index else "files"
+        if found >= search.limit:
+            status = f"First {found} matches ({search.files_searched} {source} read)"
+        elif found:
+            status = f"{found} matches ({search.files_searched} {source} read)"
+        else:
+            status = "No matching content found."
+        self.query_one("#search-status", Static).update(status)
+
+    def on_list_view_selected(self, event: ListView.Selected) -> None:
+        """Show the hits of the selected match"""
+        match = self.file_id_map.get(event.item.id)
+
+        if match:
+            self.app.push_screen(SearchResultScreen(match, self.clipboard))
+
+
+# Search result screen - the hits of one file, copied without reading it again
+class SearchResultScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+        Binding("c", "copy_file", "Copy File"),
+        Binding("m", "copy_matches", "Copy Matching Lines"),
+        Binding("x", "copy_context", "Copy With Context"),
+    ]
+
+    def __init__(self, match: FileMatch, clipboard: Clipboard):
+        super().__init__()
+        self.match = match
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header(f"Matches: {os.path.basename(self.match.path)}")
+
+        with Vertical(id="file-info"):
+            yield Static(f"Path: {self.match.path}")
+            yield Static(f"Matches: {self.match.count} on {len(self.match.hits)} lines")
+
+        with Vertical(id="file-preview"):
+            yield Log(id="match-content", highlight=True)
+
+        with Horizontal(id="action-buttons"):
+            yield Button("Copy File", variant="primary", id="copy-btn")
+            yield Button("Copy Matching Lines", variant="primary", id="copy-matches-btn")
+            yield Button("Copy With Context", variant="primary", id="copy-context-btn")
+            yield Button("Back", variant="error", id="back-btn")
+
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Show every hit with its line numbers and context"""
+        match_log = self.query_one("#match-content", Log)
+        for hit in self.match.hits:
+            first = hit.line_number - len(hit.before)
+            for offset, line in enumerate(hit.before + [hit.line] + hit.after):
+                marker = ">" if first + offset == hit.line_number else " "
+                match_log.write_line(f"{marker}{first + offset:6d}  {line}")
+            match_log.write_line("")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "copy-btn":
+            self.action_copy_file()
+        elif button_id == "copy-matches-btn":
+            self.action_copy_matches()
+        elif button_id == "copy-context-btn":
+            self.action_copy_context()
+        elif button_id == "back-btn":
+            self.app.pop_screen()
+
+    def _copied(self, result: bool, what: str) -> None:
+        self.app.push_screen(MessageScreen(f"Copied {what} to clipboard." if result else "Failed to copy to clipboard."))
+
+    def action_copy_file(self) -> None:
+        """Copy the whole file"""
+        self._copied(self.clipboard.copy_to_clipboard(self.match.path), os.path.basename(self.match.path))
+
+    def action_copy_matches(self) -> None:
+        """Copy only the matching lines"""
+        self._copied(self.clipboard.copy_text_to_clipboard(self.match.matching_lines()), "matching lines")
+
+    def action_copy_context(self) -> None:
+        """Copy the matching lines with their context"""
+        self._copied(self.clipboard.copy_text_to_clipboard(self.match.with_context()), "matches with context")
+
+
+# View clipboard screen - No changes needed
+class ViewScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+    ]
+
+    def __init__(self, config: Config, clipboard: Clipboard):
+        super().__init__()
+        self.config = config
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header("View Clipboard")
+
+        with Vertical(id="clipboard-view"):
+            yield Static(f"Buffer: {self.clipboard.buffers.active}")
+            yield Static("Content:", classes="heading")
+            yield Log(id="clipboard-content", highlight=True)
+
+        with Horizontal(id="action-buttons"):
+            yield Button("Save to File", variant="primary", id="save-btn")
+            yield Button("Clear Clipboard", variant="primary", id="clear-btn")
+            yield Button("Back", variant="error", id="back-btn")
+
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Update clipboard content on mount"""
+        content_log = self.query_one("#clipboard-content", Log)
+        content = self.clipboard.get_clipboard_content()
+
+        if content:
+            lines = content.splitlines()
+            for line in lines:
+                content_log.write(line)
+        else:
+            content_log.write("Clipboard is empty.")
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "save-btn":
+            self.app.push_screen(
+                SaveClipboardScreen(self.clipboard)
+            )
+        elif button_id == "clear-btn":
+            self.clipboard.clear_clipboard()
+            self.app.pop_screen()
+            self.app.push_screen(
+                MessageScreen("Clipboard cleared.")
+            )
+        elif button_id == "back-btn":
+            self.app.pop_screen()
+
+
+# Save clipboard to file screen - No changes needed
+class SaveClipboardScreen(Screen):
+    def __init__(self, clipboard: Clipboard):
+        super().__init__()
+        self.clipboard = clipboard
+
+    def compose(self) -> ComposeResult:
+        yield Header("Save Clipboard to File")
+
+        with Vertical(id="save-form"):
+            yield Static("Enter filename:")
+            yield Input(placeholder="output.txt", id="filename-input")
+
+            with Horizontal(id="action-buttons"):
+                yield Button("Save", variant="primary", id="save-btn")
+                yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "save-btn":
+            filename = self.query_one("#filename-input", Input).value
+            if filename:
+                self.save_to_file(filename)
+            else:
+                self.app.push_screen(
+                    MessageScreen("Please enter a filename.")
+                )
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+    def save_to_file(self, filename: str) -> None:
+        """Save clipboard content to file"""
+        content = self.clipboard.get_clipboard_content()
+
+        if not content:
+            self.app.push_screen(
+                MessageScreen("Clipboard is empty.")
+            )
+            return
+
+        # Check if file exists
+        if os.path.exists(filename):
+            self.app.push_screen(
+                FileExistsScreen(filename, content)
+            )
+            return
+
+        try:
+            with open(filename, 'w') as f:
+                f.write(content)
+
+            self.app.pop_screen()
+            self.app.pop_screen()  # Also pop the view screen
+            self.app.push_screen(
+                MessageScreen(f"Saved to: {filename}")
+            )
+        except Exception as e:
+            self.app.push_screen(
+                MessageScreen(f"Error saving file: {e}")
+            )
+
+
+# File exists confirmation screen - No changes needed
+class FileExistsScreen(Screen):
+    def __init__(self, filename: str, content: str):
+        super().__init__()
+        self.filename = filename
+        self.content = content
+
+    def compose(self) -> ComposeResult:
+        yield Header("File Exists")
+
+        with Vertical(id="confirm-form"):
+            yield Static(f"File '{self.filename}' already exists.")
+
+            with Horizontal(id="action-buttons"):
+                yield Button("Overwrite", variant="primary", id="overwrite-btn")
+                yield Button("Append", variant="primary", id="append-btn")
+                yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "overwrite-btn":
+            try:
+                with open(self.filename, 'w') as f:
+                    f.write(self.content)
+
+                self.app.pop_screen()
+                self.app.pop_screen()
+                self.app.pop_screen()  # Pop all the way back to view screen
+                self.app.push_screen(
+                    MessageScreen(f"Overwritten: {self.filename}")
+                )
+            except Exception as e:
+                self.app.push_screen(
+                    MessageScreen(f"Error saving file: {e}")
+                )
+        elif button_id == "append-btn":
+            try:
+                with open(self.filename, 'a') as f:
+                    f.write(self.content)
+
+                self.app.pop_screen()
+                self.app.pop_screen()
+                self.app.pop_screen()  # Pop all the way back to view screen
+                self.app.push_screen(
+                    MessageScreen(f"Appended to: {self.filename}")
+                )
+            except Exception as e:
+                self.app.push_screen(
+                    MessageScreen(f"Error saving file: {e}")
+                )
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+
+# Configuration screen - No changes needed
+class ConfigScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+    ]
+
+    def __init__(self, config: Config):
+        super().__init__()
+        self.config = config
+
+    def compose(self) -> ComposeResult:
+        yield Header("Configuration")
+
+        with Vertical(id="config-menu"):
+            yield Button("General Settings", variant="primary", id="general-btn")
+            yield Button("Clipboard Settings", variant="primary", id="clipboard-btn")
+            yield Button("Security Settings", variant="primary", id="security-btn")
+            yield Button("History Settings", variant="primary", id="history-btn")
+            yield Button("Back", variant="error", id="back-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "general-btn":
+            self.app.push_screen(
+                GeneralConfigScreen(self.config)
+            )
+        elif button_id == "clipboard-btn":
+            self.app.push_screen(
+                ClipboardConfigScreen(self.config)
+            )
+        elif button_id == "security-btn":
+            self.app.push_screen(
+                SecurityConfigScreen(self.config)
+            )
+        elif button_id == "history-btn":
+            self.app.push_screen(
+                HistoryConfigScreen(self.config)
+            )
+        elif button_id == "back-btn":
+            self.app.pop_screen()
+
+
+# General configuration screen - No changes needed
+class GeneralConfigScreen(Screen):
+    def __init__(self, config: Config):
+        super().__init__()
+        self.config = config
+
+    def compose(self) -> ComposeResult:
+        yield Header("General Settings")
+
+        with Vertical(id="general-settings"):
+            yield Static("Theme:")
+            yield Select(
+                [(theme, theme) for theme in ["synthwave", "matrix", "cyberpunk", "midnight"]],
+                value=self.config.settings.general.theme,
+                id="theme-select"
+            )
+
+            yield Static("History Size:")
+            yield Input(
+                value=str(self.config.settings.general.history_size),
+                id="history-size-input"
+            )
+
+            yield Static("Display Count:")
+            yield Input(
+                value=str(self.config.settings.general.display_count),
+                id="display-count-input"
+            )
+
+            yield Static("Verbose Logging:")
+            yield Switch(
+                value=self.config.settings.general.verbose_logging,
+                id="verbose-logging-switch"
+            )
+
+        with Horizontal(id="action-buttons"):
+            yield Button("Save", variant="primary", id="save-btn")
+            yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "save-btn":
+            self.save_settings()
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+    def on_select_changed(self, event: Select.Changed) -> None:
+        """Handle theme selection change"""
+        if event.select.id == "theme-select":
+            self.config.set("general", "theme", event.value)
+
+    def save_settings(self) -> None:
+        """Save settings"""
+        try:
+            with self.config.transaction():
+                # History size
+                history_size = self.query_one("#history-size-input", Input).value
+                if history_size.isdigit() and 1 <= int(history_size) <= 99999:
+                    self.config.set("general", "history_size", history_size)
+
+                # Display count
+                display_count = self.query_one("#display-count-input", Input).value
+                if display_count.isdigit() and 1 <= int(display_count) <= 99:
+                    self.config.set("general", "display_count", display_count)
+
+                # Verbose logging
+                verbose_logging = self.query_one("#verbose-logging-switch", Switch).value
+                self.config.set("general", "verbose_logging", str(verbose_logging).lower())
+
+                # Theme already saved in on_select_changed
+
+            self.app.pop_screen()
+            self.app.push_screen(
+                MessageScreen("Settings saved.")
+            )
+        except Exception as e:
+            self.app.push_screen(
+                MessageScreen(f"Error saving settings: {e}")
+            )
+
+
+# Clipboard configuration screen - No changes needed
+class ClipboardConfigScreen(Screen):
+    def __init__(self, config: Config):
+        super().__init__()
+        self.config = config
+
+    def compose(self) -> ComposeResult:
+        yield Header("Clipboard Settings")
+
+        with Vertical(id="clipboard-settings"):
+            yield Static("Auto Clear:")
+            yield Switch(
+                value=self.config.settings.clipboard.auto_clear,
+                id="auto-clear-switch"
+            )
+
+            yield Static("Auto Clear After (seconds):")
+            yield Input(
+                value=str(self.config.settings.clipboard.auto_clear_timeout),
+                id="auto-clear-timeout-input"
+            )
+
+            yield Static("Default Buffer:")
+            yield Input(
+                value=self.config.settings.clipboard.default_buffer,
+                id="default-buffer-input"
+            )
+
+            yield Static("Max File Size (MB):")
+            yield Input(
+                value=str(self.config.settings.clipboard.max_file_size),
+                id="max-file-size-input"
+            )
+
+            backend_options = [("Auto Detect", "auto")] + [(name, name) for name in CLIPBOARD_BACKENDS]
+            backend = self.config.settings.clipboard.backend
+            if backend not in CLIPBOARD_BACKENDS:
+                backend = "auto"
+
+            yield Static("Clipboard Backend:")
+            yield Select(
+                options=backend_options,
+                value=backend,
+                id="backend-select"
+            )
+
+        with Horizontal(id="action-buttons"):
+            yield Button("Save", variant="primary", id="save-btn")
+            yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "save-btn":
+            self.save_settings()
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+    def save_settings(self) -> None:
+        """Save settings"""
+        try:
+            with self.config.transaction():
+                # Auto clear
+                auto_clear = self.query_one("#auto-clear-switch", Switch).value
+                self.config.set("clipboard", "auto_clear", str(auto_clear).lower())
+
+                # Auto clear timeout
+                auto_clear_timeout = self.query_one("#auto-clear-timeout-input", Input).value
+                if auto_clear_timeout.isdigit():
+                    self.config.set("clipboard", "auto_clear_timeout", auto_clear_timeout)
+
+                # Default buffer
+                default_buffer = self.query_one("#default-buffer-input", Input).value
+                if default_buffer.isdigit() and 0 <= int(default_buffer) <= 9:
+                    self.config.set("clipboard", "default_buffer", default_buffer)
+
+                # Max file size
+                max_file_size = self.query_one("#max-file-size-input", Input).value
+                if max_file_size.isdigit() and 1 <= int(max_file_size) <= 9999:
+                    self.config.set("clipboard", "max_file_size", max_file_size)
+
+                # Backend
+                backend = self.query_one("#backend-select", Select).value
+                self.config.set("clipboard", "backend", backend)
+
+            self.app.pop_screen()
+            self.app.push_screen(
+                MessageScreen("Settings saved.")
+            )
+        except Exception as e:
+            self.app.push_screen(
+                MessageScreen(f"Error saving settings: {e}")
+            )
+
+
+# Security configuration screen - No changes needed
+class SecurityConfigScreen(Screen):
+    def __init__(self, config: Config):
+        super().__init__()
+        self.config = config
+
+    def compose(self) -> ComposeResult:
+        yield Header("Security Settings")
+
+        with Vertical(id="security-settings"):
+            yield Static("Notifications:")
+            yield Switch(
+                value=self.config.settings.security.notification,
+                id="notification-switch"
+            )
+
+            yield Static("Compression:")
+            yield Switch(
+                value=self.config.settings.security.compression,
+                id="compression-switch"
+            )
+
+            codec_options = [(name, name) for name, codec in COMPRESSION_CODECS.items() if codec.available()]
+            codec = self.config.settings.security.compression_codec
+            if codec not in dict(codec_options).values():
+                codec = codec_options[0][1]
+
+            yield Static("Compression Codec:")
+            yield Select(
+                options=codec_options,
+                value=codec,
+                id="codec-select"
+            )
+
+            yield Static("Encryption:")
+            yield Switch(
+                value=self.config.settings.security.encryption,
+                id="encryption-switch"
+            )
+
+        with Horizontal(id="action-buttons"):
+            yield Button("Save", variant="primary", id="save-btn")
+            yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "save-btn":
+            self.save_settings()
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+    def save_settings(self) -> None:
+        """Save settings"""
+        try:
+            with self.config.transaction():
+                # Notification
+                notification = self.query_one("#notification-switch", Switch).value
+                self.config.set("security", "notification", str(notification).lower())
+
+                # Compression
+                compression = self.query_one("#compression-switch", Switch).value
+                self.config.set("security", "compression", str(compression).lower())
+                self.config.set("security", "compression_codec", self.query_one("#codec-select", Select).value)
+
+                # Encryption
+                encryption = self.query_one("#encryption-switch", Switch).value
+                self.config.set("security", "encryption", str(encryption).lower())
+
+            self.app.pop_screen()
+            self.app.push_screen(
+                MessageScreen("Settings saved.")
+            )
+        except Exception as e:
+            self.app.push_screen(
+                MessageScreen(f"Error saving settings: {e}")
+            )
+
+
+# History configuration screen - Fixed the Select widget error
+class HistoryConfigScreen(Screen):
+    def __init__(self, config: Config):
+        super().__init__()
+        self.config = config
+
+    def compose(self) -> ComposeResult:
+        yield Header("History Settings")
+
+        with Vertical(id="history-settings"):
+            yield Static("Shell History Scan:")
+            yield Switch(
+                value=self.config.settings.history.shell_history_scan,
+                id="shell-history-scan-switch"
+            )
+
+            yield Static("Prefer Local History:")
+            yield Switch(
+                value=self.config.settings.history.prefer_local_history,
+                id="prefer-local-history-switch"
+            )
+
+            # Create options for the select dropdown
+            preferred_history = self.config.settings.history.preferred_history
+            history_options = [("Auto Detect", "auto"), ("Bash", "bash"), ("ZSH", "zsh"), ("Fish", "fish"), ("Atuin", "atuin")]
+
+            # Find the value in the options list
+            selected_value = None
+            for label, val in history_options:
+                if val == preferred_history:
+                    selected_value = val
+                    break
+
+            # If not found, use the first option
+            if selected_value is None:
+                selected_value = history_options[0][1]  # Use value, not label
+
+            yield Static("Preferred History:")
+            yield Select(
+                options=history_options,  # Use named parameter
+                value=selected_value,
+                id="preferred-history-select"
+            )
+
+        with Horizontal(id="action-buttons"):
+            yield Button("Save", variant="primary", id="save-btn")
+            yield Button("Cancel", variant="error", id="cancel-btn")
+
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        button_id = event.button.id
+
+        if button_id == "save-btn":
+            self.save_settings()
+        elif button_id == "cancel-btn":
+            self.app.pop_screen()
+
+    def save_settings(self) -> None:
+        """Save settings"""
+        try:
+            with self.config.transaction():
+                # Shell history scan
+                shell_history_scan = self.query_one("#shell-history-scan-switch", Switch).value
+                self.config.set("history", "shell_history_scan", str(shell_history_scan).lower())
+
+                # Prefer local history
+                prefer_local_history = self.query_one("#prefer-local-history-switch", Switch).value
+                self.config.set("history", "prefer_local_history", str(prefer_local_history).lower())
+
+                # Preferred history
+                preferred_history = self.query_one("#preferred-history-select", Select).value
+                self.config.set("history", "preferred_history", preferred_history)
+
+            self.app.pop_screen()
+            self.app.push_screen(
+                MessageScreen("Settings saved.")
+            )
+        except Exception as e:
+            self.app.push_screen(
+                MessageScreen(f"Error saving settings: {e}")
+            )
+
+
+# Help screen - No changes needed
+class HelpScreen(Screen):
+    BINDINGS = [
+        Binding("escape", "app.pop_screen", "Back"),
+    ]
+
+    def compose(self) -> ComposeResult:
+        yield Header("Help")
+
+        yield Markdown("""
+# ClipBard Python Edition
+
+A radical clipboard utility for terminal users.
+
+## Features:
+- Extract files from shell history for quick copying
+- Browse and search files
+- Copy line ranges from text files
+- Multiple clipboard buffers
+- Clipboard history tracking
+- Security features (encryption, compression)
+- Theme customization
+
+## Navigation:
+- Use arrow keys to navigate
+- Press Escape to go back
+- Use Tab to navigate between fields
+- Press Enter or click buttons to select options
+
+## Keyboard Shortcuts:
+- q: Quit application
+- h: Show this help
+- c: Configuration
+- b: Browse files
+- s: Search
+- v: View clipboard
+        """, id="help-content")
+
+        yield Button("Back", variant="primary", id="back-btn")
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button press"""
+        self.app.pop_screen()
+
+
+# Main application - No changes needed
+class ClipbardApp(App):
+    BINDINGS = [
+        Binding("q", "quit", "Quit"),
+    ]
+
+    TITLE = "ClipBard Python Edition"
+
+    # Define CSS for styling the application
+    CSS = """
+    #logo {
+        content-align: center middle;
+        color: $accent;
+        margin: 1 0;
+    }
+
+    #main-menu {
+        align: center middle;
+        width: 100%;
+        height: auto;
+        margin: 1 0;
+    }
+
+    Button {
+        margin: 1 0;
+        min-width: 20;
+    }
+
+    .heading {
+        color: $accent;
+        margin: 1 0;
+    }
+
+    #recent-history {
+        margin: 1 0;
+    }
+
+    .file-btn {
+        width: 100%;
+        margin: 0 0;
+    }
+
+    #search-form, #line-range-form, #save-form, #confirm-form {
+        align: center middle;
+        width: 100%;
+        height: auto;
+        margin: 1 0;
+    }
+
+    #action-buttons {
+        margin: 1 0;
+    }
+
+    #file-info {
+        margin: 1 0;
+    }
+
+    #file-preview {
+        margin: 1 0;
+        height: 50%;
+    }
+
+    #general-settings, #clipboard-settings, #security-settings, #history-settings {
+        margin: 1 0;
+        height: auto;
+    }
+
+    Log {
+        background: $surface;
+        color: $text;
+        margin: 1 0;
+        height: 50%;
+        border: tall $accent;
+    }
+
+    ListView {
+        height: auto;
+        border: tall $accent;
+    }
+
+    DirectoryTree {
+        margin: 1 0;
+        height: 90%;
+    }
+
+    Input {
+        width: 40;
+    }
+
+    Select {
+        width: 40;
+    }
+
+    Switch {
+        margin: 1 0;
+    }
+    """
+
+    def __init__(self, config: Config = None, history: History = None, clipboard: Clipboard = None):
+        super().__init__()
+        # Reuse the core objects the CLI already built instead of parsing config.ini again
+        self._config = config or Config.shared()
+        self._history = history or History(self._config)
+        self._clipboard = clipboard or Clipboard(self._config, self._history)
+
+    def on_mount(self) -> None:
+        """Initialize screens on mount"""
+        # Core errors, from workers and the notifier thread too, become toasts instead of
+        # printing over the screen; notify is thread-safe. launch_tui restores printing.
+        set_message_handler(lambda message, severity: self.notify(message, severity=severity, markup=False))
+        self.install_screen(WelcomeScreen(self._config, self._history, self._clipboard), name="welcome")
+        self.install_screen(BrowseScreen(self._config, self._history, self._clipboard), name="browse")
+        self.install_screen(SearchScreen(self._config, self._history, self._clipboard), name="search")
+        self.install_screen(ViewScreen(self._config, self._clipboard), name="view")
+        self.install_screen(ConfigScreen(self._config), name="config")
+        self.install_screen(HelpScreen(), name="help")
+
+        self.push_screen("welcome")
+